@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Choice の変換・表示と勝敗判定のマイクロベンチマーク
+1 ラウンドごとに呼ばれる Choice.from_string / Choice.to_display /
+RockPaperScissorsEngine.determine_winner について、呼び出しあたりの時間と
+呼び出し中に一時的に確保されるメモリ量を、呼び出しごとに辞書を組み立てる
+従来の実装と比較する
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.engine import (  # noqa: E402
+    OUTCOME_TABLE,
+    RESULTS_BY_CODE,
+    Choice,
+    RockPaperScissorsEngine,
+)
+
+
+def legacy_from_string(choice: str) -> Optional[Choice]:
+    """呼び出しごとに対応表を組み立てる従来の実装"""
+    if not isinstance(choice, str):
+        return None
+    choice_map = {
+        "rock": Choice.ROCK,
+        "paper": Choice.PAPER,
+        "scissors": Choice.SCISSORS,
+        "グー": Choice.ROCK,
+        "パー": Choice.PAPER,
+        "チョキ": Choice.SCISSORS,
+    }
+    return choice_map.get(choice.lower())
+
+
+def legacy_to_display(choice: Choice, lang: str = "ja") -> str:
+    """呼び出しごとに表示用の辞書を組み立てる従来の実装"""
+    if lang == "ja":
+        display_map = {
+            Choice.ROCK: "グー ✊",
+            Choice.PAPER: "パー ✋",
+            Choice.SCISSORS: "チョキ ✌️",
+        }
+    else:
+        display_map = {
+            Choice.ROCK: "Rock ✊",
+            Choice.PAPER: "Paper ✋",
+            Choice.SCISSORS: "Scissors ✌️",
+        }
+    return display_map[choice]
+
+
+_LEGACY_CODES = {Choice.ROCK: 0, Choice.PAPER: 1, Choice.SCISSORS: 2}
+
+
+def legacy_determine_winner(player_choice: Choice, ai_choice: Choice):
+    """Enum をキーにした辞書でコードを引く従来の実装"""
+    index = _LEGACY_CODES[player_choice] * 3 + _LEGACY_CODES[ai_choice]
+    return RESULTS_BY_CODE[OUTCOME_TABLE[index]]
+
+
+def peak_allocation(func: Callable, args: tuple, calls: int = 1000) -> int:
+    """func(*args) を calls 回呼ぶ間に一時的に確保されたメモリ量の最大値（バイト）"""
+    func(*args)
+    iterations = itertools.repeat(None, calls)
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in iterations:
+            func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def time_per_call(func: Callable, args: tuple, number: int) -> float:
+    """呼び出しあたりの時間（ナノ秒、5 回計測した最小値）"""
+    best = min(timeit.repeat(lambda: func(*args), number=number, repeat=5))
+    return best / number * 1e9
+
+
+def run(number: int) -> List[Dict[str, object]]:
+    """各ケースを計測"""
+    cases = [
+        ("from_string('rock')", Choice.from_string, legacy_from_string, ("rock",)),
+        ("from_string('Rock')", Choice.from_string, legacy_from_string, ("Rock",)),
+        ("from_string('グー')", Choice.from_string, legacy_from_string, ("グー",)),
+        ("from_string('ぐー')", Choice.from_string, None, ("ぐー",)),
+        ("from_string('ＲＯＣＫ')", Choice.from_string, None, ("ＲＯＣＫ",)),
+        ("from_string(' rock ')", Choice.from_string, None, (" rock ",)),
+        (
+            "to_display('ja')",
+            Choice.SCISSORS.to_display,
+            lambda lang: legacy_to_display(Choice.SCISSORS, lang),
+            ("ja",),
+        ),
+        (
+            "determine_winner",
+            RockPaperScissorsEngine.determine_winner,
+            legacy_determine_winner,
+            (Choice.ROCK, Choice.PAPER),
+        ),
+    ]
+    results = []
+    for name, func, legacy, args in cases:
+        row = {
+            "case": name,
+            "ns_per_call": time_per_call(func, args, number),
+            "peak_bytes": peak_allocation(func, args),
+        }
+        if legacy is not None:
+            row["legacy_ns_per_call"] = time_per_call(legacy, args, number)
+            row["legacy_peak_bytes"] = peak_allocation(legacy, args)
+        results.append(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Choice の変換・表示と勝敗判定のマイクロベンチマーク"
+    )
+    parser.add_argument(
+        "--number", type=int, default=200_000, help="1 回の計測での呼び出し回数"
+    )
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力")
+    args = parser.parse_args(argv)
+
+    results = run(args.number)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return 0
+
+    print(
+        f"{'ケース':<24} {'現在':>10} {'従来':>10} {'確保(現在)':>12} {'確保(従来)':>12}"
+    )
+    for row in results:
+        legacy_time = row.get("legacy_ns_per_call")
+        legacy_peak = row.get("legacy_peak_bytes")
+        print(
+            f"{row['case']:<24} {row['ns_per_call']:>8.1f}ns "
+            f"{'-' if legacy_time is None else f'{legacy_time:.1f}ns':>10} "
+            f"{row['peak_bytes']:>11}B "
+            f"{'-' if legacy_peak is None else f'{legacy_peak}B':>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
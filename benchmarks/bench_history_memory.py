@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+ゲーム履歴のメモリ使用量ベンチマーク
+従来の List[tuple] と GameHistory（リングバッファ）で 100 万ラウンド記録時の
+メモリ使用量を tracemalloc で比較する
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ai.history import DEFAULT_HISTORY_CAPACITY, GameHistory  # noqa: E402
+from src.game.engine import CHOICES_BY_CODE, RockPaperScissorsEngine  # noqa: E402
+
+
+def _rounds(count: int):
+    """決定的な手の組み合わせを生成"""
+    for i in range(count):
+        player_choice = CHOICES_BY_CODE[i % 3]
+        ai_choice = CHOICES_BY_CODE[(i // 3) % 3]
+        result = RockPaperScissorsEngine.determine_winner(player_choice, ai_choice)
+        yield player_choice, ai_choice, result.value
+
+
+def measure(factory, append, rounds: int) -> int:
+    """記録後に確保されているメモリ量（バイト）を計測"""
+    tracemalloc.start()
+    container = factory()
+    for record in _rounds(rounds):
+        append(container, record)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+    return current
+
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="ゲーム履歴のメモリベンチマーク")
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    results = [
+        ("List[tuple]（従来・無制限）", lambda: [], lambda c, r: c.append(r)),
+        (
+            f"GameHistory（容量 {DEFAULT_HISTORY_CAPACITY}）",
+            GameHistory,
+            lambda c, r: c.append(*r),
+        ),
+        (
+            f"GameHistory（容量 {args.rounds}）",
+            lambda: GameHistory(capacity=args.rounds),
+            lambda c, r: c.append(*r),
+        ),
+    ]
+
+    print(f"📏 {args.rounds:,} ラウンド記録後のメモリ使用量")
+    for label, factory, append in results:
+        used = measure(factory, append, args.rounds)
+        print(
+            f"  {label}: {used / 1024:12,.1f} KiB ({used / args.rounds:.2f} B/ラウンド)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+CLI の起動時間ベンチマーク
+ローカルの OpenAI 互換スタンドインを相手に main.py を起動し、ウェルカム表示までの時間、
+入力プロンプトが表示されるまでの時間（time-to-prompt）、最初の手の結果が表示される
+までの時間を計測する。python -X importtime で起動時の import の内訳も表示し、
+予算を超えた場合は終了コード 1 を返す
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ウェルカム表示・入力プロンプト・終了表示（src/ui/cli.py の日本語メッセージ）
+_BANNER = "じゃんけんゲームへようこそ".encode("utf-8")
+_PROMPT = "あなたの手を選んでください: ".encode("utf-8")
+_GAME_END = "ゲームを終了します".encode("utf-8")
+
+# 既定の予算（ミリ秒）。プロンプトは心理戦メッセージ（openai の import と API の往復）を待つ
+DEFAULT_BANNER_BUDGET_MS = 150.0
+DEFAULT_PROMPT_BUDGET_MS = 2000.0
+
+
+def parse_importtime(text: str) -> List[Tuple[int, int, str]]:
+    """
+    -X importtime の出力を解析
+
+    Returns:
+        List[Tuple[int, int, str]]: [(自身のマイクロ秒, 累積マイクロ秒, モジュール名), ...]
+    """
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        if not own.strip().isdigit():
+            # 見出し行
+            continue
+        entries.append((int(own), int(cumulative), name.strip()))
+    return entries
+
+
+def start_stub() -> Tuple[subprocess.Popen, str]:
+    """スタンドインサーバーを別プロセスで起動し、(プロセス, ベース URL) を返す"""
+    command = [sys.executable, "-m", "src.ai.stub_server", "--port", "0"]
+    process = subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONUNBUFFERED="1"),
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    # 起動時に "...: http://host:port/v1" を 1 行出力する
+    line = process.stdout.readline()
+    return process, line.rsplit(" ", 1)[-1].strip()
+
+
+def _read_until(process: subprocess.Popen, marker: bytes, output: bytearray):
+    """標準出力に marker が現れるまで読む"""
+    while marker not in output:
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError(
+                "main.py が期待した出力の前に終了しました:\n"
+                + output.decode("utf-8", "replace")
+            )
+        output += chunk
+
+
+def run_once(base_url: str, importtime: bool = False) -> Dict[str, object]:
+    """
+    main.py を 1 回起動し、ウェルカム表示・プロンプト・最初の手までの時間（秒）を計測
+
+    importtime=True の場合は -X importtime を付けて起動し、import の内訳も返す。
+    """
+    env = dict(
+        os.environ,
+        PYTHONUNBUFFERED="1",
+        PYTHONIOENCODING="utf-8",
+        OPENAI_API_KEY=os.getenv("OPENAI_API_KEY") or "stub",
+        OPENAI_BASE_URL=base_url,
+    )
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command.append(os.path.join(ROOT, "main.py"))
+    # importtime の出力はパイプの容量を超えるため一時ファイルに書き出す
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            cwd=ROOT,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+        )
+        output = bytearray()
+        try:
+            _read_until(process, _BANNER, output)
+            banner = time.perf_counter()
+            _read_until(process, _PROMPT, output)
+            prompt = time.perf_counter()
+            process.stdin.write(b"rock\n")
+            process.stdin.flush()
+            _read_until(process, _GAME_END, output)
+            first_move = time.perf_counter()
+        finally:
+            process.kill()
+            process.wait()
+        stderr.seek(0)
+        imports = parse_importtime(stderr.read().decode("utf-8", "replace"))
+    return {
+        "time_to_banner": banner - start,
+        "time_to_prompt": prompt - start,
+        "first_move": first_move - prompt,
+        "imports": imports,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CLI の起動時間ベンチマーク")
+    parser.add_argument("--runs", type=int, default=5, help="main.py の起動回数")
+    parser.add_argument(
+        "--banner-budget-ms",
+        type=float,
+        default=DEFAULT_BANNER_BUDGET_MS,
+        help="ウェルカム表示までの時間の中央値の予算（ミリ秒）",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_PROMPT_BUDGET_MS,
+        help="time-to-prompt の中央値の予算（ミリ秒）",
+    )
+    parser.add_argument("--top", type=int, default=10, help="表示する重い import の数")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力")
+    args = parser.parse_args(argv)
+
+    stub, base_url = start_stub()
+    try:
+        # import の内訳は計測を乱さないよう別の 1 回で取る
+        entries = run_once(base_url, importtime=True)["imports"]
+        runs = [run_once(base_url) for _ in range(args.runs)]
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    def median_ms(key: str) -> float:
+        return statistics.median(run[key] for run in runs) * 1000
+
+    result = {
+        "time_to_banner_ms": median_ms("time_to_banner"),
+        "time_to_prompt_ms": median_ms("time_to_prompt"),
+        "first_move_ms": median_ms("first_move"),
+        "banner_budget_ms": args.banner_budget_ms,
+        "budget_ms": args.budget_ms,
+        "import_total_ms": sum(own for own, _, _ in entries) / 1000,
+    }
+    result["within_budget"] = (
+        result["time_to_banner_ms"] <= args.banner_budget_ms
+        and result["time_to_prompt_ms"] <= args.budget_ms
+    )
+    heaviest = sorted(entries, key=lambda entry: entry[1], reverse=True)[: args.top]
+    result["heaviest_imports"] = [
+        {"module": name, "self_ms": own / 1000, "cumulative_ms": cumulative / 1000}
+        for own, cumulative, name in heaviest
+    ]
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print(
+            f"📦 import の合計（バックグラウンドを含む）: {result['import_total_ms']:.1f} ms"
+        )
+        for entry in result["heaviest_imports"]:
+            print(
+                f"   {entry['module']:<40} {entry['self_ms']:7.1f} ms "
+                f"(累積 {entry['cumulative_ms']:.1f} ms)"
+            )
+        print(
+            f"⏱️  ウェルカム表示: {result['time_to_banner_ms']:.1f} ms "
+            f"(予算 {args.banner_budget_ms:.0f} ms, {args.runs} 回の中央値)"
+        )
+        print(
+            f"⏱️  time-to-prompt: {result['time_to_prompt_ms']:.1f} ms "
+            f"(予算 {args.budget_ms:.0f} ms)"
+        )
+        print(f"🎯 最初の手: {result['first_move_ms']:.1f} ms")
+        if not result["within_budget"]:
+            print("❌ 起動時間が予算を超えました")
+    return 0 if result["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
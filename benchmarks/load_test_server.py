@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+ゲームサーバーの負荷試験
+ローカルの OpenAI 互換スタンドインサーバーを LLM の代わりに起動し、多数のセッションを
+同時に作成・対戦・終了させて、セッション数／秒と手の処理時間（p50 / p99）を計測する
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.server.app import PLAYER_FACTORIES, GameServer  # noqa: E402
+
+_MOVES = ("rock", "paper", "scissors")
+
+
+class Connection:
+    """keep-alive で 1 本の接続を使い回す最小限の HTTP クライアント"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(
+        self, method: str, path: str, body: Optional[dict] = None
+    ) -> Tuple[int, dict]:
+        """リクエストを送信して (ステータス, JSON) を返す"""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self._writer.write(
+            (
+                f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {self.host}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n"
+            ).encode("latin-1")
+            + data
+        )
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        length = 0
+        keep_alive = True
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "connection" and value.strip() == "close":
+                keep_alive = False
+        payload = json.loads(await self._reader.readexactly(length)) if length else {}
+        if not keep_alive:
+            await self.close()
+        return status, payload
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+async def run_client(
+    host: str,
+    port: int,
+    sessions: int,
+    rounds: int,
+    player: str,
+    latencies: List[float],
+) -> int:
+    """セッションを順に作成・対戦・終了し、エラー数を返す"""
+    connection = Connection(host, port)
+    errors = 0
+    try:
+        for i in range(sessions):
+            status, session = await connection.request(
+                "POST", "/sessions", {"player": player}
+            )
+            if status != 201:
+                errors += 1
+                continue
+            path = f"/sessions/{session['session_id']}"
+            for r in range(rounds):
+                start = time.perf_counter()
+                status, _ = await connection.request(
+                    "POST", path + "/moves", {"choice": _MOVES[(i + r) % 3]}
+                )
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+            await connection.request("DELETE", path)
+    finally:
+        await connection.close()
+    return errors
+
+
+def start_stub(latency: str) -> Tuple[subprocess.Popen, str]:
+    """
+    スタンドインサーバーを別プロセスで起動し、(プロセス, ベース URL) を返す
+
+    同じプロセスで動かすと GIL を奪い合い、ゲームサーバー側の処理時間が実際より悪く見える。
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-m", "src.ai.stub_server", "--port", "0"]
+    command += ["--latency", latency]
+    for move in _MOVES:
+        command += ["--answer", move]
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    process = subprocess.Popen(
+        command, cwd=root, env=env, stdout=subprocess.PIPE, text=True
+    )
+    # 起動時に "...: http://host:port/v1" を 1 行出力する
+    line = process.stdout.readline()
+    return process, line.rsplit(" ", 1)[-1].strip()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def load_test(args) -> dict:
+    """負荷試験を実行して結果を返す"""
+    server = None
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port
+    else:
+        server = GameServer(
+            port=0,
+            idle_timeout=args.idle_timeout,
+            max_sessions=args.max_sessions,
+            default_player=args.player,
+        )
+        await server.start()
+        host, port = server.host, server.port
+
+    latencies: List[float] = []
+    per_client = max(1, args.sessions // args.concurrency)
+    start = time.perf_counter()
+    errors = await asyncio.gather(
+        *(
+            run_client(host, port, per_client, args.rounds, args.player, latencies)
+            for _ in range(args.concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    stats = server.stats() if server is not None else None
+    if server is not None:
+        await server.stop()
+
+    sessions = per_client * args.concurrency
+    return {
+        "sessions": sessions,
+        "moves": len(latencies),
+        "errors": sum(errors),
+        "elapsed": elapsed,
+        "sessions_per_sec": sessions / elapsed,
+        "moves_per_sec": len(latencies) / elapsed,
+        "move_p50": _percentile(latencies, 0.50),
+        "move_p99": _percentile(latencies, 0.99),
+        "server": stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ゲームサーバーの負荷試験")
+    parser.add_argument("--sessions", type=int, default=2000, help="総セッション数")
+    parser.add_argument("--concurrency", type=int, default=200, help="同時接続数")
+    parser.add_argument(
+        "--rounds", type=int, default=5, help="セッションあたりの対戦数"
+    )
+    parser.add_argument("--player", choices=sorted(PLAYER_FACTORIES), default="llm")
+    parser.add_argument(
+        "--latency", default="lognormal:-3,0.5", help="スタンドインの応答時間分布"
+    )
+    parser.add_argument("--idle-timeout", type=float, default=60.0)
+    parser.add_argument("--max-sessions", type=int, default=100000)
+    parser.add_argument(
+        "--url",
+        default=None,
+        help="起動済みのゲームサーバーの URL（省略時は内部で起動）",
+    )
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力")
+    args = parser.parse_args(argv)
+
+    stub, base_url = start_stub(args.latency)
+    os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY") or "stub"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    try:
+        result = asyncio.run(load_test(args))
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print(f"🧪 スタンドイン: {base_url} (latency={args.latency})")
+    print(
+        f"📊 セッション: {result['sessions']}  対戦: {result['moves']}  "
+        f"エラー: {result['errors']}"
+    )
+    print(f"⏱️  所要時間: {result['elapsed']:.2f} 秒")
+    print(f"🚀 セッション/秒: {result['sessions_per_sec']:,.1f}")
+    print(f"🚀 対戦/秒: {result['moves_per_sec']:,.1f}")
+    print(
+        f"📈 手の処理時間: p50 {result['move_p50'] * 1000:.1f} ms / "
+        f"p99 {result['move_p99'] * 1000:.1f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
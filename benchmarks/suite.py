@@ -0,0 +1,248 @@
+"""
+run_benchmarks.py で実行するベンチマークの定義
+各ベンチマークは準備処理を行い、計測対象の関数（引数なし）と 1 回の呼び出しで
+処理する件数の組を返す。計測は run_benchmarks.py が行う
+"""
+
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from typing import Callable, Dict, NamedTuple, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ai.history import GameHistory  # noqa: E402
+from src.ai.metrics import LLMMetrics  # noqa: E402
+from src.ai.pattern import PatternAIPlayer  # noqa: E402
+from src.ai.player import LLMAIPlayer, RandomAIPlayer  # noqa: E402
+from src.game.engine import (  # noqa: E402
+    CHOICES_BY_CODE,
+    Choice,
+    RockPaperScissorsEngine,
+)
+from src.sim.simulator import play_match  # noqa: E402
+from src.stats.tracker import GameStatistics  # noqa: E402
+from src.ui.cli import CLIInterface  # noqa: E402
+
+# (計測対象の関数, 1 回の呼び出しで処理する件数)
+Workload = Tuple[Callable[[], object], int]
+
+
+class Benchmark(NamedTuple):
+    """登録されたベンチマーク"""
+
+    name: str
+    setup: Callable[[], Workload]
+    description: str
+
+
+# 名前 → ベンチマーク（登録順）
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """準備処理を BENCHMARKS に登録するデコレーター（docstring を説明に使う）"""
+
+    def register(setup: Callable[[], Workload]) -> Callable[[], Workload]:
+        BENCHMARKS[name] = Benchmark(name, setup, (setup.__doc__ or "").strip())
+        return setup
+
+    return register
+
+
+# 9 通りの手の組み合わせ
+_PAIRS = [(player, ai) for player in CHOICES_BY_CODE for ai in CHOICES_BY_CODE]
+
+
+def _fake_client(content: str = "rock"):
+    """常に同じ手を返す OpenAI クライアントの代わり（ネットワークを使わない）"""
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=120, completion_tokens=1),
+    )
+    create = lambda **kwargs: response  # noqa: E731
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+def _llm_player(history: int = 0) -> LLMAIPlayer:
+    """
+    偽のクライアントを使う LLMAIPlayer（環境変数のモード指定は無視する）
+
+    クライアントを直接渡すため、OPENAI_API_KEY は不要（プロセスの環境変数も変更しない）。
+    """
+    player = LLMAIPlayer(
+        "ベンチマーク",
+        combined_mode=False,
+        stream_mode=False,
+        constrained_mode=False,
+    )
+    player.metrics = LLMMetrics()
+    player._client = _fake_client()
+    for index in range(history):
+        player_choice, ai_choice = _PAIRS[index % len(_PAIRS)]
+        result = RockPaperScissorsEngine.determine_winner(player_choice, ai_choice)
+        player.record_game(player_choice, ai_choice, result.value)
+    return player
+
+
+@benchmark("engine.determine_winner")
+def engine_determine_winner() -> Workload:
+    """1 ラウンドずつの勝敗判定（9 通りの組み合わせ）"""
+    determine_winner = RockPaperScissorsEngine.determine_winner
+
+    def run():
+        for player_choice, ai_choice in _PAIRS:
+            determine_winner(player_choice, ai_choice)
+
+    return run, len(_PAIRS)
+
+
+@benchmark("engine.determine_winners")
+def engine_determine_winners() -> Workload:
+    """整数コード化した 10,000 ラウンドの一括判定"""
+    rounds = 10_000
+    player_moves = bytes(i % 3 for i in range(rounds))
+    ai_moves = bytes((i // 3) % 3 for i in range(rounds))
+    return (
+        lambda: RockPaperScissorsEngine.determine_winners(player_moves, ai_moves),
+        rounds,
+    )
+
+
+@benchmark("engine.from_string")
+def engine_from_string() -> Workload:
+    """入力文字列から手への変換（英語・日本語・ひらがな・全角）"""
+    inputs = ["rock", "Paper", "scissors", "グー", "ぱー", "ＲＯＣＫ", "ﾁｮｷ"]
+    from_string = Choice.from_string
+
+    def run():
+        for text in inputs:
+            from_string(text)
+
+    return run, len(inputs)
+
+
+@benchmark("prompt.build")
+def prompt_build() -> Workload:
+    """履歴 100 ラウンド分を持つ LLMAIPlayer のプロンプト構築"""
+    player = _llm_player(history=100)
+    return player._build_prompt, 1
+
+
+@benchmark("prompt.record_and_build")
+def prompt_record_and_build() -> Workload:
+    """1 ラウンドの記録（履歴とプロンプトの更新）と次のリクエストの構築"""
+    player = _llm_player(history=10)
+    pairs = iter(())
+
+    def run():
+        nonlocal pairs
+        player_choice, ai_choice = next(pairs, (None, None))
+        if player_choice is None:
+            pairs = iter(_PAIRS)
+            player_choice, ai_choice = next(pairs)
+        player.record_game(player_choice, ai_choice, "draw")
+        player._choice_request()
+
+    return run, 1
+
+
+@benchmark("history.append")
+def history_append() -> Workload:
+    """リングバッファ履歴への 1,000 ラウンドの記録"""
+    history = GameHistory(capacity=1024)
+    records = [
+        (player, ai, RockPaperScissorsEngine.determine_winner(player, ai).value)
+        for player, ai in _PAIRS
+    ] * 111
+
+    def run():
+        append = history.append
+        for record in records:
+            append(*record)
+
+    return run, len(records)
+
+
+@benchmark("history.record_with_stats")
+def history_record_with_stats() -> Workload:
+    """統計のオブザーバーを付けた AIPlayer.record_game の 999 ラウンド"""
+    player = RandomAIPlayer("ベンチマーク")
+    GameStatistics().attach(player)
+    records = [
+        (
+            player_choice,
+            ai,
+            RockPaperScissorsEngine.determine_winner(player_choice, ai).value,
+        )
+        for player_choice, ai in _PAIRS
+    ] * 111
+
+    def run():
+        record_game = player.record_game
+        for record in records:
+            record_game(*record)
+
+    return run, len(records)
+
+
+@benchmark("cli.display_result")
+def cli_display_result() -> Workload:
+    """結果表示（標準出力は破棄）"""
+    cli = CLIInterface(language="ja")
+    sink = io.StringIO()
+
+    def run():
+        with redirect_stdout(sink):
+            cli.display_result(
+                Choice.ROCK,
+                Choice.SCISSORS,
+                RockPaperScissorsEngine.determine_winner(Choice.ROCK, Choice.SCISSORS),
+            )
+        sink.seek(0)
+        sink.truncate()
+
+    return run, 1
+
+
+@benchmark("llm.make_choice")
+def llm_make_choice() -> Workload:
+    """偽のクライアントを相手にした LLMAIPlayer.make_choice（計測・保護処理を含む）"""
+    player = _llm_player(history=20)
+    return player.make_choice, 1
+
+
+@benchmark("game.round_e2e")
+def game_round_e2e() -> Workload:
+    """CLI の 1 ラウンド（入力の変換 → LLM の手 → 判定 → 記録 → 表示）"""
+    player = _llm_player(history=20)
+    cli = CLIInterface(language="ja")
+    sink = io.StringIO()
+    determine_winner = RockPaperScissorsEngine.determine_winner
+
+    def run():
+        player_choice = Choice.from_string("グー")
+        ai_choice = player.make_choice()
+        result = determine_winner(player_choice, ai_choice)
+        player.record_game(player_choice, ai_choice, result.value)
+        with redirect_stdout(sink):
+            cli.display_result(player_choice, ai_choice, result)
+        sink.seek(0)
+        sink.truncate()
+
+    return run, 1
+
+
+@benchmark("sim.pattern_vs_random")
+def sim_pattern_vs_random() -> Workload:
+    """パターン学習 AI 対ランダム AI の 1,000 ラウンドの対戦"""
+    rounds = 1000
+
+    def run():
+        play_match(PatternAIPlayer("A"), RandomAIPlayer("B"), rounds)
+
+    return run, rounds
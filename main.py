@@ -5,15 +5,56 @@ LLM じゃんけんゲーム - メインエントリーポイント
 """
 
 import os
+import threading
 
-from dotenv import load_dotenv
 
-from src.ai.player import LLMAIPlayer
-from src.ui.cli import CLIInterface
+def _preload_openai():
+    """
+    openai パッケージの import をバックグラウンドで開始
+
+    openai の import は起動処理の中で最も重いため、ウェルカム表示や入力待ちと並行させ、
+    最初の手の決定時に待たされないようにする。
+    """
+
+    def load():
+        try:
+            import openai  # noqa: F401
+        except Exception:
+            # 失敗した場合は実際の呼び出し時にエラーとして扱う
+            pass
+
+    threading.Thread(target=load, name="openai-preload", daemon=True).start()
+
+
+def _create_ai_player(cli):
+    """
+    AI プレイヤーを生成し、クライアント初期化と心理戦メッセージの取得を開始
+
+    AI プレイヤーの import は重いため、ウェルカム表示と並行してバックグラウンドで呼ぶ。
+    """
+    from src.ai.config import env_flag
+    from src.ai.player import LLMAIPlayer
+
+    llm_player = LLMAIPlayer(name="GPT じゃんけんマスター", language=cli.language)
+    if env_flag('OPENAI_TIERED_MODE'):
+        from src.ai.tiered import TieredAIPlayer
+
+        # ローカル予測が不確かな場合だけ LLM に手を問い合わせる
+        ai_player = TieredAIPlayer(name="GPT じゃんけんマスター", remote=llm_player)
+    else:
+        ai_player = llm_player
+    cli.prefetch_psychological_message(ai_player)
+    return ai_player
 
 
 def main():
     """メイン関数"""
+    # 最初の入力までに必要なものだけを読み込む（AI プレイヤーなどは必要になった時点で import）
+    from dotenv import load_dotenv
+
+    from src.ai.background import run_in_daemon_thread
+    from src.ui.cli import CLIInterface
+
     # 環境変数を読み込み
     load_dotenv()
     
@@ -21,20 +62,44 @@ def main():
     openai_key = os.getenv('OPENAI_API_KEY')
     
     # CLI インターフェースを初期化
-    cli = CLIInterface(language='ja')
+    message_timeout = float(os.getenv('PSYCHOLOGICAL_MESSAGE_TIMEOUT', '2.0'))
+    cli = CLIInterface(language='ja', message_timeout=message_timeout)
     
     # AIプレイヤーを初期化（OpenAI APIキーが必須）
     if openai_key:
         print("🤖 OpenAI APIを使用したAIプレイヤーを使用します")
-        ai_player = LLMAIPlayer(name="GPT じゃんけんマスター")
+        # openai の読み込みを先に始め、AI プレイヤーの生成と並行させる
+        _preload_openai()
+        # AI プレイヤーの生成と心理戦メッセージの取得をウェルカム表示より先に開始し、
+        # 表示の間に import と API の往復を進める
+        player_future = run_in_daemon_thread(
+            lambda: _create_ai_player(cli), name="ai-player-init"
+        )
+        cli.display_welcome()
+        ai_player = player_future.result()
     else:
         print("⚠️  OpenAI API キーが設定されていません。")
         print("📝 .env ファイルを作成してAPI キーを設定してください。")
         print("例: cp .env.example .env")
         return
     
+    # GAME_LOG_PATH を設定した場合は結果をバイナリログに追記（セッション ID は開始時刻）
+    game_log_path = os.getenv('GAME_LOG_PATH')
+    game_log = None
+    if game_log_path:
+        import time
+
+        from src.ai.game_log import GameLogWriter
+
+        game_log = GameLogWriter(game_log_path)
+        ai_player.add_observer(game_log.observer(time.time_ns()))
+
     # 1回のゲームを実行
-    cli.run_single_game(ai_player)
+    try:
+        cli.run_single_game(ai_player)
+    finally:
+        if game_log is not None:
+            game_log.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
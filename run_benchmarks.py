@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク実行スクリプト
+benchmarks/suite.py に登録したベンチマークをウォームアップ後に繰り返し計測し、
+保存済みのベースライン（JSON）と比べて一定以上遅くなったものを検出する
+
+使い方:
+    python run_benchmarks.py                      # 計測してベースラインと比較
+    python run_benchmarks.py --save-baseline      # 計測結果をベースラインとして保存
+    python run_benchmarks.py --filter engine      # 名前に engine を含むものだけ計測
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from benchmarks.suite import BENCHMARKS, Benchmark  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# 既定の許容範囲（ベースラインの中央値から 10% 以上遅くなったら劣化とみなす）
+DEFAULT_THRESHOLD = 0.10
+
+# 中央値の差がノイズ（中央値の標準誤差）のこの倍数を超えた場合だけ劣化とみなす
+# （計測の揺れだけで閾値を超えたものを劣化と判定しないため）
+NOISE_FACTOR = 3.0
+
+# 1 周あたりの計測の繰り返し回数と、1 回の計測のおおよその時間（秒）
+DEFAULT_REPEAT = 10
+MIN_TIME = 0.05
+
+# 計測前のウォームアップに使う最小の時間（秒）
+WARMUP_TIME = 0.1
+
+# メモリのピークはこのバイト数以上増えた場合だけ劣化とみなす（小さな揺れを無視する）
+MEMORY_TOLERANCE_BYTES = 1024
+
+# 全ベンチマークを何周計測するか（周ごとに順番をずらし、実行順や一時的な負荷の影響を減らす）
+DEFAULT_PASSES = 3
+
+
+def measure(
+    bench: Benchmark,
+    repeat: int = DEFAULT_REPEAT,
+    warmup: int = 3,
+    min_time: float = MIN_TIME,
+) -> dict:
+    """
+    ベンチマークを計測
+
+    ガベージコレクションで前のベンチマークの残りを片付け、少なくとも warmup 回かつ
+    WARMUP_TIME 秒呼び出した後、1 回の計測がおよそ min_time 秒になる呼び出し回数を決め、
+    repeat 回計測する。メモリのピークは別に 1 回だけ tracemalloc の下で呼び出して求める。
+
+    Returns:
+        dict: 1 件あたりの時間（ナノ秒）の計測値（samples_ns）と、
+        1 回の呼び出しで一時的に確保されたメモリのピーク（バイト）
+    """
+    func, ops = bench.setup()
+    gc.collect()
+    calls = 0
+    deadline = time.perf_counter() + WARMUP_TIME
+    while calls < warmup or time.perf_counter() < deadline:
+        func()
+        calls += 1
+
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    # 1 回の計測がおよそ min_time 秒になるよう呼び出し回数を合わせる
+    number = max(1, round(number * min_time / max(elapsed, 1e-9)))
+    samples = [
+        elapsed / (number * ops) * 1e9
+        for elapsed in timer.repeat(repeat=repeat, number=number)
+    ]
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "samples_ns": samples,
+        "ops": ops,
+        "number": number,
+        "peak_bytes": peak - baseline,
+    }
+
+
+def summarize(samples: List[float]) -> dict:
+    """
+    計測値の中央値・最小値と、中央値の標準誤差（ナノ秒）を求める
+
+    標準誤差は外れ値に強い MAD（中央絶対偏差）から正規分布を仮定して推定する。
+    """
+    median = statistics.median(samples)
+    mad = statistics.median(abs(sample - median) for sample in samples)
+    # MAD × 1.4826 で標準偏差、× 1.2533 / √n で中央値の標準誤差になる
+    noise = 1.4826 * mad * 1.2533 / math.sqrt(len(samples))
+    return {
+        "median_ns": median,
+        "min_ns": min(samples),
+        "noise_ns": noise,
+        "samples": len(samples),
+    }
+
+
+def run_passes(
+    benches: List[Benchmark],
+    passes: int = DEFAULT_PASSES,
+    repeat: int = DEFAULT_REPEAT,
+    warmup: int = 3,
+) -> Dict[str, dict]:
+    """
+    benches を passes 周計測し、ベンチマークごとに全周の計測値をまとめて集計する
+
+    周ごとに開始位置をずらすため、どのベンチマークも直前に実行されるものが変わる。
+    周をまたいだ揺れも中央値の標準誤差に含まれる。
+    """
+    samples: Dict[str, List[float]] = {bench.name: [] for bench in benches}
+    peaks: Dict[str, int] = {}
+    for offset in range(passes):
+        start = offset % len(benches)
+        for bench in benches[start:] + benches[:start]:
+            result = measure(bench, repeat=repeat, warmup=warmup)
+            samples[bench.name].extend(result["samples_ns"])
+            peaks[bench.name] = min(
+                peaks.get(bench.name, result["peak_bytes"]), result["peak_bytes"]
+            )
+    return {
+        name: dict(summarize(values), peak_bytes=peaks[name])
+        for name, values in samples.items()
+    }
+
+
+def compare(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    threshold: float,
+    noise_factor: float = NOISE_FACTOR,
+) -> Dict[str, List[str]]:
+    """
+    ベースラインと比較
+
+    中央値が threshold を超えて遅くなり、かつその差が両者の標準誤差を合わせた
+    ノイズの noise_factor 倍を超えた場合に劣化とみなす。
+
+    Returns:
+        Dict[str, List[str]]: threshold を超えて遅くなった、またはメモリが増えた
+        ベンチマーク名 → 劣化の内容
+    """
+    regressions: Dict[str, List[str]] = {}
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        ratio = result["median_ns"] / reference["median_ns"]
+        result["ratio"] = ratio
+        noise = math.hypot(result["noise_ns"], reference.get("noise_ns", 0.0))
+        problems = []
+        if (
+            ratio > 1 + threshold
+            and result["median_ns"] - reference["median_ns"] > noise_factor * noise
+        ):
+            problems.append(
+                f"{reference['median_ns']:.1f} ns → {result['median_ns']:.1f} ns "
+                f"(x{ratio:.2f}, ノイズ ±{noise:.1f} ns)"
+            )
+        reference_peak = reference.get("peak_bytes", 0)
+        if result["peak_bytes"] - reference_peak >= MEMORY_TOLERANCE_BYTES and result[
+            "peak_bytes"
+        ] > reference_peak * (1 + threshold):
+            problems.append(
+                f"メモリのピーク {reference_peak} B → {result['peak_bytes']} B"
+            )
+        if problems:
+            regressions[name] = problems
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict[str, dict]]:
+    """ベースラインを読み込む（無ければ None）"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["benchmarks"]
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: str, results: Dict[str, dict]):
+    """計測結果をベースラインとして保存（既存の他のベンチマークの値は残す）"""
+    benchmarks = load_baseline(path) or {}
+    for name, result in results.items():
+        benchmarks[name] = {
+            "median_ns": round(result["median_ns"], 2),
+            "min_ns": round(result["min_ns"], 2),
+            "noise_ns": round(result["noise_ns"], 2),
+            "samples": result["samples"],
+            "peak_bytes": result["peak_bytes"],
+        }
+    data = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "benchmarks": dict(sorted(benchmarks.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="ベンチマークの実行と劣化の検出")
+    parser.add_argument("--filter", default=None, help="名前にこの文字列を含むものだけ")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="1 周あたりの計測の繰り返し回数",
+    )
+    parser.add_argument(
+        "--passes",
+        type=int,
+        default=DEFAULT_PASSES,
+        help="全ベンチマークを計測する周回数",
+    )
+    parser.add_argument("--warmup", type=int, default=3, help="ウォームアップの回数")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="劣化とみなす中央値の増加率（0.1 なら 10%%）",
+    )
+    parser.add_argument(
+        "--noise-factor",
+        type=float,
+        default=NOISE_FACTOR,
+        help="劣化とみなすのに必要な、差とノイズ（標準誤差）の比",
+    )
+    parser.add_argument(
+        "--baseline", default=DEFAULT_BASELINE, help="ベースラインの JSON"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="計測結果をベースラインとして保存"
+    )
+    parser.add_argument("--list", action="store_true", help="ベンチマークの一覧を表示")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力")
+    args = parser.parse_args(argv)
+
+    selected = [
+        bench
+        for name, bench in BENCHMARKS.items()
+        if args.filter is None or args.filter in name
+    ]
+    if args.list:
+        for bench in selected:
+            print(f"{bench.name:<28} {bench.description}")
+        return 0
+    if not selected:
+        print(f"❌ '{args.filter}' に一致するベンチマークがありません。")
+        return 1
+
+    if not args.json:
+        print("⏱️  LLM じゃんけんゲーム - ベンチマーク実行")
+        print("=" * 50)
+
+    results = run_passes(selected, args.passes, args.repeat, args.warmup)
+    if not args.json:
+        for name, result in results.items():
+            print(
+                f"{name:<28} {result['median_ns']:>12,.1f} ns/件 "
+                f"(±{result['noise_ns']:,.1f}, 最小 {result['min_ns']:,.1f})  "
+                f"ピーク {result['peak_bytes']:>8,} B"
+            )
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        if not args.json:
+            print(f"\n💾 ベースラインを保存しました: {args.baseline}")
+        else:
+            print(json.dumps({"results": results}, indent=2, ensure_ascii=False))
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    regressions = (
+        compare(results, baseline, args.threshold, args.noise_factor)
+        if baseline
+        else {}
+    )
+
+    if args.json:
+        print(
+            json.dumps(
+                {"results": results, "regressions": regressions},
+                indent=2,
+                ensure_ascii=False,
+            )
+        )
+        return 1 if regressions else 0
+
+    print("\n" + "=" * 50)
+    if baseline is None:
+        print("📝 ベースラインがありません。--save-baseline で保存してください。")
+        return 0
+    for name, result in results.items():
+        if "ratio" in result:
+            print(f"  {name:<28} x{result['ratio']:.2f}")
+    if regressions:
+        print("\n❌ 許容範囲を超える劣化があります:")
+        for name, problems in regressions.items():
+            for problem in problems:
+                print(f"  - {name}: {problem}")
+        return 1
+    print("\n✅ ベースラインからの劣化はありません。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+LLM じゃんけんゲーム - AI 対 AI シミュレーション実行スクリプト
+"""
+
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+from src.sim.simulator import PLAYER_TYPES, run_simulation
+
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(
+        description="AI 同士のじゃんけん対戦シミュレーション"
+    )
+    parser.add_argument("--player-a", choices=sorted(PLAYER_TYPES), default="random")
+    parser.add_argument("--player-b", choices=sorted(PLAYER_TYPES), default="random")
+    parser.add_argument(
+        "--rounds", type=int, default=1000, help="1 試合あたりのラウンド数"
+    )
+    parser.add_argument("--matches", type=int, default=100, help="試合数")
+    parser.add_argument("--seed", type=int, default=None, help="再現用の乱数シード")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="プロセス数（1 で同一プロセス実行）"
+    )
+    parser.add_argument("--verbose", action="store_true", help="試合ごとの結果を表示")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """メイン関数"""
+    load_dotenv()
+    args = parse_args(argv)
+
+    report = run_simulation(
+        PLAYER_TYPES[args.player_a],
+        PLAYER_TYPES[args.player_b],
+        rounds=args.rounds,
+        matches=args.matches,
+        seed=args.seed,
+        max_workers=args.workers,
+    )
+
+    if args.verbose:
+        for match in report.matches:
+            print(
+                f"試合 {match.match_id}: A {match.a_wins} 勝 / B {match.b_wins} 勝 / "
+                f"引き分け {match.draws} (seed={match.seed})"
+            )
+
+    print(f"🎲 シード: {report.seed}")
+    print(f"📊 試合数: {len(report.matches)}  合計ラウンド: {report.total_rounds}")
+    print(
+        f"⏱️  所要時間: {report.elapsed:.3f} 秒 ({report.rounds_per_sec:,.0f} ラウンド/秒)"
+    )
+    print(
+        f"🏆 勝率: A ({args.player_a}) {report.a_win_rate:.1%} / "
+        f"B ({args.player_b}) {report.b_win_rate:.1%} / 引き分け {report.draw_rate:.1%}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
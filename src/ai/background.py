@@ -0,0 +1,31 @@
+"""
+バックグラウンド実行の共通処理
+API 呼び出しなどを呼び出し元を待たせずに実行し、結果を Future で受け取る
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def run_in_daemon_thread(func: Callable[[], T], name: Optional[str] = None) -> Future:
+    """
+    関数をデーモンスレッドで実行し、結果を Future で返す
+
+    API が応答しないまま残った呼び出しがプロセス終了を待たせないよう、
+    終了時に join される ThreadPoolExecutor ではなくデーモンスレッドを使う。
+    """
+    future: Future = Future()
+
+    def runner():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=runner, name=name, daemon=True).start()
+    return future
@@ -0,0 +1,247 @@
+"""
+LLM の手の決定結果をキャッシュするモジュール
+直近の履歴ウィンドウとモデル名をキーにして、同じ局面での API 呼び出しを省く
+"""
+
+import atexit
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..game.engine import CHOICES_BY_CODE, Choice
+
+# キャッシュの動作モード
+MODE_EXACT = "exact"  # 最後に得た手をそのまま返す
+MODE_SAMPLE = "sample"  # 過去の回答の分布からサンプリングして返す
+
+
+class _Entry:
+    """キャッシュエントリ（手ごとの回答回数と最終更新時刻）"""
+
+    __slots__ = ("counts", "last", "updated_at")
+
+    def __init__(self, counts: List[int], last: int, updated_at: float):
+        self.counts = counts
+        self.last = last
+        self.updated_at = updated_at
+
+
+class DecisionCache:
+    """
+    サイズ上限付き LRU + 任意の TTL + SQLite 永続化を備えた手の決定キャッシュ
+
+    Args:
+        max_size: メモリ上に保持するエントリ数の上限（超えると LRU で破棄）
+        ttl: エントリの有効期間（秒）。None の場合は無期限
+        path: SQLite ファイルのパス。指定すると再起動後もキャッシュが残る
+        mode: MODE_EXACT（最後の回答）または MODE_SAMPLE（回答分布から抽選）
+        min_samples: MODE_SAMPLE で分布から返すのに必要な回答数
+        clock: 現在時刻を返す関数（テスト用）
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None,
+        mode: str = MODE_EXACT,
+        min_samples: int = 1,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size は 1 以上である必要があります。")
+        if mode not in (MODE_EXACT, MODE_SAMPLE):
+            raise ValueError(f"不明なキャッシュモードです: '{mode}'")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.mode = mode
+        self.min_samples = max(1, min_samples)
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS decisions ("
+                "key TEXT PRIMARY KEY, rock INTEGER, paper INTEGER, "
+                "scissors INTEGER, last INTEGER, updated_at REAL)"
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["DecisionCache"]:
+        """
+        環境変数から生成（いずれも未設定なら None）
+
+        OPENAI_DECISION_CACHE_PATH, OPENAI_DECISION_CACHE_TTL,
+        OPENAI_DECISION_CACHE_MODE, OPENAI_DECISION_CACHE_SIZE を読み取る。
+        """
+        path = os.getenv("OPENAI_DECISION_CACHE_PATH")
+        ttl = os.getenv("OPENAI_DECISION_CACHE_TTL")
+        mode = os.getenv("OPENAI_DECISION_CACHE_MODE")
+        size = os.getenv("OPENAI_DECISION_CACHE_SIZE")
+        if not (path or ttl or mode or size):
+            return None
+        return cls(
+            max_size=int(size) if size else 1024,
+            ttl=float(ttl) if ttl else None,
+            path=path or None,
+            mode=mode or MODE_EXACT,
+        )
+
+    @staticmethod
+    def make_key(model: str, history: Sequence[tuple]) -> str:
+        """
+        モデル名と履歴ウィンドウから正規化したキーを生成
+
+        Args:
+            model: モデル名
+            history: (player_choice, ai_choice, result) の並び（直近 max_history 件）
+        """
+        rounds = ",".join(
+            f"{player_choice.code}{ai_choice.code}{str(result).strip().lower()}"
+            for player_choice, ai_choice, result in history
+        )
+        return f"{model}|{rounds}"
+
+    def _expired(self, entry: _Entry) -> bool:
+        return self.ttl is not None and self._clock() - entry.updated_at > self.ttl
+
+    def _load(self, key: str) -> Optional[_Entry]:
+        """SQLite からエントリを読み込む"""
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT rock, paper, scissors, last, updated_at FROM decisions WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return _Entry([row[0], row[1], row[2]], row[3], row[4])
+
+    def _store(self, key: str, entry: _Entry):
+        """SQLite にエントリを書き込む"""
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO decisions VALUES (?, ?, ?, ?, ?, ?)",
+            (key, *entry.counts, entry.last, entry.updated_at),
+        )
+        self._db.commit()
+
+    def _remember(self, key: str, entry: _Entry):
+        """メモリ上の LRU に追加し、上限を超えた分を破棄"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is not None:
+                self._remember(key, entry)
+        else:
+            self._entries.move_to_end(key)
+
+        if entry is not None and self._expired(entry):
+            self._entries.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM decisions WHERE key = ?", (key,))
+                self._db.commit()
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[Choice]:
+        """キャッシュされた手を取得（見つからない場合はNone）"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None or (
+                self.mode == MODE_SAMPLE and sum(entry.counts) < self.min_samples
+            ):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            if self.mode == MODE_SAMPLE:
+                return random.choices(CHOICES_BY_CODE, weights=entry.counts)[0]
+            return CHOICES_BY_CODE[entry.last]
+
+    def put(self, key: str, choice: Choice):
+        """LLM が決めた手をキャッシュに追加"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                entry = _Entry([0, 0, 0], choice.code, self._clock())
+            entry.counts[choice.code] += 1
+            entry.last = choice.code
+            entry.updated_at = self._clock()
+            self._remember(key, entry)
+            self._store(key, entry)
+
+    def stats(self) -> Dict[str, float]:
+        """ヒット・ミスなどの統計を取得"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def clear(self):
+        """メモリ上と永続化先のキャッシュを全て削除"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM decisions")
+                self._db.commit()
+
+    def close(self):
+        """永続化先の接続を閉じる"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# 全ての LLMAIPlayer で共有する既定の決定キャッシュ（遅延初期化）
+_shared_cache: Optional[DecisionCache] = None
+_shared_cache_loaded = False
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_decision_cache() -> Optional[DecisionCache]:
+    """
+    共有の決定キャッシュを取得（環境変数で設定していなければ None）
+
+    最初に呼ばれた時点の環境変数から生成し（src.ai.config を参照）、
+    SQLite の接続はプロセス終了時に閉じる。
+    """
+    global _shared_cache, _shared_cache_loaded
+    if not _shared_cache_loaded:
+        with _shared_cache_lock:
+            if not _shared_cache_loaded:
+                cache = DecisionCache.from_env()
+                if cache is not None:
+                    atexit.register(cache.close)
+                _shared_cache = cache
+                _shared_cache_loaded = True
+    return _shared_cache
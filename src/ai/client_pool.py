@@ -0,0 +1,227 @@
+"""
+プロセス全体で共有する OpenAI クライアントのレジストリ
+API キー・ベース URL・モデルごとに 1 つのクライアント（接続プール）を使い回し、
+多数のセッションが少数の確立済み接続を共有できるようにする
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+from .config import env_flag
+
+ClientKey = Tuple[str, Optional[str], Optional[str]]
+
+DEFAULT_POOL_SIZE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+def _http2_available() -> bool:
+    """HTTP/2 に必要な h2 パッケージが導入されているか"""
+    return importlib.util.find_spec("h2") is not None
+
+
+class ClientRegistry:
+    """
+    OpenAI / AsyncOpenAI クライアントのスレッドセーフなレジストリ
+
+    httpx が利用できる場合は接続プールの大きさ・keep-alive の保持時間・HTTP/2 を
+    指定した HTTP クライアントを渡す。利用できない場合は openai パッケージの既定の
+    HTTP クライアントを使う（共有による接続の使い回しは同様に効く）。
+    非同期クライアントはイベントループに紐づくため、ループごとに保持する。
+
+    Args:
+        pool_size: keep-alive で保持する接続数の上限（省略時は環境変数 OPENAI_POOL_SIZE）
+        keepalive_expiry: 未使用の接続を保持する秒数（省略時は OPENAI_KEEPALIVE_EXPIRY）
+        http2: h2 が導入されていれば HTTP/2 を使う（省略時は OPENAI_HTTP2、既定 true）
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
+        if pool_size is None:
+            pool_size = int(os.getenv("OPENAI_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+        if keepalive_expiry is None:
+            keepalive_expiry = float(
+                os.getenv("OPENAI_KEEPALIVE_EXPIRY", str(DEFAULT_KEEPALIVE_EXPIRY))
+            )
+        if http2 is None:
+            http2 = env_flag("OPENAI_HTTP2", default=True)
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self._lock = threading.Lock()
+        self._clients: Dict[ClientKey, Any] = {}
+        self._async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._created = 0
+        self._reused = 0
+
+    def _http_client(self, asynchronous: bool = False):
+        """接続プールを設定した httpx クライアントを生成（httpx が無ければ None）"""
+        try:
+            import httpx
+            from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+        except ImportError:
+            return None
+
+        limits = httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        client_cls = DefaultAsyncHttpxClient if asynchronous else DefaultHttpxClient
+        return client_cls(limits=limits, http2=self.http2 and _http2_available())
+
+    def _client_options(self, base_url: Optional[str], asynchronous: bool) -> dict:
+        """OpenAI クライアントの生成オプション"""
+        options = {}
+        if base_url:
+            options["base_url"] = base_url
+        http_client = self._http_client(asynchronous)
+        if http_client is not None:
+            options["http_client"] = http_client
+        return options
+
+    def get(
+        self, api_key: str, base_url: Optional[str] = None, model: Optional[str] = None
+    ):
+        """同期クライアント（OpenAI）を取得。無ければ生成して登録する"""
+        key = (api_key, base_url, model)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._reused += 1
+                return client
+
+            from openai import OpenAI
+
+            client = OpenAI(
+                api_key=api_key, **self._client_options(base_url, asynchronous=False)
+            )
+            self._clients[key] = client
+            self._created += 1
+            return client
+
+    def get_async(
+        self, api_key: str, base_url: Optional[str] = None, model: Optional[str] = None
+    ):
+        """
+        非同期クライアント（AsyncOpenAI）を取得
+
+        実行中のイベントループごとに別のクライアントを保持する。
+        ループの外から呼ばれた場合は登録せずに新しいクライアントを返す。
+        """
+        from openai import AsyncOpenAI
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        key = (api_key, base_url, model)
+        with self._lock:
+            clients = self._async_clients.get(loop) if loop is not None else None
+            if clients is not None and key in clients:
+                self._reused += 1
+                return clients[key]
+
+            client = AsyncOpenAI(
+                api_key=api_key, **self._client_options(base_url, asynchronous=True)
+            )
+            self._created += 1
+            if loop is not None:
+                self._async_clients.setdefault(loop, {})[key] = client
+            return client
+
+    def warm_up(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        connect: bool = False,
+    ) -> bool:
+        """
+        クライアントを事前に生成する
+
+        connect=True の場合はモデル一覧を取得して接続（TLS ハンドシェイク）まで済ませる。
+
+        Returns:
+            bool: 成功した場合 True
+        """
+        try:
+            client = self.get(api_key, base_url, model)
+            if connect:
+                client.models.list()
+        except Exception:
+            return False
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """登録済みクライアント数と生成・再利用回数を取得"""
+        with self._lock:
+            async_clients = sum(
+                len(clients) for clients in self._async_clients.values()
+            )
+            return {
+                "clients": len(self._clients),
+                "async_clients": async_clients,
+                "created": self._created,
+                "reused": self._reused,
+            }
+
+    def clear(self):
+        """登録済みのクライアントを閉じずに破棄する"""
+        with self._lock:
+            self._clients.clear()
+            self._async_clients.clear()
+
+    def close_all(self):
+        """同期クライアントの接続を閉じて登録を破棄する（非同期クライアントは破棄のみ）"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._async_clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    async def aclose_all(self):
+        """実行中のイベントループの非同期クライアントを閉じた上で close_all を行う"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = list(self._async_clients.pop(loop, {}).values())
+        for client in clients:
+            try:
+                await client.close()
+            except Exception:
+                pass
+        self.close_all()
+
+    def __len__(self) -> int:
+        return self.stats()["clients"]
+
+
+# 全ての LLMAIPlayer で共有する既定のレジストリ（遅延初期化）
+_shared_registry: Optional[ClientRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """共有のレジストリを取得（最初に呼ばれた時点の環境変数から生成。src.ai.config を参照）"""
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_registry_lock:
+            if _shared_registry is None:
+                registry = ClientRegistry()
+                atexit.register(registry.close_all)
+                _shared_registry = registry
+    return _shared_registry
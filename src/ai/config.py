@@ -0,0 +1,17 @@
+"""
+環境変数による設定の読み取り
+
+共有のクライアントレジストリ・レート制限・決定キャッシュは import 時ではなく、
+最初に使われた時点の環境変数から生成する。main() の中で .env を読み込む
+エントリーポイント（main.py や src.server.app）でも設定を反映させるため。
+"""
+
+import os
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """環境変数の真偽値（1/true/yes/on）を読み取る（未設定なら default）"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
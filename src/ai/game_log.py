@@ -0,0 +1,364 @@
+"""
+ゲーム結果の追記専用バイナリログ
+record_game ごとにセッション ID・ラウンド・両者の手・結果を固定長 16 バイトで追記し、
+まとめて fsync する（グループコミット）。読み出しは mmap でファイルを写像して走査する
+"""
+
+import mmap
+import os
+import struct
+import threading
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from ..game.engine import (
+    CHOICES_BY_CODE,
+    RESULT_CODES,
+    RESULT_CUSTOM,
+    RESULT_VALUES_BY_CODE,
+    Choice,
+)
+
+# ファイル先頭のヘッダー（マジック, バージョン, 予約）。レコードの境界を 16 バイトに揃える
+LOG_MAGIC = b"JKNLOG"
+LOG_VERSION = 1
+HEADER = struct.Struct("<6sHQ")
+
+# セッション ID, ラウンド番号, プレイヤーの手, AI の手, 結果コード, パディング
+RECORD = struct.Struct("<QIbbbx")
+
+# AIPlayer.record_game のオブザーバー（プレイヤー, プレイヤーの手, AI の手, 結果）
+GameObserver = Callable[[object, Choice, Choice, str], None]
+
+
+class GameLogRecord(NamedTuple):
+    """ログの 1 レコード（結果は標準外の文字列で記録された場合 None）"""
+
+    session_id: int
+    round: int
+    player_choice: Choice
+    ai_choice: Choice
+    result: Optional[str]
+
+
+class GameLogWriter:
+    """
+    ゲーム結果の追記専用ログ（スレッドセーフ）
+
+    append はメモリ上のバッファに詰めるだけで、batch_size 件たまるか flush_interval 秒
+    経過したときに 1 回の write と fsync でまとめてコミットする。コミット中に到着した
+    レコードは次のコミットにまとめられ、sync を呼んだ複数のスレッドは 1 回の fsync を共有する。
+    既存のファイルに追記する場合、途中で途切れた末尾のレコードは切り捨てる。
+
+    Args:
+        path: ログファイルのパス
+        batch_size: この件数たまったらコミットする
+        flush_interval: 最後のコミットからこの秒数でバックグラウンドでコミットする
+            （None ならバックグラウンドのコミットを行わない）
+        fsync: コミットごとに fsync する（False ならページキャッシュへの書き込みまで）
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 1024,
+        flush_interval: Optional[float] = 0.05,
+        fsync: bool = True,
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size は 1 以上である必要があります。")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._file = open(path, "a+b")
+        self._prepare_file()
+        self._condition = threading.Condition()
+        self._buffer = bytearray()
+        self._pending = 0
+        # 追記済み・コミット済みのレコード数（このインスタンスでの通し番号）
+        self._appended = 0
+        self._committed = 0
+        self._committing = False
+        self._commits = 0
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+
+    def _prepare_file(self):
+        """新規ファイルにはヘッダーを書き、既存ファイルは検証して途切れたレコードを除く"""
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.write(HEADER.pack(LOG_MAGIC, LOG_VERSION, 0))
+            self._file.flush()
+            return
+        self._file.seek(0)
+        _check_header(self._file.read(HEADER.size))
+        torn = (size - HEADER.size) % RECORD.size
+        if torn:
+            self._file.truncate(size - torn)
+
+    def append(
+        self,
+        session_id: int,
+        round_number: int,
+        player_choice: Choice,
+        ai_choice: Choice,
+        result: str,
+    ) -> int:
+        """
+        レコードを追記（バッファに詰めるだけで待たない）
+
+        Returns:
+            int: sync に渡せるレコードの通し番号
+        """
+        record = RECORD.pack(
+            session_id,
+            round_number,
+            player_choice.code,
+            ai_choice.code,
+            RESULT_CODES.get(result, RESULT_CUSTOM),
+        )
+        with self._condition:
+            if self._closed:
+                raise ValueError("閉じたログには追記できません。")
+            self._buffer += record
+            self._pending += 1
+            self._appended += 1
+            sequence = self._appended
+            full = self._pending >= self.batch_size
+            if self._flusher is None and self.flush_interval is not None:
+                self._start_flusher()
+        if full:
+            self._commit(sequence)
+        return sequence
+
+    def observer(self, session_id: int) -> GameObserver:
+        """AIPlayer.add_observer に渡すオブザーバーを生成（ラウンドは履歴の通算件数）"""
+
+        def observe(player, player_choice: Choice, ai_choice: Choice, result: str):
+            self.append(
+                session_id,
+                player.game_history.total_recorded,
+                player_choice,
+                ai_choice,
+                result,
+            )
+
+        return observe
+
+    def sync(self, sequence: Optional[int] = None):
+        """sequence 番（省略時はこれまでの全て）のレコードがコミットされるまで待つ"""
+        with self._condition:
+            if sequence is None:
+                sequence = self._appended
+        self._commit(sequence)
+
+    def _commit(self, sequence: int):
+        """
+        sequence 番までをコミット（グループコミット）
+
+        他のスレッドがコミット中なら完了を待ち、それで足りなければ自らたまった分を
+        まとめて書き込む。
+        """
+        with self._condition:
+            while self._committed < sequence:
+                if not self._committing:
+                    break
+                self._condition.wait()
+            else:
+                return
+            data = self._buffer
+            end = self._appended
+            self._buffer = bytearray()
+            self._pending = 0
+            self._committing = True
+
+        try:
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except BaseException:
+            with self._condition:
+                # 書き込めなかった分はバッファの先頭に戻して次のコミットで再試行する
+                self._buffer[:0] = data
+                self._pending = self._appended - self._committed
+                self._committing = False
+                self._condition.notify_all()
+            raise
+        with self._condition:
+            self._committed = end
+            self._commits += 1
+            self._committing = False
+            self._condition.notify_all()
+
+    def _start_flusher(self):
+        """flush_interval ごとにコミットするデーモンスレッドを開始（ロック取得済みで呼ぶ）"""
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                self._condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+                sequence = self._appended if self._pending else 0
+            if sequence:
+                try:
+                    self._commit(sequence)
+                except OSError:
+                    # 次の周期か sync で再試行する
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        """追記・コミットの件数"""
+        with self._condition:
+            return {
+                "appended": self._appended,
+                "committed": self._committed,
+                "pending": self._pending,
+                "commits": self._commits,
+            }
+
+    def close(self):
+        """残りをコミットしてファイルを閉じる"""
+        with self._condition:
+            if self._closed:
+                return
+        self.sync()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        self._file.close()
+
+    def __enter__(self) -> "GameLogWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_header(header: bytes):
+    """ヘッダーを検証（ゲームログでなければ ValueError）"""
+    if len(header) < HEADER.size:
+        raise ValueError("ゲームログのヘッダーが途切れています。")
+    magic, version, _ = HEADER.unpack(header)
+    if magic != LOG_MAGIC:
+        raise ValueError("ゲームログのファイルではありません。")
+    if version != LOG_VERSION:
+        raise ValueError(f"未対応のゲームログのバージョンです: {version}")
+
+
+class GameLogReader:
+    """
+    mmap でゲームログを読み出す（読み取り専用）
+
+    ファイル全体を写像し、レコードを複製せずに struct.iter_unpack で走査する。
+    開いた時点の完全なレコードだけを対象とする（書き込み途中の末尾は含めない）。
+
+    Args:
+        path: ログファイルのパス
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        _check_header(self._file.read(HEADER.size))
+        self._count = (size - HEADER.size) // RECORD.size
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        if self._count:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            end = HEADER.size + self._count * RECORD.size
+            self._view = memoryview(self._mmap)[HEADER.size : end]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> GameLogRecord:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("ゲームログのインデックスが範囲外です。")
+        return _decode(RECORD.unpack_from(self._view, index * RECORD.size))
+
+    def iter_raw(self) -> Iterator[Tuple[int, int, int, int, int]]:
+        """(セッション ID, ラウンド, 手のコード, 手のコード, 結果コード) を整数のまま走査"""
+        if self._view is None:
+            return
+        # 走査ごとに別のビューを使い、途中で打ち切られても close を妨げないよう解放する
+        view = self._view[:]
+        records = RECORD.iter_unpack(view)
+        try:
+            yield from records
+        finally:
+            del records
+            view.release()
+
+    def __iter__(self) -> Iterator[GameLogRecord]:
+        for raw in self.iter_raw():
+            yield _decode(raw)
+
+    def iter_session(self, session_id: int) -> Iterator[GameLogRecord]:
+        """指定したセッションのレコードを記録順に走査"""
+        for raw in self.iter_raw():
+            if raw[0] == session_id:
+                yield _decode(raw)
+
+    def replay(self, player, session_id: int) -> int:
+        """
+        セッションの記録を player.record_game に順に流し、プレイヤーの状態を復元
+
+        標準外の結果文字列で記録されたラウンドは結果を空文字として流す。
+
+        Returns:
+            int: 流したラウンド数
+        """
+        replayed = 0
+        for record in self.iter_session(session_id):
+            player.record_game(
+                record.player_choice, record.ai_choice, record.result or ""
+            )
+            replayed += 1
+        return replayed
+
+    def close(self):
+        """
+        写像とファイルを閉じる
+
+        走査中のイテレーターが残っている場合、写像はそのイテレーターが破棄された時点で
+        閉じられる。
+        """
+        view, self._view = self._view, None
+        mapped, self._mmap = self._mmap, None
+        if view is not None:
+            view.release()
+        if mapped is not None:
+            try:
+                mapped.close()
+            except BufferError:
+                # 走査中のビューが参照している間は閉じられない（破棄時に閉じられる）
+                pass
+        self._file.close()
+
+    def __enter__(self) -> "GameLogReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _decode(raw: Tuple[int, int, int, int, int]) -> GameLogRecord:
+    session_id, round_number, player_code, ai_code, result_code = raw
+    return GameLogRecord(
+        session_id,
+        round_number,
+        CHOICES_BY_CODE[player_code],
+        CHOICES_BY_CODE[ai_code],
+        None if result_code == RESULT_CUSTOM else RESULT_VALUES_BY_CODE[result_code],
+    )
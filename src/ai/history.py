@@ -0,0 +1,237 @@
+"""
+AIプレイヤーのゲーム履歴を保持する固定長リングバッファ
+手と結果を小さな整数に符号化し、長時間のセッションでもメモリ使用量を一定に保つ
+"""
+
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..game.engine import (
+    CHOICES_BY_CODE,
+    RESULT_CODES,
+    RESULT_CUSTOM,
+    RESULT_VALUES_BY_CODE,
+    Choice,
+)
+
+# 既定で保持する履歴の件数
+DEFAULT_HISTORY_CAPACITY = 1024
+
+GameRecord = Tuple[Choice, Choice, str]
+
+
+class GameHistory(Sequence):
+    """
+    直近 capacity 件のゲーム履歴を保持する読み取り専用のシーケンス
+
+    各ラウンドは (player_choice, ai_choice, result) のタプルとして読み出せるため、
+    従来の List[tuple] と同じようにインデックスやスライスで参照できる。
+    内部では手と結果を array('b') に 1 バイトずつ保持する。
+
+    Args:
+        capacity: 保持する件数の上限（超えた分は古い順に破棄）
+        archive_path: 指定すると、破棄される記録をこのファイルに追記して全履歴を残す
+    """
+
+    __slots__ = (
+        "capacity",
+        "total_recorded",
+        "_players",
+        "_ais",
+        "_results",
+        "_custom_results",
+        "_start",
+        "_size",
+        "_archive_path",
+        "_archive",
+    )
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_HISTORY_CAPACITY,
+        archive_path: Optional[str] = None,
+    ):
+        if capacity <= 0:
+            raise ValueError("capacity は 1 以上である必要があります。")
+
+        self.capacity = capacity
+        self.total_recorded = 0
+        self._players = array("b", bytes(capacity))
+        self._ais = array("b", bytes(capacity))
+        self._results = array("b", bytes(capacity))
+        # 標準外の結果文字列（スロット番号 → 文字列）。スロットの再利用時に削除される
+        self._custom_results: Dict[int, str] = {}
+        self._start = 0
+        self._size = 0
+        self._archive_path = archive_path
+        self._archive: Optional[BinaryIO] = None
+
+    def append(self, player_choice: Choice, ai_choice: Choice, result: str):
+        """ラウンドの記録を追加（満杯の場合は最も古い記録を破棄）"""
+        if self._size == self.capacity:
+            slot = self._start
+            if self._archive_path is not None:
+                self._spill(slot)
+            self._start = (self._start + 1) % self.capacity
+        else:
+            slot = (self._start + self._size) % self.capacity
+            self._size += 1
+
+        self._players[slot] = player_choice.code
+        self._ais[slot] = ai_choice.code
+        code = RESULT_CODES.get(result, RESULT_CUSTOM)
+        self._results[slot] = code
+        if code == RESULT_CUSTOM:
+            self._custom_results[slot] = result
+        else:
+            self._custom_results.pop(slot, None)
+        self.total_recorded += 1
+
+    def _record_at(self, slot: int) -> GameRecord:
+        code = self._results[slot]
+        result = (
+            self._custom_results[slot]
+            if code == RESULT_CUSTOM
+            else RESULT_VALUES_BY_CODE[code]
+        )
+        return (
+            CHOICES_BY_CODE[self._players[slot]],
+            CHOICES_BY_CODE[self._ais[slot]],
+            result,
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[GameRecord, List[GameRecord]]:
+        if isinstance(index, slice):
+            return [
+                self._record_at(self._slot(i))
+                for i in range(*index.indices(self._size))
+            ]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("履歴のインデックスが範囲外です。")
+        return self._record_at(self._slot(index))
+
+    def _slot(self, index: int) -> int:
+        return (self._start + index) % self.capacity
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for i in range(self._size):
+            yield self._record_at(self._slot(i))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (GameHistory, GameHistoryView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"GameHistory({list(self)!r}, capacity={self.capacity})"
+
+    # --- 破棄された記録のアーカイブ ---
+
+    def _spill(self, slot: int):
+        """破棄される記録を 3 バイト（手, 手, 結果）でアーカイブに追記"""
+        if self._archive is None:
+            self._archive = open(self._archive_path, "ab")
+        # 標準外の結果文字列は -1 として保存される
+        self._archive.write(
+            bytes(
+                (
+                    self._players[slot],
+                    self._ais[slot],
+                    self._results[slot] & 0xFF,
+                )
+            )
+        )
+
+    def iter_archive(self) -> Iterator[Tuple[Choice, Choice, Optional[str]]]:
+        """
+        アーカイブ済みの記録を古い順に読み出す
+
+        標準外の結果文字列で記録されたラウンドの結果は None になる。
+        """
+        if self._archive_path is None:
+            return
+        if self._archive is not None:
+            self._archive.flush()
+        try:
+            with open(self._archive_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        codes = array("b")
+        codes.frombytes(data[: len(data) - len(data) % 3])
+        for i in range(0, len(codes), 3):
+            result_code = codes[i + 2]
+            result = (
+                None
+                if result_code == RESULT_CUSTOM
+                else RESULT_VALUES_BY_CODE[result_code]
+            )
+            yield CHOICES_BY_CODE[codes[i]], CHOICES_BY_CODE[codes[i + 1]], result
+
+    def iter_all(self) -> Iterator[Tuple[Choice, Choice, Optional[str]]]:
+        """アーカイブ済みの記録とリングバッファ内の記録を古い順に全て読み出す"""
+        yield from self.iter_archive()
+        yield from self
+
+    def close(self):
+        """アーカイブファイルを閉じる"""
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+
+class GameHistoryView(Sequence):
+    """
+    GameHistory の読み取り専用ビュー
+
+    参照・反復・アーカイブの読み出しだけを公開し、append や close は持たない。
+    記録と後始末は履歴を所有する側（AIPlayer）が行う。
+    """
+
+    __slots__ = ("_history",)
+
+    def __init__(self, history: GameHistory):
+        self._history = history
+
+    @property
+    def capacity(self) -> int:
+        """保持する件数の上限"""
+        return self._history.capacity
+
+    @property
+    def total_recorded(self) -> int:
+        """これまでに記録したラウンド数（破棄された記録を含む）"""
+        return self._history.total_recorded
+
+    def __len__(self) -> int:
+        return len(self._history)
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[GameRecord, List[GameRecord]]:
+        return self._history[index]
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        return iter(self._history)
+
+    def __eq__(self, other) -> bool:
+        return self._history == other
+
+    def __repr__(self) -> str:
+        return repr(self._history)
+
+    def iter_archive(self) -> Iterator[Tuple[Choice, Choice, Optional[str]]]:
+        """アーカイブ済みの記録を古い順に読み出す（GameHistory.iter_archive と同じ）"""
+        return self._history.iter_archive()
+
+    def iter_all(self) -> Iterator[Tuple[Choice, Choice, Optional[str]]]:
+        """アーカイブ済みの記録とリングバッファ内の記録を古い順に全て読み出す"""
+        return self._history.iter_all()
@@ -0,0 +1,187 @@
+"""
+心理戦メッセージのプール
+プレイヤー名・言語ごとに 1 回のリクエストでまとめて生成したメッセージを保持し、
+O(1) で払い出す。残りが少なくなったらバックグラウンドで補充する
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+# (プレイヤー名, 言語, 生成数) → 生成したメッセージ
+MessageGenerator = Callable[[str, str, int], List[str]]
+
+PoolKey = Tuple[str, str]
+
+
+class _PoolEntry:
+    """1 つのプレイヤー名・言語のメッセージ"""
+
+    __slots__ = ("messages", "pooled", "recent", "recent_set", "refilling")
+
+    def __init__(self, recent_size: int):
+        # (メッセージ, 有効期限)
+        self.messages: Deque[Tuple[str, float]] = deque()
+        self.pooled: Set[str] = set()
+        # 直近に払い出したメッセージ（続けて同じメッセージを出さないため）
+        self.recent: Deque[str] = deque(maxlen=recent_size)
+        self.recent_set: Set[str] = set()
+        self.refilling = False
+
+
+class MessagePool:
+    """
+    心理戦メッセージのスレッドセーフなプール
+
+    get は期限切れを読み飛ばしながら先頭から払い出す（償却 O(1)）。プール内と直近に
+    払い出したメッセージとの重複は追加時に取り除く。残りが low_watermark 未満になると
+    バックグラウンドのスレッドで batch_size 件を生成して補充する（キーごとに同時に 1 回）。
+
+    Args:
+        generator: メッセージをまとめて生成する関数
+        batch_size: 1 回の補充で生成を依頼する件数
+        low_watermark: この件数を下回ったら補充する
+        ttl: メッセージの有効期間（秒）
+        recent_size: 重複とみなす直近の払い出し件数
+        clock: 時刻取得関数（テスト用）
+    """
+
+    def __init__(
+        self,
+        generator: MessageGenerator,
+        batch_size: int = 30,
+        low_watermark: int = 10,
+        ttl: float = 3600.0,
+        recent_size: int = 50,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.generator = generator
+        self.batch_size = batch_size
+        self.low_watermark = low_watermark
+        self.ttl = ttl
+        self.recent_size = recent_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[PoolKey, _PoolEntry] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refills": 0,
+            "generated": 0,
+            "duplicates": 0,
+            "expired": 0,
+            "errors": 0,
+        }
+
+    def _entry(self, key: PoolKey) -> _PoolEntry:
+        """キーのエントリを取得（ロック取得済みで呼ぶ）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _PoolEntry(self.recent_size)
+        return entry
+
+    def get(
+        self, name: str, language: str = "ja", refill: bool = True
+    ) -> Optional[str]:
+        """
+        メッセージを 1 件払い出す（無ければ None）
+
+        残りが少なければバックグラウンドでの補充を開始する（refill=False なら開始しない）。
+        """
+        key = (name, language)
+        now = self._clock()
+        with self._lock:
+            entry = self._entry(key)
+            message = None
+            while entry.messages:
+                candidate, expires_at = entry.messages.popleft()
+                entry.pooled.discard(candidate)
+                if expires_at > now:
+                    message = candidate
+                    break
+                self._stats["expired"] += 1
+
+            if message is None:
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+                if len(entry.recent) == entry.recent.maxlen:
+                    entry.recent_set.discard(entry.recent[0])
+                entry.recent.append(message)
+                entry.recent_set.add(message)
+            start_refill = refill and self._claim_refill(entry)
+
+        if start_refill:
+            self._refill_in_background(key)
+        return message
+
+    def ensure(self, name: str, language: str = "ja"):
+        """残りが少なければバックグラウンドでの補充を開始する（事前準備用）"""
+        key = (name, language)
+        with self._lock:
+            start_refill = self._claim_refill(self._entry(key))
+        if start_refill:
+            self._refill_in_background(key)
+
+    def _claim_refill(self, entry: _PoolEntry) -> bool:
+        """補充が必要で、まだ誰も補充していなければ補充中にする（ロック取得済みで呼ぶ）"""
+        if entry.refilling or len(entry.messages) >= self.low_watermark:
+            return False
+        entry.refilling = True
+        return True
+
+    def add(self, name: str, language: str, messages: List[str]) -> int:
+        """メッセージを追加し、追加できた件数を返す（重複・空文字は除く）"""
+        expires_at = self._clock() + self.ttl
+        added = 0
+        with self._lock:
+            entry = self._entry((name, language))
+            for message in messages:
+                if not message:
+                    continue
+                if message in entry.pooled or message in entry.recent_set:
+                    self._stats["duplicates"] += 1
+                    continue
+                entry.messages.append((message, expires_at))
+                entry.pooled.add(message)
+                added += 1
+            self._stats["generated"] += added
+        return added
+
+    def refill(self, name: str, language: str = "ja") -> int:
+        """メッセージを生成して補充し、追加できた件数を返す（呼び出し元で待つ）"""
+        key = (name, language)
+        try:
+            messages = self.generator(name, language, self.batch_size)
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+            return 0
+        finally:
+            with self._lock:
+                self._entry(key).refilling = False
+                self._stats["refills"] += 1
+        return self.add(name, language, messages)
+
+    def _refill_in_background(self, key: PoolKey):
+        """デーモンスレッドで補充する（API が応答しなくてもプロセス終了を妨げない）"""
+        threading.Thread(target=self.refill, args=key, daemon=True).start()
+
+    def size(self, name: str, language: str = "ja") -> int:
+        """プール内のメッセージ数（期限切れを含む）"""
+        with self._lock:
+            entry = self._entries.get((name, language))
+            return len(entry.messages) if entry is not None else 0
+
+    def stats(self) -> Dict[str, int]:
+        """払い出し・補充の統計"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = sum(len(entry.messages) for entry in self._entries.values())
+        return stats
+
+    def clear(self):
+        """全てのメッセージを破棄"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,227 @@
+"""
+LLM 呼び出しの計測（レイテンシ・TTFT・トークン使用量・エラー・フォールバック）
+プロセス内のヒストグラムとして保持し、JSON または Prometheus テキスト形式で出力する
+"""
+
+import bisect
+import json
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# ヒストグラムのバケット境界（秒）。1ms〜約 2 分を 2^(1/4) 倍刻みで区切る
+_BUCKET_BOUNDS: Tuple[float, ...] = tuple(0.001 * 2 ** (i / 4) for i in range(68))
+
+# スナップショットに含める分位点
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """
+    対数バケットによる固定メモリのヒストグラム
+
+    分位点はバケットの上限値で近似する（相対誤差は最大で約 19%）。
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """値を 1 件記録"""
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """分位点を推定（記録が無い場合は 0）"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                upper = (
+                    _BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else self.max
+                )
+                # 実測の最小値・最大値の範囲に収める
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """件数・合計・分位点などを辞書で取得"""
+        data = {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+        }
+        for q in QUANTILES:
+            data[f"p{int(q * 100)}"] = self.quantile(q)
+        return data
+
+
+class _Series:
+    """呼び出し箇所・モデルごとの計測値"""
+
+    __slots__ = (
+        "latency",
+        "ttft",
+        "calls",
+        "prompt_tokens",
+        "completion_tokens",
+        "tokens_saved",
+        "errors",
+        "fallbacks",
+    )
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.ttft = Histogram()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tokens_saved = 0
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.fallbacks: Dict[str, int] = defaultdict(int)
+
+
+def _usage_tokens(usage, name: str) -> int:
+    """response.usage からトークン数を取り出す（無い場合は 0）"""
+    value = getattr(usage, name, None) if usage is not None else None
+    return value if isinstance(value, int) else 0
+
+
+class LLMMetrics:
+    """LLM 呼び出しの計測値を集約するレジストリ（スレッドセーフ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], _Series] = {}
+
+    def _get(self, call_site: str, model: str) -> _Series:
+        series = self._series.get((call_site, model))
+        if series is None:
+            series = self._series[(call_site, model)] = _Series()
+        return series
+
+    def record_call(
+        self,
+        call_site: str,
+        model: str,
+        latency: float,
+        ttft: Optional[float] = None,
+        usage=None,
+        error: Optional[BaseException] = None,
+        tokens_saved: int = 0,
+    ):
+        """
+        API 呼び出し 1 回分を記録
+
+        Args:
+            call_site: 呼び出し箇所（"choice"、"message" など）
+            model: モデル名
+            latency: 呼び出し全体の所要時間（秒）
+            ttft: 最初のトークンが届くまでの時間（秒）。非ストリーミングでは latency と同じ
+            usage: レスポンスの usage（prompt_tokens / completion_tokens）
+            error: 失敗した場合の例外
+            tokens_saved: ストリーミングを途中で打ち切って節約した出力トークン数
+        """
+        with self._lock:
+            series = self._get(call_site, model)
+            series.calls += 1
+            series.latency.observe(latency)
+            if error is not None:
+                series.errors[type(error).__name__] += 1
+                return
+            series.ttft.observe(latency if ttft is None else ttft)
+            series.prompt_tokens += _usage_tokens(usage, "prompt_tokens")
+            series.completion_tokens += _usage_tokens(usage, "completion_tokens")
+            series.tokens_saved += tokens_saved
+
+    def record_fallback(self, call_site: str, model: str, reason: str):
+        """LLM の結果を使わずにフォールバックした回数を記録"""
+        with self._lock:
+            self._get(call_site, model).fallbacks[reason] += 1
+
+    def snapshot(self) -> List[dict]:
+        """全系列の計測値を辞書のリストで取得"""
+        with self._lock:
+            return [
+                {
+                    "call_site": call_site,
+                    "model": model,
+                    "calls": series.calls,
+                    "latency": series.latency.snapshot(),
+                    "ttft": series.ttft.snapshot(),
+                    "prompt_tokens": series.prompt_tokens,
+                    "completion_tokens": series.completion_tokens,
+                    "tokens_saved": series.tokens_saved,
+                    "errors": dict(series.errors),
+                    "fallbacks": dict(series.fallbacks),
+                }
+                for (call_site, model), series in sorted(self._series.items())
+            ]
+
+    def to_json(self) -> str:
+        """計測値を JSON 文字列で出力"""
+        return json.dumps({"llm_calls": self.snapshot()}, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """計測値を Prometheus のテキスト形式で出力"""
+        lines = [
+            "# TYPE llm_request_latency_seconds summary",
+            "# TYPE llm_time_to_first_token_seconds summary",
+            "# TYPE llm_requests_total counter",
+            "# TYPE llm_tokens_total counter",
+            "# TYPE llm_stream_tokens_saved_total counter",
+            "# TYPE llm_errors_total counter",
+            "# TYPE llm_fallbacks_total counter",
+        ]
+        for item in self.snapshot():
+            labels = f'call_site="{item["call_site"]}",model="{item["model"]}"'
+            for metric, key in (
+                ("llm_request_latency_seconds", "latency"),
+                ("llm_time_to_first_token_seconds", "ttft"),
+            ):
+                histogram = item[key]
+                for q in QUANTILES:
+                    value = histogram[f"p{int(q * 100)}"]
+                    lines.append(f'{metric}{{{labels},quantile="{q}"}} {value:.6f}')
+                lines.append(f"{metric}_sum{{{labels}}} {histogram['sum']:.6f}")
+                lines.append(f"{metric}_count{{{labels}}} {histogram['count']}")
+            lines.append(f"llm_requests_total{{{labels}}} {item['calls']}")
+            lines.append(
+                f'llm_tokens_total{{{labels},kind="prompt"}} {item["prompt_tokens"]}'
+            )
+            lines.append(
+                f'llm_tokens_total{{{labels},kind="completion"}} {item["completion_tokens"]}'
+            )
+            lines.append(
+                f"llm_stream_tokens_saved_total{{{labels}}} {item['tokens_saved']}"
+            )
+            for error, count in sorted(item["errors"].items()):
+                lines.append(f'llm_errors_total{{{labels},error="{error}"}} {count}')
+            for reason, count in sorted(item["fallbacks"].items()):
+                lines.append(
+                    f'llm_fallbacks_total{{{labels},reason="{reason}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """全ての計測値を破棄"""
+        with self._lock:
+            self._series.clear()
+
+
+# プロセス全体で共有する既定のレジストリ
+METRICS = LLMMetrics()
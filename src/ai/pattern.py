@@ -0,0 +1,146 @@
+"""
+相手の手のパターンを学習するローカル AI プレイヤー
+直近 k ラウンドの（相手の手, 自分の手）を文脈とする n-gram（k 次マルコフ）モデルで
+相手の次の手を予測し、それに勝つ手を出す
+"""
+
+import random
+from array import array
+from typing import Optional, Sequence, Tuple
+
+from ..game.engine import CHOICES_BY_CODE, Choice
+from .player import AIPlayer
+
+# 1 ラウンド分の文脈（相手の手 × 自分の手）の種類数
+_PAIRS = 9
+
+
+class PatternAIPlayer(AIPlayer):
+    """
+    n-gram による相手モデルを持つパターン学習 AI
+
+    record_game ごとに文脈の出現回数と最頻値を O(1) で更新し、
+    make_choice は配列参照だけで手を決めるため、ネットワーク往復が不要。
+
+    Args:
+        name: プレイヤー名
+        order: 文脈として使う直近のラウンド数（k）
+    """
+
+    def __init__(self, name: str, order: int = 2, **kwargs):
+        super().__init__(name, **kwargs)
+        if order < 1:
+            raise ValueError("order は 1 以上である必要があります。")
+        self.order = order
+        self._contexts = _PAIRS**order
+        # 文脈ごとの相手の次の手の出現回数・合計・最頻値
+        self._counts = array("I", bytes(4 * self._contexts * 3))
+        self._totals = array("I", bytes(4 * self._contexts))
+        self._best = array("b", bytes(self._contexts))
+        # 文脈に依存しない相手の手の出現回数（文脈が未学習の場合に使う）
+        self._base_counts = [0, 0, 0]
+        self._context = 0
+        self._filled = 0
+
+    def _update(self, opponent_code: int, own_code: int):
+        """相手の手を 1 件学習し、文脈を進める（O(1)）"""
+        self._base_counts[opponent_code] += 1
+        if self._filled >= self.order:
+            context = self._context
+            index = context * 3
+            counts = self._counts
+            counts[index + opponent_code] += 1
+            self._totals[context] += 1
+            if counts[index + opponent_code] > counts[index + self._best[context]]:
+                self._best[context] = opponent_code
+        else:
+            self._filled += 1
+        self._context = (self._context * _PAIRS + opponent_code * 3 + own_code) % (
+            self._contexts
+        )
+
+    def predict(self) -> Tuple[Optional[int], float]:
+        """
+        相手の次の手を予測
+
+        Returns:
+            Tuple[Optional[int], float]: (予測した相手の手のコード, 確信度 0〜1)。
+            学習データが無い場合は (None, 0.0)
+        """
+        if self._filled >= self.order:
+            total = self._totals[self._context]
+            if total:
+                best = self._best[self._context]
+                return best, self._counts[self._context * 3 + best] / total
+
+        base_total = sum(self._base_counts)
+        if not base_total:
+            return None, 0.0
+        best = max(range(3), key=self._base_counts.__getitem__)
+        return best, self._base_counts[best] / base_total
+
+    @property
+    def confidence(self) -> float:
+        """現在の文脈での予測の確信度"""
+        return self.predict()[1]
+
+    def make_choice(self) -> Choice:
+        """予測した相手の手に勝つ手を出す（未学習の場合はランダム）"""
+        predicted, _ = self.predict()
+        if predicted is None:
+            return random.choice(CHOICES_BY_CODE)
+        # コード c の手には (c + 1) % 3 の手が勝つ
+        return CHOICES_BY_CODE[(predicted + 1) % 3]
+
+    def record_game(self, player_choice: Choice, ai_choice: Choice, result: str):
+        """ゲーム履歴を記録し、相手モデルを更新"""
+        super().record_game(player_choice, ai_choice, result)
+        self._update(player_choice.code, ai_choice.code)
+
+    def play_batch(self, opponent_moves: Sequence[int]) -> array:
+        """
+        相手の手のコード列に対して連続で対戦し、自分の手のコード列を返す
+
+        シミュレーション用の高速経路。各ラウンドで現在のモデルから手を決めてから
+        相手の手を学習する（make_choice → record_game と同じ順序）。
+        未学習時は相手の rock を予測したものとして paper を出し、game_history には記録しない。
+
+        Args:
+            opponent_moves: 相手の手のコード列（0: rock, 1: paper, 2: scissors）
+
+        Returns:
+            array: 自分の手のコード列（array('b')）。engine.determine_winners にそのまま渡せる
+        """
+        # 内側のループで属性参照を避けるためローカル変数に束縛する
+        counts = self._counts
+        totals = self._totals
+        best = self._best
+        base_counts = self._base_counts
+        contexts = self._contexts
+        order = self.order
+        context = self._context
+        filled = self._filled
+        moves = array("b", bytes(len(opponent_moves)))
+
+        for i, opponent in enumerate(opponent_moves):
+            if filled >= order and totals[context]:
+                predicted = best[context]
+            else:
+                predicted = base_counts.index(max(base_counts))
+            own = (predicted + 1) % 3
+            moves[i] = own
+
+            base_counts[opponent] += 1
+            if filled >= order:
+                index = context * 3
+                counts[index + opponent] += 1
+                totals[context] += 1
+                if counts[index + opponent] > counts[index + best[context]]:
+                    best[context] = opponent
+            else:
+                filled += 1
+            context = (context * _PAIRS + opponent * 3 + own) % contexts
+
+        self._context = context
+        self._filled = filled
+        return moves
@@ -2,20 +2,174 @@
 AIプレイヤーの基底クラスと基本実装
 """
 
+import asyncio
+import json
 import os
 import random
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from ..game.engine import Choice
+from ..game.engine import CHOICES_BY_CODE, Choice
+from .background import run_in_daemon_thread
+from .cache import DecisionCache, get_shared_decision_cache
+from .client_pool import ClientRegistry, get_client_registry
+from .config import env_flag
+from .game_log import GameObserver
+from .history import DEFAULT_HISTORY_CAPACITY, GameHistory, GameHistoryView
+from .message_pool import MessageGenerator, MessagePool
+from .metrics import METRICS, LLMMetrics
+from .prompt import PromptBuilder, estimate_tokens, resolve_move_token_ids
+from .rate_limit import (
+    RateLimiter,
+    RateLimitTimeout,
+    RatePermit,
+    get_shared_rate_limiter,
+)
+from .resilience import CIRCUIT_BREAKER, CircuitBreaker, CircuitOpenError
+
+# 心理戦メッセージ生成に失敗した場合のフォールバック
+FALLBACK_MESSAGES = (
+    "勝負だ！",
+    "本気を見せる時だ",
+    "君の実力を見せてもらおう",
+    "面白くなりそうだ",
+    "負けないぞ！",
+    "覚悟はできたか？",
+    "手加減はしないぞ！",
+)
+
+# 計測用の API 呼び出し箇所
+CALL_SITE_CHOICE = "choice"
+CALL_SITE_MESSAGE = "message"
+CALL_SITE_COMBINED = "combined"
+CALL_SITE_MESSAGE_BATCH = "message_batch"
+
+# ストリーミング中に手を確定させるキーワード
+_MOVE_KEYWORDS = (
+    (Choice.ROCK, ("rock", "グー")),
+    (Choice.PAPER, ("paper", "パー")),
+    (Choice.SCISSORS, ("scissors", "チョキ")),
+)
+
+# 構造化出力で応答を 3 つの手のいずれかに制約するための JSON スキーマ
+MOVE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "janken_move",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "move": {"type": "string", "enum": [c.value for c in CHOICES_BY_CODE]}
+            },
+            "required": ["move"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def _scan_unambiguous_choice(text: str) -> Optional[Choice]:
+    """途中までの応答（小文字化済み）に 1 種類の手だけが現れていればそれを返す"""
+    found = None
+    for choice, keywords in _MOVE_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            if found is not None:
+                return None
+            found = choice
+    return found
+
+
+# 警告を出さずにフォールバックする例外と計測上の理由（障害中・混雑中は呼び出しごとに警告しない）
+_QUIET_FALLBACKS = (
+    (CircuitOpenError, "circuit_open"),
+    (RateLimitTimeout, "rate_limited"),
+)
+
+
+def _quiet_fallback_reason(error: Exception) -> Optional[str]:
+    """警告を出さずにフォールバックする例外なら計測上の理由を返す"""
+    for error_type, reason in _QUIET_FALLBACKS:
+        if isinstance(error, error_type):
+            return reason
+    return None
+
+
+# OPENAI_MESSAGE_POOL で有効にした場合に共有するメッセージプール（(モデル, base_url) ごと、遅延初期化）
+_shared_message_pools: Dict[Tuple[str, Optional[str]], MessagePool] = {}
+_shared_message_pools_lock = threading.Lock()
+
+
+def _shared_pool_generator(model: str, base_url: Optional[str]) -> MessageGenerator:
+    """
+    共有メッセージプールの補充に使う生成関数
+
+    特定のプレイヤーを保持し続けないよう、補充専用の LLMAIPlayer を初回の補充時に作る。
+    """
+    generators: List["LLMAIPlayer"] = []
+    lock = threading.Lock()
+
+    def generate(name: str, language: str, count: int) -> List[str]:
+        with lock:
+            if not generators:
+                generator = LLMAIPlayer("message-pool", base_url=base_url)
+                generator.model = model
+                generators.append(generator)
+        return generators[0]._generate_messages(name, language, count)
+
+    return generate
+
+
+def _get_shared_message_pool(model: str, base_url: Optional[str]) -> MessagePool:
+    """モデルと接続先ごとの共有メッセージプールを取得"""
+    key = (model, base_url)
+    with _shared_message_pools_lock:
+        pool = _shared_message_pools.get(key)
+        if pool is None:
+            pool = MessagePool(_shared_pool_generator(model, base_url))
+            _shared_message_pools[key] = pool
+        return pool
+
+
+# client_registry / rate_limiter を差し替えていないことを示す目印
+_SHARED = object()
 
 
 class AIPlayer(ABC):
     """AIプレイヤーの基底クラス"""
 
-    def __init__(self, name: str):
+    def __init__(
+        self,
+        name: str,
+        history_capacity: int = DEFAULT_HISTORY_CAPACITY,
+        history_archive: Optional[str] = None,
+    ):
         self.name = name
-        self.game_history: List[tuple] = []
+        # 直近 history_capacity 件だけを保持する（古い記録は任意でファイルへ退避）
+        self._history = GameHistory(history_capacity, archive_path=history_archive)
+        self._history_view = GameHistoryView(self._history)
+        # record_game ごとに呼び出すオブザーバー（ゲームログへの永続化など）
+        self._observers: List[GameObserver] = []
+
+    @property
+    def game_history(self) -> GameHistoryView:
+        """ゲーム履歴の読み取り専用ビュー（(player_choice, ai_choice, result) の並び）"""
+        return self._history_view
+
+    def close(self):
+        """履歴のアーカイブファイルなど、プレイヤーが保持する資源を閉じる"""
+        self._history.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     @abstractmethod
     def make_choice(self) -> Choice:
@@ -26,162 +180,952 @@ class AIPlayer(ABC):
         """心理戦メッセージを生成（サブクラスでオーバーライド可能）"""
         return "さあ、勝負だ！"
 
+    def warm_up(self):
+        """API クライアントなどの遅延初期化を前倒しする（サブクラスでオーバーライド可能）"""
+        pass
+
+    async def make_choice_async(self) -> Choice:
+        """
+        非同期版の手の決定
+
+        デフォルトでは同期版をそのまま呼び出す。ネットワーク待ちが発生する
+        サブクラスはイベントループを塞がないようにオーバーライドすること。
+        """
+        return self.make_choice()
+
+    async def get_psychological_message_async(self) -> str:
+        """非同期版の心理戦メッセージ生成（デフォルトは同期版を呼び出す）"""
+        return self.get_psychological_message()
+
+    def add_observer(self, observer: GameObserver):
+        """record_game ごとに (プレイヤー, プレイヤーの手, AI の手, 結果) で呼び出す関数を登録"""
+        self._observers.append(observer)
+
+    def remove_observer(self, observer: GameObserver):
+        """登録したオブザーバーを解除"""
+        self._observers.remove(observer)
+
     def record_game(self, player_choice: Choice, ai_choice: Choice, result: str):
-        """ゲーム履歴を記録"""
-        self.game_history.append((player_choice, ai_choice, result))
+        """ゲーム履歴を記録し、オブザーバーに通知"""
+        self._history.append(player_choice, ai_choice, result)
+        for observer in self._observers:
+            observer(self, player_choice, ai_choice, result)
+
+
+class RandomAIPlayer(AIPlayer):
+    """ランダムに手を選ぶAIプレイヤー（シミュレーションの基準用）"""
+
+    def make_choice(self) -> Choice:
+        """ランダムに手を決定"""
+        return random.choice(CHOICES_BY_CODE)
 
 
 class LLMAIPlayer(AIPlayer):
     """OpenAI APIを使用してじゃんけんの手を決定するAIプレイヤー"""
 
-    def __init__(self, name: str):
-        super().__init__(name)
+    # API 呼び出しの計測先（インスタンスごとに差し替え可能）
+    metrics: LLMMetrics = METRICS
+    # 全インスタンスで共有するサーキットブレーカー（インスタンスごとに差し替え可能）
+    circuit_breaker: CircuitBreaker = CIRCUIT_BREAKER
+    # 差し替えたクライアントのレジストリとレート制限（_SHARED は共有のものを使う）
+    _client_registry = _SHARED
+    _rate_limiter = _SHARED
+
+    def __init__(
+        self,
+        name: str,
+        combined_mode: Optional[bool] = None,
+        decision_cache: Optional[DecisionCache] = None,
+        base_url: Optional[str] = None,
+        stream_mode: Optional[bool] = None,
+        constrained_mode: Optional[bool] = None,
+        move_timeout: Optional[float] = None,
+        history_capacity: int = DEFAULT_HISTORY_CAPACITY,
+        message_pool: Optional[MessagePool] = None,
+        language: str = "ja",
+    ):
+        super().__init__(name, history_capacity=history_capacity)
         # OpenAI クライアントは遅延初期化
         self._client = None
-        self.max_history = 5  # 履歴の最大保持数
         # 環境変数からモデル名を取得（デフォルトは安価なgpt-4o-mini）
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        # OpenAI 互換サーバー（ローカルのスタンドインなど）の URL。未指定なら公式 API
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        self.max_history = 5  # 履歴の最大保持数
+        # 心理戦メッセージと手を 1 回の API 呼び出しでまとめて決める
+        if combined_mode is None:
+            combined_mode = env_flag("OPENAI_COMBINED_MODE")
+        self.combined_mode = combined_mode
+        # 一括モードで確定済みの手（記録済みラウンド数, 手）。UIには公開しない
+        self._committed_choice: Optional[Tuple[int, Choice]] = None
+        # 同じ履歴ウィンドウでの手の決定を再利用するキャッシュ（環境変数で設定した場合は共有のもの）
+        if decision_cache is None:
+            decision_cache = get_shared_decision_cache()
+        self.decision_cache = decision_cache
+        # 手の決定をストリーミングで受信し、手が確定した時点で打ち切る
+        if stream_mode is None:
+            stream_mode = env_flag("OPENAI_STREAM_MODE")
+        self.stream_mode = stream_mode
+        # 出力を 3 つの手のいずれか 1 つに制約する（logit_bias または構造化出力）
+        if constrained_mode is None:
+            constrained_mode = env_flag("OPENAI_CONSTRAINED_MODE")
+        self.constrained_mode = constrained_mode
+        # 手の決定の待ち時間の上限（秒）。超えた場合はローカルで手を決める
+        if move_timeout is None and os.getenv("OPENAI_MOVE_TIMEOUT"):
+            move_timeout = float(os.getenv("OPENAI_MOVE_TIMEOUT"))
+        self.move_timeout = move_timeout or None
+        # 心理戦メッセージの言語（プールのキーとバッチ生成のプロンプトに使う）
+        self.language = language
+        # まとめて生成した心理戦メッセージのプール（OPENAI_MESSAGE_POOL で共有プールを使う）
+        if message_pool is None and env_flag("OPENAI_MESSAGE_POOL"):
+            message_pool = _get_shared_message_pool(self.model, self.base_url)
+        self.message_pool = message_pool
+
+    @property
+    def client_registry(self) -> ClientRegistry:
+        """クライアント（接続プール）のレジストリ（既定は全インスタンスで共有）"""
+        if self._client_registry is _SHARED:
+            return get_client_registry()
+        return self._client_registry
+
+    @client_registry.setter
+    def client_registry(self, registry: ClientRegistry):
+        self._client_registry = registry
+
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        """
+        レート制限（None は制限なし）
+
+        既定は全インスタンスで共有するもので、環境変数で設定した場合のみ有効。
+        """
+        if self._rate_limiter is _SHARED:
+            return get_shared_rate_limiter()
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, limiter: Optional[RateLimiter]):
+        self._rate_limiter = limiter
+
+    @property
+    def max_history(self) -> int:
+        """プロンプトに含める履歴の最大数"""
+        return self._prompt_builder.max_history
+
+    @max_history.setter
+    def max_history(self, value: int):
+        # 新しいウィンドウ幅でビルダーを作り直し、既存の履歴を描画し直す
+        builder = PromptBuilder(value, self.model)
+        recent = self.game_history[-value:] if value > 0 else []
+        first_round = self.game_history.total_recorded - len(recent) + 1
+        for offset, record in enumerate(recent):
+            builder.record(first_round + offset, *record)
+        self._prompt_builder = builder
+
+    @property
+    def prompt_tokens(self) -> int:
+        """次の手の決定リクエストのプロンプトトークン数（システムメッセージ込み）"""
+        return self._prompt_builder.token_count
 
     def _build_prompt(self) -> str:
-        """LLM用のプロンプトを構築"""
-        base_prompt = """
-あなたはじゃんけんプレイヤーです。次に出す手を決めてください。
+        """LLM用のプロンプトを構築（静的な指示文の後ろに直近の履歴を付加）"""
+        return self._prompt_builder.build()
+
+    def _choice_request(self) -> dict:
+        """手の決定用 chat.completions.create の引数を構築"""
+        request = {
+            "model": self.model,
+            "messages": self._prompt_builder.messages(),
+            "max_tokens": 10,
+            "temperature": 0.7,
+        }
+        if self.constrained_mode:
+            token_ids = resolve_move_token_ids(self.model)
+            if token_ids is not None:
+                # 3 つの手のトークン以外は選ばれないようにし、1 トークンだけ生成させる
+                request["logit_bias"] = {str(token_id): 100 for token_id in token_ids}
+                request["max_tokens"] = 1
+            else:
+                # 1 トークンで表せない場合は構造化出力の enum で制約する
+                request["response_format"] = MOVE_RESPONSE_FORMAT
+        return request
+
+    @staticmethod
+    def _parse_choice(content: Optional[str]) -> Optional[Choice]:
+        """LLMの応答文字列からChoiceを抽出（見つからない場合はNone）"""
+        choice_text = content.strip().lower() if content else ""
+
+        if "rock" in choice_text or "グー" in choice_text:
+            return Choice.ROCK
+        elif "paper" in choice_text or "パー" in choice_text:
+            return Choice.PAPER
+        elif "scissors" in choice_text or "チョキ" in choice_text:
+            return Choice.SCISSORS
+        return None
+
+    def _choice_from_response(
+        self,
+        response,
+        cache_key: Optional[str] = None,
+        expired: Optional[threading.Event] = None,
+    ) -> Choice:
+        """APIレスポンスからChoiceを決定（無効な応答はランダムにフォールバック）"""
+        return self._choice_from_content(
+            response.choices[0].message.content, cache_key, expired
+        )
+
+    def _choice_from_content(
+        self,
+        content: Optional[str],
+        cache_key: Optional[str] = None,
+        expired: Optional[threading.Event] = None,
+    ) -> Choice:
+        """
+        応答文字列からChoiceを決定（無効な応答はランダムにフォールバック）
+
+        expired がセット済み（期限切れでラウンドが既に終わっている）の場合、無効な応答は
+        警告もフォールバックの記録もせずに破棄する。
+        """
+        choice = self._parse_choice(content)
+        if choice is None and expired is not None and expired.is_set():
+            return random.choice(CHOICES_BY_CODE)
+        if choice is None:
+            choice_text = content.strip().lower() if content else ""
+            print(
+                f"警告: AIの応答が無効でした: '{choice_text}'. ランダムに選択します。"
+            )
+            self.metrics.record_fallback(
+                CALL_SITE_CHOICE, self.model, "invalid_response"
+            )
+            return random.choice(CHOICES_BY_CODE)
+        if cache_key is not None:
+            self.decision_cache.put(cache_key, choice)
+        return choice
+
+    def _lookup_decision(self) -> Tuple[Optional[str], Optional[Choice]]:
+        """決定キャッシュを参照し (キー, キャッシュ済みの手) を返す"""
+        if self.decision_cache is None:
+            return None, None
+        key = DecisionCache.make_key(self.model, self.game_history[-self.max_history :])
+        return key, self.decision_cache.get(key)
+
+    @staticmethod
+    def _require_api_key():
+        """APIキーが設定されていない場合は事前チェックで例外を送出"""
+        if not os.getenv("OPENAI_API_KEY"):
+            raise ValueError("OPENAI_API_KEY が設定されていません。")
+
+    def _message_request(self) -> dict:
+        """心理戦メッセージ用 chat.completions.create の引数を構築"""
+        self._require_api_key()
+
+        # 心理戦メッセージ用プロンプト
+        prompt = f"""
+あなたは {self.name} というじゃんけんAIです。
+これからじゃんけん勝負を始める前に、相手に心理的プレッシャーをかける短い一言を言ってください。
+
+要求：
+- 15文字以内の短いメッセージ
+- 挑発的だが品位を保った内容
+- じゃんけんに関連した内容
+
+例：「君の手は読めているよ」「勝負の時間だ！」
+"""
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 50,
+            "temperature": 0.8,
+        }
+
+    def _message_batch_request(self, name: str, language: str, count: int) -> dict:
+        """心理戦メッセージをまとめて生成する chat.completions.create の引数を構築"""
+        self._require_api_key()
+        language_name = "日本語" if language == "ja" else "英語"
+        prompt = f"""
+あなたは {name} というじゃんけんAIです。
+じゃんけん勝負の前に相手へ心理的プレッシャーをかける短い一言を {count} 個考えてください。
 
-選択肢は以下の通りです：
-- rock (グー)
-- paper (パー)
-- scissors (チョキ)
+要求：
+- それぞれ15文字以内の短いメッセージ（{language_name}）
+- 挑発的だが品位を保った内容
+- じゃんけんに関連した内容
+- 互いに重複しないこと
 
+次の JSON 形式のみで回答してください：
+{{"messages": ["<一言>", ...]}}
 """
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 30 * count,
+            "temperature": 1.0,
+            "response_format": {"type": "json_object"},
+        }
 
-        # ゲーム履歴がある場合は追加
-        if self.game_history:
-            history_text = "\n過去のゲーム履歴:\n"
-            # 最新の履歴のみを使用
-            recent_history = self.game_history[-self.max_history :]
-            for i, (player_choice, ai_choice, result) in enumerate(recent_history, 1):
-                history_text += (
-                    f"{i}. プレイヤー: {player_choice.name.lower()}, "
-                    f"あなた: {ai_choice.name.lower()}, 結果: {result}\n"
-                )
-            base_prompt += history_text + "\n"
+    def _parse_message_batch(self, content: Optional[str]) -> List[str]:
+        """バッチ応答の JSON から整形済みのメッセージを取り出す"""
+        try:
+            data = json.loads(content or "")
+        except ValueError:
+            return []
+        if not isinstance(data, dict):
+            return []
+        messages = data.get("messages")
+        if not isinstance(messages, list):
+            # 1 件だけ返された場合も受け付ける
+            messages = [data.get("message")]
+        return [
+            self._format_message(message)
+            for message in messages
+            if isinstance(message, str) and message.strip()
+        ]
+
+    def _generate_messages(self, name: str, language: str, count: int) -> List[str]:
+        """心理戦メッセージを 1 回の API 呼び出しでまとめて生成（メッセージプールの補充用）"""
+        response = self._create_completion(
+            CALL_SITE_MESSAGE_BATCH, self._message_batch_request(name, language, count)
+        )
+        messages = self._parse_message_batch(response.choices[0].message.content)
+        if not messages:
+            self.metrics.record_fallback(
+                CALL_SITE_MESSAGE_BATCH, self.model, "invalid_response"
+            )
+        return messages
+
+    def _client_available(self) -> bool:
+        """OpenAI クライアントを生成できるか（API キー未設定や openai 未導入なら False）"""
+        try:
+            self.client
+        except Exception:
+            return False
+        return True
+
+    def _pooled_message(self) -> Optional[str]:
+        """
+        メッセージプールから払い出す（プールが無いか空なら None）
+
+        クライアントを生成できない場合、失敗するだけの補充は開始しない。
+        """
+        if self.message_pool is None:
+            return None
+        return self.message_pool.get(
+            self.name, self.language, refill=self._client_available()
+        )
+
+    @staticmethod
+    def _format_message(content: Optional[str]) -> str:
+        """LLMの応答を心理戦メッセージとして整形"""
+        message = content.strip() if content else "気合いだ！"
+        # 不要なクォートを削除
+        message = message.strip('"').strip("'")
+        # メッセージが長すぎる場合は切り詰め
+        if len(message) > 20:
+            message = message[:17] + "..."
+        return message
+
+    def _fallback_message(
+        self, error: Exception, call_site: str = CALL_SITE_MESSAGE
+    ) -> str:
+        """エラー時のフォールバックメッセージを選択"""
+        # APIキー未設定の場合は静かに処理、その他のエラーは表示
+        quiet_reason = _quiet_fallback_reason(error)
+        if "OPENAI_API_KEY" in str(error):
+            reason = "no_api_key"  # APIキー未設定は想定内なので静かに処理
+        elif quiet_reason is not None:
+            reason = quiet_reason
+        else:
+            reason = "api_error"
+            print(f"デバッグ: 心理戦メッセージ生成エラー: {error}")
+
+        self.metrics.record_fallback(call_site, self.model, reason)
+        return random.choice(FALLBACK_MESSAGES)
+
+    def _fallback_choice(self, error: Exception) -> Choice:
+        """API エラー時にランダムな手へフォールバック"""
+        quiet_reason = _quiet_fallback_reason(error)
+        if quiet_reason is not None:
+            self.metrics.record_fallback(CALL_SITE_CHOICE, self.model, quiet_reason)
+            return random.choice(CHOICES_BY_CODE)
+        print(f"警告: OpenAI API エラー: {error}. ランダムに選択します。")
+        self.metrics.record_fallback(CALL_SITE_CHOICE, self.model, "api_error")
+        return random.choice(CHOICES_BY_CODE)
+
+    def _local_choice(self) -> Choice:
+        """
+        API を使わずに手を決める（期限切れ時のフォールバック）
+
+        履歴中で相手が最も多く出した手に勝つ手を返す。履歴が無ければランダム。
+        """
+        counts = [0, 0, 0]
+        for player_choice, _, _ in self.game_history:
+            counts[player_choice.code] += 1
+        if not any(counts):
+            return random.choice(CHOICES_BY_CODE)
+        return CHOICES_BY_CODE[(counts.index(max(counts)) + 1) % 3]
+
+    def _deadline_choice(self) -> Choice:
+        """期限内に API が応答しなかった場合のフォールバック"""
+        self.metrics.record_fallback(CALL_SITE_CHOICE, self.model, "timeout")
+        return self._local_choice()
 
-        base_prompt += """
-この情報を踏まえて、次に出すべき手を「rock」「paper」「scissors」のいずれかで回答してください。
-他の文字や説明は不要で、単語のみを回答してください。
+    def _combined_request(self) -> dict:
+        """心理戦メッセージと手を同時に得るための chat.completions.create の引数を構築"""
+        self._require_api_key()
+        prompt = self._build_prompt() + f"""
+さらに、あなたは {self.name} として、勝負の前に相手へ心理的プレッシャーをかける
+15文字以内の短い一言（挑発的だが品位を保った内容）も考えてください。
+
+次の JSON 形式のみで回答してください：
+{{"message": "<一言>", "move": "<rock|paper|scissors>"}}
 """
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "あなたはじゃんけんの専門家です。指定された JSON 形式でのみ回答してください。",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": 60,
+            "temperature": 0.8,
+            "response_format": {"type": "json_object"},
+        }
+
+    def _parse_combined(self, content: Optional[str]) -> Optional[Tuple[str, Choice]]:
+        """一括応答の JSON から (メッセージ, 手) を取り出す（不正な場合はNone）"""
+        try:
+            data = json.loads(content or "")
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        message = data.get("message")
+        move = data.get("move")
+        if not isinstance(message, str) or not message.strip():
+            return None
+        if not isinstance(move, str):
+            return None
+        choice = Choice.from_string(move.strip())
+        if choice is None:
+            return None
+        return self._format_message(message), choice
+
+    def _commit_combined(self, response, round_index: int) -> Optional[str]:
+        """
+        一括応答を解釈し、手を確定してメッセージを返す（解釈できない場合はNone）
+
+        round_index はリクエストを構築した時点の記録済みラウンド数。応答が届くまでに
+        履歴が進んでいた場合、手は後のラウンドに使われないよう確定せずに破棄する。
+        """
+        parsed = self._parse_combined(response.choices[0].message.content)
+        if parsed is None:
+            self.metrics.record_fallback(
+                CALL_SITE_COMBINED, self.model, "invalid_response"
+            )
+            return None
+        message, choice = parsed
+        if round_index == self.game_history.total_recorded:
+            self._committed_choice = (round_index, choice)
+        return message
+
+    def _take_committed_choice(self) -> Optional[Choice]:
+        """このラウンド用に確定済みの手を取り出す（古いラウンドの手は破棄）"""
+        committed = self._committed_choice
+        self._committed_choice = None
+        if committed is None or committed[0] != self.game_history.total_recorded:
+            return None
+        return committed[1]
 
-        return base_prompt
+    def record_game(self, player_choice: Choice, ai_choice: Choice, result: str):
+        """ゲーム履歴を記録"""
+        super().record_game(player_choice, ai_choice, result)
+        self._prompt_builder.record(
+            self.game_history.total_recorded, player_choice, ai_choice, result
+        )
 
     @property
     def client(self):
-        """OpenAI クライアントを遅延初期化"""
+        """共有レジストリから OpenAI クライアントを遅延取得"""
         if self._client is None:
             try:
-                from openai import OpenAI
-
                 api_key = os.getenv("OPENAI_API_KEY")
                 if not api_key:
                     raise ValueError("OPENAI_API_KEY が設定されていません。")
-                self._client = OpenAI(api_key=api_key)
+                self._client = self.client_registry.get(
+                    api_key, self.base_url, self.model
+                )
             except ImportError:
                 raise ImportError(
                     "openai パッケージがインストールされていません。'pip install openai' を実行してください。"
                 )
         return self._client
 
+    @staticmethod
+    def _request_tokens(request: dict) -> int:
+        """レート制限に使うリクエストのトークン数の見積もり（入力の概算 + 出力上限）"""
+        text = "".join(message["content"] for message in request["messages"])
+        return estimate_tokens(text) + request.get("max_tokens", 0)
+
+    def _begin_call(self, request: dict) -> Optional[RatePermit]:
+        """
+        サーキットブレーカーを確認し、レート制限の枠を確保する（待ち時間は上限付き）
+
+        回路が開いている間はレート制限を待たずに即座に CircuitOpenError を送出する。
+        枠を確保できなかった場合は half_open のプローブ枠を解放する。
+        """
+        self.circuit_breaker.check()
+        limiter = self.rate_limiter
+        if limiter is None:
+            return None
+        try:
+            return limiter.acquire(self._request_tokens(request))
+        except BaseException:
+            self.circuit_breaker.abandon()
+            raise
+
+    def _end_call(
+        self,
+        permit: Optional[RatePermit],
+        start: float,
+        error: Optional[Exception] = None,
+    ):
+        """呼び出し結果をサーキットブレーカーとレート制限に反映する"""
+        self.circuit_breaker.record_result(error)
+        if permit is not None:
+            permit.release(time.perf_counter() - start, error)
+
+    def _abandon_call(self, permit: Optional[RatePermit]):
+        """結果を得ずに中断された呼び出しの枠を返却する"""
+        self.circuit_breaker.abandon()
+        if permit is not None:
+            permit.release()
+
+    def _create_completion(self, call_site: str, request: dict):
+        """chat.completions.create を呼び出し、レイテンシとトークン使用量を記録"""
+        client = self.client
+        permit = self._begin_call(request)
+        start = time.perf_counter()
+        try:
+            response = client.chat.completions.create(**request)
+        except Exception as e:
+            self._end_call(permit, start, e)
+            self.metrics.record_call(
+                call_site, self.model, time.perf_counter() - start, error=e
+            )
+            raise
+        self._end_call(permit, start)
+        self.metrics.record_call(
+            call_site,
+            self.model,
+            time.perf_counter() - start,
+            usage=getattr(response, "usage", None),
+        )
+        return response
+
+    def _stream_request(self) -> dict:
+        """ストリーミングでの手の決定用リクエストを構築"""
+        request = self._choice_request()
+        request["stream"] = True
+        return request
+
+    def _record_stream(
+        self,
+        request: dict,
+        start: float,
+        ttft: Optional[float],
+        pieces: int,
+        done: bool,
+    ):
+        """
+        ストリーミング呼び出しを計測値として記録
+
+        手が確定して打ち切った場合、max_tokens までの残りを節約トークン数（上限値）とする。
+        トークン数は受信したチャンク数で近似する。
+        """
+        self.metrics.record_call(
+            CALL_SITE_CHOICE,
+            self.model,
+            time.perf_counter() - start,
+            ttft=ttft,
+            usage=SimpleNamespace(
+                prompt_tokens=self.prompt_tokens, completion_tokens=pieces
+            ),
+            tokens_saved=max(0, request["max_tokens"] - pieces) if done else 0,
+        )
+
+    def _stream_choice(
+        self,
+        cache_key: Optional[str],
+        request: Optional[dict] = None,
+        expired: Optional[threading.Event] = None,
+    ) -> Choice:
+        """手の決定をストリーミングで受信し、曖昧さの無い手が現れた時点で打ち切る"""
+        if request is None:
+            request = self._stream_request()
+        client = self.client
+        permit = self._begin_call(request)
+        start = time.perf_counter()
+        ttft = None
+        text = ""
+        pieces = 0
+        choice = None
+        try:
+            stream = client.chat.completions.create(**request)
+            try:
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    pieces += 1
+                    text += delta
+                    choice = _scan_unambiguous_choice(text.lower())
+                    if choice is not None:
+                        break
+            finally:
+                # 残りの応答は受信せずに接続を閉じる
+                stream.close()
+        except Exception as e:
+            self._end_call(permit, start, e)
+            self.metrics.record_call(
+                CALL_SITE_CHOICE, self.model, time.perf_counter() - start, error=e
+            )
+            raise
+
+        self._end_call(permit, start)
+        self._record_stream(request, start, ttft, pieces, choice is not None)
+        return self._choice_from_content(text, cache_key, expired)
+
+    def warm_up(self):
+        """OpenAI クライアント（openai パッケージの import を含む）を事前に初期化"""
+        try:
+            self.client
+        except Exception:
+            # 失敗した場合は実際の呼び出し時にフォールバックさせる
+            return
+        if self.message_pool is not None:
+            self.message_pool.ensure(self.name, self.language)
+
+    @property
+    def _use_stream(self) -> bool:
+        """手の決定をストリーミングで受信するかどうか"""
+        # 制約付き出力は 1 トークン程度のため、ストリーミングの利点が無い
+        return self.stream_mode and not self.constrained_mode
+
+    def _request_choice(
+        self,
+        cache_key: Optional[str],
+        request: dict,
+        expired: Optional[threading.Event] = None,
+    ) -> Choice:
+        """構築済みのリクエストで API に手を問い合わせる"""
+        if self._use_stream:
+            return self._stream_choice(cache_key, request, expired)
+        response = self._create_completion(CALL_SITE_CHOICE, request)
+        return self._choice_from_response(response, cache_key, expired)
+
     def make_choice(self) -> Choice:
-        """OpenAI APIを使用して手を決定"""
+        """
+        OpenAI APIを使用して手を決定
+
+        move_timeout が設定されている場合、期限内に応答が無ければローカルで決めた手を
+        返す。遅れて届いた応答は破棄され、決定キャッシュがあればキャッシュに格納される。
+        遅れた呼び出しはデーモンスレッドで続くため、プロセスの終了を妨げない。
+        """
+        committed = self._take_committed_choice()
+        if committed is not None:
+            return committed
+
+        cache_key, cached = self._lookup_decision()
+        if cached is not None:
+            return cached
+
         try:
-            prompt = self._build_prompt()
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "あなたはじゃんけんの専門家です。与えられた指示に従って、適切な手を選択してください。",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=10,
-                temperature=0.7,
+            # リクエストは呼び出し元のスレッドで構築する（履歴の更新と競合させない）
+            request = (
+                self._stream_request() if self._use_stream else self._choice_request()
             )
+            if self.move_timeout is None:
+                return self._request_choice(cache_key, request)
 
-            # レスポンスから選択肢を抽出
-            content = response.choices[0].message.content
-            choice_text = content.strip().lower() if content else ""
+            expired = threading.Event()
+            future = run_in_daemon_thread(
+                lambda: self._request_choice(cache_key, request, expired),
+                name="llm-move",
+            )
+            try:
+                return future.result(timeout=self.move_timeout)
+            except FutureTimeoutError:
+                expired.set()
+                return self._deadline_choice()
 
-            # 文字列からChoiceに変換
-            if "rock" in choice_text or "グー" in choice_text:
-                return Choice.ROCK
-            elif "paper" in choice_text or "パー" in choice_text:
-                return Choice.PAPER
-            elif "scissors" in choice_text or "チョキ" in choice_text:
-                return Choice.SCISSORS
-            else:
-                # 無効なレスポンスの場合はランダムにフォールバック
-                print(
-                    f"警告: AIの応答が無効でした: '{choice_text}'. ランダムに選択します。"
+        except Exception as e:
+            return self._fallback_choice(e)
+
+    def get_psychological_message(self) -> str:
+        """LLMを使って心理戦メッセージを生成（メッセージプールがあればそこから払い出す）"""
+        pooled = self._pooled_message()
+        if pooled is not None:
+            return pooled
+
+        if self.combined_mode:
+            # 手をどのラウンドに使うかはリクエストの構築時点で決める
+            round_index = self.game_history.total_recorded
+            try:
+                response = self._create_completion(
+                    CALL_SITE_COMBINED, self._combined_request()
                 )
-                return random.choice(list(Choice))
+            except Exception as e:
+                return self._fallback_message(e, CALL_SITE_COMBINED)
+            message = self._commit_combined(response, round_index)
+            if message is not None:
+                return message
+            # 解釈に失敗した場合は従来の分割呼び出しにフォールバック
+
+        try:
+            request = self._message_request()
+            response = self._create_completion(CALL_SITE_MESSAGE, request)
+            return self._format_message(response.choices[0].message.content)
 
         except Exception as e:
-            print(f"警告: OpenAI API エラー: {e}. ランダムに選択します。")
-            return random.choice(list(Choice))
+            return self._fallback_message(e)
 
-    def get_psychological_message(self) -> str:
-        """LLMを使って心理戦メッセージを生成"""
+    async def make_choice_async(self) -> Choice:
+        """同期クライアントでの手の決定をスレッドで実行（イベントループを塞がない）"""
+        return await asyncio.to_thread(self.make_choice)
+
+    async def get_psychological_message_async(self) -> str:
+        """同期クライアントでのメッセージ生成をスレッドで実行"""
+        return await asyncio.to_thread(self.get_psychological_message)
+
+
+class AsyncLLMAIPlayer(LLMAIPlayer):
+    """
+    AsyncOpenAI を使用する非同期版 LLM AIプレイヤー
+
+    1 つのイベントループで多数のセッションや対戦を同時に扱うためのクラス。
+    API の同時実行数は全インスタンスで共有するイベントループごとのセマフォで
+    制限する（上限値は最初にそのループで API を呼んだインスタンスの max_concurrency）。
+    同期版の make_choice / get_psychological_message は LLMAIPlayer の実装を
+    そのまま使うため、CLIInterface などの同期呼び出し側からも利用できる。
+    """
+
+    # イベントループごとの同時実行数制限
+    _semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    # 期限切れ後もキャッシュを温めるために実行を続けている問い合わせ
+    _late_tasks: Set["asyncio.Task"] = set()
+
+    def __init__(self, name: str, max_concurrency: Optional[int] = None, **kwargs):
+        super().__init__(name, **kwargs)
+        # 明示的に差し替えた AsyncOpenAI クライアント（テスト用。通常は None）
+        self._async_client = None
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "100"))
+        self.max_concurrency = max_concurrency
+
+    @property
+    def async_client(self):
+        """
+        実行中のイベントループ用の AsyncOpenAI クライアントを共有レジストリから取得
+
+        クライアントはイベントループに紐づくため、インスタンスには保持せず呼び出しごとに
+        レジストリから引く（asyncio.run を繰り返しても閉じたループのクライアントを使わない）。
+        """
+        if self._async_client is not None:
+            return self._async_client
         try:
-            # APIキーが設定されていない場合は事前チェック
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY が設定されていません。")
+            return self.client_registry.get_async(api_key, self.base_url, self.model)
+        except ImportError:
+            raise ImportError(
+                "openai パッケージがインストールされていません。'pip install openai' を実行してください。"
+            )
 
-            # 心理戦メッセージ用プロンプト
-            prompt = f"""
-あなたは {self.name} というじゃんけんAIです。
-これからじゃんけん勝負を始める前に、相手に心理的プレッシャーをかける短い一言を言ってください。
+    def _semaphore(self) -> asyncio.Semaphore:
+        """実行中のイベントループに対応するセマフォを取得"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
 
-要求：
-- 15文字以内の短いメッセージ
-- 挑発的だが品位を保った内容
-- じゃんけんに関連した内容
+    async def _begin_call_async(self, request: dict) -> Optional[RatePermit]:
+        """_begin_call の非同期版（レート制限の枠をイベントループを塞がずに待つ）"""
+        self.circuit_breaker.check()
+        limiter = self.rate_limiter
+        if limiter is None:
+            return None
+        try:
+            return await limiter.acquire_async(self._request_tokens(request))
+        except BaseException:
+            # タイムアウトやキャンセルでも half_open のプローブ枠を残さない
+            self.circuit_breaker.abandon()
+            raise
 
-例：「君の手は読めているよ」「勝負の時間だ！」
-"""
+    async def _create_completion_async(self, call_site: str, request: dict):
+        """同時実行数を制限して非同期に chat.completions.create を呼び出し、計測する"""
+        client = self.async_client
+        async with self._semaphore():
+            # プローブ枠の取得後にキャンセルされないよう、セマフォ取得後に判定する
+            permit = await self._begin_call_async(request)
+            start = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(**request)
+            except asyncio.CancelledError:
+                self._abandon_call(permit)
+                raise
+            except Exception as e:
+                self._end_call(permit, start, e)
+                self.metrics.record_call(
+                    call_site, self.model, time.perf_counter() - start, error=e
+                )
+                raise
+        self._end_call(permit, start)
+        self.metrics.record_call(
+            call_site,
+            self.model,
+            time.perf_counter() - start,
+            usage=getattr(response, "usage", None),
+        )
+        return response
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=50,
-                temperature=0.8,
+    async def _stream_choice_async(
+        self,
+        cache_key: Optional[str],
+        request: Optional[dict] = None,
+        expired: Optional[threading.Event] = None,
+    ) -> Choice:
+        """_stream_choice の非同期版"""
+        if request is None:
+            request = self._stream_request()
+        client = self.async_client
+        text = ""
+        pieces = 0
+        choice = None
+        ttft = None
+        async with self._semaphore():
+            permit = await self._begin_call_async(request)
+            start = time.perf_counter()
+            try:
+                stream = await client.chat.completions.create(**request)
+                try:
+                    async for chunk in stream:
+                        delta = (
+                            chunk.choices[0].delta.content if chunk.choices else None
+                        )
+                        if not delta:
+                            continue
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        pieces += 1
+                        text += delta
+                        choice = _scan_unambiguous_choice(text.lower())
+                        if choice is not None:
+                            break
+                finally:
+                    await stream.close()
+            except asyncio.CancelledError:
+                self._abandon_call(permit)
+                raise
+            except Exception as e:
+                self._end_call(permit, start, e)
+                self.metrics.record_call(
+                    CALL_SITE_CHOICE, self.model, time.perf_counter() - start, error=e
+                )
+                raise
+
+        self._end_call(permit, start)
+        self._record_stream(request, start, ttft, pieces, choice is not None)
+        return self._choice_from_content(text, cache_key, expired)
+
+    async def _request_choice_async(
+        self,
+        cache_key: Optional[str],
+        request: dict,
+        expired: Optional[threading.Event] = None,
+    ) -> Choice:
+        """_request_choice の非同期版"""
+        if self._use_stream:
+            return await self._stream_choice_async(cache_key, request, expired)
+        response = await self._create_completion_async(CALL_SITE_CHOICE, request)
+        return self._choice_from_response(response, cache_key, expired)
+
+    @classmethod
+    def _keep_late_task(cls, task: "asyncio.Task"):
+        """期限切れ後も続く問い合わせを完了まで保持する（結果はキャッシュにのみ使う）"""
+        cls._late_tasks.add(task)
+
+        def _done(finished: "asyncio.Task"):
+            cls._late_tasks.discard(finished)
+            if not finished.cancelled():
+                # 未取得の例外として警告されないよう読み捨てる
+                finished.exception()
+
+        task.add_done_callback(_done)
+
+    async def make_choice_async(self) -> Choice:
+        """AsyncOpenAI を使用して手を決定（move_timeout の扱いは同期版と同じ）"""
+        committed = self._take_committed_choice()
+        if committed is not None:
+            return committed
+
+        cache_key, cached = self._lookup_decision()
+        if cached is not None:
+            return cached
+
+        try:
+            request = (
+                self._stream_request() if self._use_stream else self._choice_request()
+            )
+            if self.move_timeout is None:
+                return await self._request_choice_async(cache_key, request)
+
+            expired = threading.Event()
+            task = asyncio.ensure_future(
+                self._request_choice_async(cache_key, request, expired)
             )
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(task), timeout=self.move_timeout
+                )
+            except asyncio.TimeoutError:
+                expired.set()
+                self._keep_late_task(task)
+                return self._deadline_choice()
+
+        except Exception as e:
+            return self._fallback_choice(e)
+
+    async def get_psychological_message_async(self) -> str:
+        """AsyncOpenAI を使用して心理戦メッセージを生成"""
+        pooled = self._pooled_message()
+        if pooled is not None:
+            return pooled
 
-            content = response.choices[0].message.content
-            message = content.strip() if content else "気合いだ！"
-            # 不要なクォートを削除
-            message = message.strip('"').strip("'")
-            # メッセージが長すぎる場合は切り詰め
-            if len(message) > 20:
-                message = message[:17] + "..."
-            return message
+        if self.combined_mode:
+            round_index = self.game_history.total_recorded
+            try:
+                response = await self._create_completion_async(
+                    CALL_SITE_COMBINED, self._combined_request()
+                )
+            except Exception as e:
+                return self._fallback_message(e, CALL_SITE_COMBINED)
+            message = self._commit_combined(response, round_index)
+            if message is not None:
+                return message
+
+        try:
+            response = await self._create_completion_async(
+                CALL_SITE_MESSAGE, self._message_request()
+            )
+            return self._format_message(response.choices[0].message.content)
 
         except Exception as e:
-            # APIキー未設定の場合は静かに処理、その他のエラーは表示
-            if "OPENAI_API_KEY" in str(e):
-                pass  # APIキー未設定は想定内なので静かに処理
-            else:
-                print(f"デバッグ: 心理戦メッセージ生成エラー: {e}")
-
-            # フォールバックメッセージを選択
-            fallback_messages = [
-                "勝負だ！",
-                "本気を見せる時だ",
-                "君の実力を見せてもらおう",
-                "面白くなりそうだ",
-                "負けないぞ！",
-                "覚悟はできたか？",
-                "手加減はしないぞ！",
-            ]
-            return random.choice(fallback_messages)
+            return self._fallback_message(e)
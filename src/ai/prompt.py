@@ -0,0 +1,161 @@
+"""
+LLM 用プロンプトの組み立て
+静的な指示文を常に同一の先頭部分（プロバイダ側のプロンプトキャッシュ対象）とし、
+可変の履歴は末尾に 1 行ずつ追記していく
+"""
+
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from ..game.engine import Choice
+
+# 手の決定用システムメッセージ（全リクエストで同一）
+CHOICE_SYSTEM_MESSAGE = "あなたはじゃんけんの専門家です。与えられた指示に従って、適切な手を選択してください。"
+
+# 手の決定用プロンプトの静的な先頭部分（全リクエストでバイト単位で同一）
+CHOICE_PROMPT_PREFIX = """
+あなたはじゃんけんプレイヤーです。次に出す手を決めてください。
+
+選択肢は以下の通りです：
+- rock (グー)
+- paper (パー)
+- scissors (チョキ)
+
+末尾にこれまでの対戦記録がある場合はそれも踏まえて、次に出すべき手を「rock」「paper」「scissors」のいずれかで回答してください。
+他の文字や説明は不要で、単語のみを回答してください。
+"""
+
+HISTORY_HEADER = "\n過去のゲーム履歴:\n"
+
+# トークナイザーのキャッシュ（モデル名 → tiktoken のエンコーディング、未導入なら None）
+_encodings: Dict[str, object] = {}
+# トークン数計測関数のキャッシュ（モデル名 → 関数）
+_encoders: Dict[str, Callable[[str], int]] = {}
+# 手の単語のトークン ID のキャッシュ（モデル名 → {トークンID: 手}、解決できなければ None）
+_move_token_ids: Dict[str, Optional[Dict[int, Choice]]] = {}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    tiktoken が無い環境向けのトークン数の概算
+
+    ASCII 文字はおよそ 4 文字で 1 トークン、それ以外（日本語など）は 1 文字 1 トークンとみなす。
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _get_encoding(model: str):
+    """モデルに対応する tiktoken のエンコーディングを取得（未導入なら None）"""
+    if model not in _encodings:
+        try:
+            import tiktoken
+
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = tiktoken.get_encoding("o200k_base")
+        except ImportError:
+            _encodings[model] = None
+    return _encodings[model]
+
+
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """モデルに対応するトークン数計測関数を取得（tiktoken が無ければ概算）"""
+    counter = _encoders.get(model)
+    if counter is None:
+        encoding = _get_encoding(model)
+        if encoding is None:
+            counter = estimate_tokens
+        else:
+            counter = lambda text: len(encoding.encode(text))  # noqa: E731
+        _encoders[model] = counter
+    return counter
+
+
+def resolve_move_token_ids(model: str) -> Optional[Dict[int, Choice]]:
+    """
+    3 つの手の単語（rock / paper / scissors）のトークン ID を解決してキャッシュ
+
+    全ての単語が 1 トークンで表せる場合のみ {トークンID: 手} を返し、
+    tiktoken が無い場合や複数トークンになる単語がある場合は None を返す。
+    """
+    if model not in _move_token_ids:
+        encoding = _get_encoding(model)
+        token_ids: Optional[Dict[int, Choice]] = None
+        if encoding is not None:
+            encoded = {choice: encoding.encode(choice.value) for choice in Choice}
+            if all(len(tokens) == 1 for tokens in encoded.values()):
+                token_ids = {tokens[0]: choice for choice, tokens in encoded.items()}
+        _move_token_ids[model] = token_ids
+    return _move_token_ids[model]
+
+
+class PromptBuilder:
+    """
+    履歴を差分で描画するプロンプトビルダー
+
+    各ラウンドの履歴行は記録時に 1 度だけ描画して直近 max_history 行を保持し、
+    組み立て済みのプロンプトは次の記録までキャッシュする。
+    行番号には通算ラウンド番号を使うため、ウィンドウが進んでも既存の行は変わらない。
+
+    Args:
+        max_history: プロンプトに含める直近の履歴数
+        model: トークン数の計測に使うモデル名
+    """
+
+    def __init__(self, max_history: int = 5, model: str = "gpt-4o-mini"):
+        self._count_tokens = get_token_counter(model)
+        self._lines: Deque[Tuple[str, int]] = deque(maxlen=max_history)
+        self._prompt: Optional[str] = None
+        self.prefix_tokens = self._count_tokens(
+            CHOICE_SYSTEM_MESSAGE
+        ) + self._count_tokens(CHOICE_PROMPT_PREFIX)
+        self._header_tokens = self._count_tokens(HISTORY_HEADER)
+
+    @property
+    def max_history(self) -> int:
+        """保持する履歴行数"""
+        return self._lines.maxlen
+
+    def record(
+        self, round_number: int, player_choice: Choice, ai_choice: Choice, result: str
+    ):
+        """1 ラウンド分の履歴行を描画して追加"""
+        line = (
+            f"{round_number}. プレイヤー: {player_choice.value}, "
+            f"あなた: {ai_choice.value}, 結果: {result}\n"
+        )
+        self._lines.append((line, self._count_tokens(line)))
+        self._prompt = None
+
+    def build(self) -> str:
+        """ユーザープロンプトを組み立てる（静的な先頭部分 + 履歴）"""
+        if self._prompt is None:
+            if self._lines:
+                self._prompt = (
+                    CHOICE_PROMPT_PREFIX
+                    + HISTORY_HEADER
+                    + "".join(line for line, _ in self._lines)
+                )
+            else:
+                self._prompt = CHOICE_PROMPT_PREFIX
+        return self._prompt
+
+    def messages(self) -> List[dict]:
+        """chat.completions.create 用のメッセージ列を組み立てる"""
+        return [
+            {"role": "system", "content": CHOICE_SYSTEM_MESSAGE},
+            {"role": "user", "content": self.build()},
+        ]
+
+    @property
+    def token_count(self) -> int:
+        """システムメッセージを含むプロンプト全体のトークン数"""
+        if not self._lines:
+            return self.prefix_tokens
+        return (
+            self.prefix_tokens
+            + self._header_tokens
+            + sum(tokens for _, tokens in self._lines)
+        )
@@ -0,0 +1,354 @@
+"""
+クライアント側のレート制限
+リクエスト数／分・トークン数／分のトークンバケットと、429 とレイテンシに応じて
+同時実行数を増減させる AIMD 制御を組み合わせ、上限付きの待ち行列で呼び出しを待たせる
+"""
+
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from .metrics import Histogram
+
+# 同時実行数の空き待ちを非同期で確認する間隔（秒）
+_ASYNC_POLL_INTERVAL = 0.005
+
+
+class RateLimitTimeout(RuntimeError):
+    """待ち時間の上限までに呼び出し枠を確保できなかったことを示す例外"""
+
+
+class TokenBucket:
+    """
+    1 分あたりの量で指定するトークンバケット（ロックは呼び出し側で取る）
+
+    Args:
+        per_minute: 1 分あたりに補充する量
+        burst_seconds: 一度に使える量（何秒分の補充量を貯められるか）
+        clock: 時刻取得関数
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "_clock")
+
+    def __init__(
+        self,
+        per_minute: float,
+        burst_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self._clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """amount を消費できるまでの待ち時間（秒）。容量を超える量は容量として扱う"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        """amount を消費（wait_time が 0 の直後に呼ぶ）"""
+        self.tokens -= min(amount, self.capacity)
+
+
+class RatePermit:
+    """確保した呼び出し枠。呼び出し完了後に release で結果と共に返却する"""
+
+    __slots__ = ("_limiter", "_epoch", "_released")
+
+    def __init__(self, limiter: "RateLimiter", epoch: int = 0):
+        self._limiter = limiter
+        # 枠を確保した時点の上限の世代（世代ごとに上限を下げるのは 1 回まで）
+        self._epoch = epoch
+        self._released = False
+
+    def release(
+        self, latency: Optional[float] = None, error: Optional[Exception] = None
+    ):
+        """
+        枠を返却し、結果を同時実行数の制御に反映する
+
+        latency と error が共に None の場合（呼び出し前の中断など）は制御に反映しない。
+        """
+        if self._released:
+            return
+        self._released = True
+        self._limiter._release(latency, error, self._epoch)
+
+
+class RateLimiter:
+    """
+    トークンバケットと AIMD による同時実行数制御を組み合わせたレート制限
+
+    429 を受けるか latency_target を超えた場合は同時実行数の上限を半分にし、
+    それ以外の成功ごとに 1/上限 ずつ増やす（上限 1 回分で約 +1）。
+    上限を下げるのは 1 ウィンドウ（前回下げた後に確保された呼び出し）につき 1 回までで、
+    同時に送った呼び出しがまとめて遅れても上限が 1 まで落ち込まない。
+    枠が空くまで最大 max_wait 秒待ち、超えた場合は RateLimitTimeout を送出する。
+
+    Args:
+        requests_per_minute: リクエスト数／分の上限（None は無制限）
+        tokens_per_minute: トークン数／分の上限（None は無制限）
+        max_concurrency: 同時実行数の上限の最大値
+        initial_concurrency: 同時実行数の上限の初期値
+        latency_target: この秒数を超える応答を混雑とみなす（None はレイテンシを使わない）
+        max_wait: 枠を待つ最大秒数
+        burst_seconds: バケットに貯められる補充量（秒数分）
+        clock: 時刻取得関数
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 100,
+        initial_concurrency: int = 10,
+        latency_target: Optional[float] = None,
+        max_wait: float = 30.0,
+        burst_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self._requests = (
+            TokenBucket(requests_per_minute, burst_seconds, clock)
+            if requests_per_minute
+            else None
+        )
+        self._tokens = (
+            TokenBucket(tokens_per_minute, burst_seconds, clock)
+            if tokens_per_minute
+            else None
+        )
+        self.max_concurrency = max_concurrency
+        self.limit = float(min(initial_concurrency, max_concurrency))
+        self.latency_target = latency_target
+        self.max_wait = max_wait
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._throttled = 0
+        # 上限を下げるたびに進める世代
+        self._epoch = 0
+        self._wait = Histogram()
+
+    @classmethod
+    def from_env(cls) -> Optional["RateLimiter"]:
+        """
+        環境変数から生成（いずれも未設定なら None）
+
+        OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT, OPENAI_CONCURRENCY_LIMIT,
+        OPENAI_LATENCY_TARGET, OPENAI_RATE_LIMIT_MAX_WAIT を読み取る。
+        """
+        rpm = os.getenv("OPENAI_RPM_LIMIT")
+        tpm = os.getenv("OPENAI_TPM_LIMIT")
+        concurrency = os.getenv("OPENAI_CONCURRENCY_LIMIT")
+        if not (rpm or tpm or concurrency):
+            return None
+        max_concurrency = int(concurrency) if concurrency else 100
+        latency_target = os.getenv("OPENAI_LATENCY_TARGET")
+        return cls(
+            requests_per_minute=float(rpm) if rpm else None,
+            tokens_per_minute=float(tpm) if tpm else None,
+            max_concurrency=max_concurrency,
+            initial_concurrency=min(10, max_concurrency),
+            latency_target=float(latency_target) if latency_target else None,
+            max_wait=float(os.getenv("OPENAI_RATE_LIMIT_MAX_WAIT", "30")),
+        )
+
+    def _try_acquire(self, tokens: float) -> float:
+        """
+        枠の確保を試みる（ロック取得済みで呼ぶ）
+
+        Returns:
+            float: 確保できた場合 0、できない場合は次に試すまでの待ち時間（同時実行数の
+            空き待ちは inf）
+        """
+        if self._in_flight >= max(1, int(self.limit)):
+            return math.inf
+        wait = 0.0
+        if self._requests is not None:
+            wait = max(wait, self._requests.wait_time(1))
+        if self._tokens is not None and tokens:
+            wait = max(wait, self._tokens.wait_time(tokens))
+        if wait > 0:
+            return wait
+
+        if self._requests is not None:
+            self._requests.consume(1)
+        if self._tokens is not None and tokens:
+            self._tokens.consume(tokens)
+        self._in_flight += 1
+        self._acquired += 1
+        return 0.0
+
+    def _permit(self, start: float) -> RatePermit:
+        """確保した枠を返す（ロック取得済みで呼ぶ）"""
+        self._wait.observe(self._clock() - start)
+        return RatePermit(self, self._epoch)
+
+    def _enqueue(self):
+        self._waiting += 1
+        self._max_waiting = max(self._max_waiting, self._waiting)
+
+    def _timeout(self, waited: float):
+        self._timeouts += 1
+        self._wait.observe(waited)
+        raise RateLimitTimeout(
+            f"{waited:.1f} 秒待っても API の呼び出し枠を確保できませんでした。"
+        )
+
+    def acquire(self, tokens: float = 0) -> RatePermit:
+        """呼び出し枠を確保するまで待つ（最大 max_wait 秒）"""
+        start = self._clock()
+        with self._condition:
+            self._enqueue()
+            try:
+                while True:
+                    wait = self._try_acquire(tokens)
+                    if wait == 0:
+                        break
+                    waited = self._clock() - start
+                    remaining = self.max_wait - waited
+                    if remaining <= 0:
+                        self._timeout(waited)
+                    self._condition.wait(min(wait, remaining))
+            finally:
+                self._waiting -= 1
+            return self._permit(start)
+
+    async def acquire_async(self, tokens: float = 0) -> RatePermit:
+        """acquire の非同期版（イベントループを塞がずに待つ）"""
+        start = self._clock()
+        with self._condition:
+            self._enqueue()
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_acquire(tokens)
+                    if wait == 0:
+                        return self._permit(start)
+                    waited = self._clock() - start
+                    remaining = self.max_wait - waited
+                    if remaining <= 0:
+                        self._timeout(waited)
+                # 同時実行数の空きは通知されないため短い間隔で確認する
+                delay = _ASYNC_POLL_INTERVAL if wait == math.inf else wait
+                await asyncio.sleep(min(delay, remaining))
+        finally:
+            with self._condition:
+                self._waiting -= 1
+
+    def _decrease(self, epoch: int):
+        """上限を半分にする（同じ世代の呼び出しでは 1 回だけ。ロック取得済みで呼ぶ）"""
+        if epoch == self._epoch:
+            self.limit = max(1.0, self.limit / 2)
+            self._epoch += 1
+
+    def _release(
+        self, latency: Optional[float], error: Optional[Exception], epoch: int = 0
+    ):
+        """枠を返却し、AIMD で同時実行数の上限を更新"""
+        with self._condition:
+            self._in_flight -= 1
+            if getattr(error, "status_code", None) == 429:
+                self._throttled += 1
+                self._decrease(epoch)
+            elif (
+                error is None
+                and latency is not None
+                and self.latency_target is not None
+                and latency > self.latency_target
+            ):
+                self._decrease(epoch)
+            elif error is None and latency is not None:
+                self.limit = min(
+                    float(self.max_concurrency), self.limit + 1 / self.limit
+                )
+            self._condition.notify_all()
+
+    @property
+    def queue_depth(self) -> int:
+        """枠を待っている呼び出し数"""
+        with self._condition:
+            return self._waiting
+
+    def snapshot(self) -> dict:
+        """同時実行数・待ち行列・待ち時間の計測値を取得"""
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "queue_depth": self._waiting,
+                "max_queue_depth": self._max_waiting,
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "throttled": self._throttled,
+                "wait": self._wait.snapshot(),
+            }
+
+    def to_json(self) -> str:
+        """snapshot を JSON 文字列として出力"""
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self) -> str:
+        """計測値を Prometheus のテキスト形式で出力"""
+        snapshot = self.snapshot()
+        wait = snapshot["wait"]
+        lines = [
+            "# TYPE llm_rate_limit_concurrency_limit gauge",
+            f"llm_rate_limit_concurrency_limit {snapshot['limit']:.3f}",
+            "# TYPE llm_rate_limit_in_flight gauge",
+            f"llm_rate_limit_in_flight {snapshot['in_flight']}",
+            "# TYPE llm_rate_limit_queue_depth gauge",
+            f"llm_rate_limit_queue_depth {snapshot['queue_depth']}",
+            "# TYPE llm_rate_limit_wait_seconds summary",
+        ]
+        for key in ("p50", "p95", "p99"):
+            quantile = int(key[1:]) / 100
+            lines.append(
+                f'llm_rate_limit_wait_seconds{{quantile="{quantile}"}} {wait[key]:.6f}'
+            )
+        lines.append(f"llm_rate_limit_wait_seconds_sum {wait['sum']:.6f}")
+        lines.append(f"llm_rate_limit_wait_seconds_count {wait['count']}")
+        lines.append("# TYPE llm_rate_limit_timeouts_total counter")
+        lines.append(f"llm_rate_limit_timeouts_total {snapshot['timeouts']}")
+        lines.append("# TYPE llm_rate_limit_throttled_total counter")
+        lines.append(f"llm_rate_limit_throttled_total {snapshot['throttled']}")
+        return "\n".join(lines) + "\n"
+
+
+# 全ての LLMAIPlayer で共有する既定のレート制限（遅延初期化）
+_shared_limiter: Optional[RateLimiter] = None
+_shared_limiter_loaded = False
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> Optional[RateLimiter]:
+    """
+    共有のレート制限を取得（環境変数で設定していなければ None）
+
+    最初に呼ばれた時点の環境変数から生成する（src.ai.config を参照）。
+    """
+    global _shared_limiter, _shared_limiter_loaded
+    if not _shared_limiter_loaded:
+        with _shared_limiter_lock:
+            if not _shared_limiter_loaded:
+                _shared_limiter = RateLimiter.from_env()
+                _shared_limiter_loaded = True
+    return _shared_limiter
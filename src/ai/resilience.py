@@ -0,0 +1,206 @@
+"""
+LLM API 障害時の保護（サーキットブレーカー）
+連続した失敗や 429 で回路を開き、開いている間は API を呼ばずに即座にフォールバックさせる
+"""
+
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+_STATES = (STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN)
+
+
+class CircuitOpenError(RuntimeError):
+    """回路が開いているため API 呼び出しを行わなかったことを示す例外"""
+
+
+def is_failure(error: Exception) -> bool:
+    """
+    回路を開く原因として数える例外かどうかを判定
+
+    接続エラー・タイムアウト（ステータスコード無し）、429、5xx を失敗とする。
+    それ以外の 4xx はリクエスト側の問題のため、API は応答しているものとみなす。
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        return not isinstance(error, CircuitOpenError)
+    return status == 429 or status >= 500
+
+
+class CircuitBreaker:
+    """
+    スレッドセーフなサーキットブレーカー
+
+    closed で failure_threshold 回連続して失敗すると open になり、待機時間が過ぎると
+    half_open として 1 件だけ試行（プローブ）を通す。プローブが成功すれば closed、
+    失敗すれば待機時間を倍にして open に戻る。待機時間には上限と揺らぎ（ジッター）がある。
+
+    Args:
+        name: 計測値のラベル
+        failure_threshold: 回路を開く連続失敗回数
+        base_delay: 最初の待機時間（秒）
+        max_delay: 待機時間の上限（秒）
+        clock: 時刻取得関数（テスト用）
+        rng: ジッター用の乱数生成器（テスト用）
+    """
+
+    def __init__(
+        self,
+        name: str = "openai",
+        failure_threshold: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        # 連続して開いた回数（待機時間の指数）
+        self._attempt = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._transitions: Dict[str, int] = {}
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """現在の状態（待機時間が過ぎた open は half_open として返す）"""
+        with self._lock:
+            if self._state == STATE_OPEN and self._clock() >= self._open_until:
+                return STATE_HALF_OPEN
+            return self._state
+
+    def _transition(self, state: str):
+        """状態を遷移させて遷移回数を記録（ロック取得済みで呼ぶ）"""
+        key = f"{self._state}->{state}"
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        self._state = state
+
+    def _open(self):
+        """待機時間を決めて回路を開く（ロック取得済みで呼ぶ）"""
+        delay = min(self.max_delay, self.base_delay * 2**self._attempt)
+        # 同時に回復を待つ多数のプロセスが一斉に再試行しないよう揺らぎを加える
+        delay = self._rng.uniform(delay / 2, delay)
+        self._attempt += 1
+        self._open_until = self._clock() + delay
+        self._transition(STATE_OPEN)
+
+    def allow(self) -> bool:
+        """API を呼び出してよいかを判定（half_open では 1 件だけ許可）"""
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_OPEN:
+                if self._clock() < self._open_until:
+                    self._rejected += 1
+                    return False
+                self._transition(STATE_HALF_OPEN)
+            if self._probe_in_flight:
+                self._rejected += 1
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def check(self):
+        """API を呼び出せない場合に CircuitOpenError を送出"""
+        if not self.allow():
+            raise CircuitOpenError(
+                f"サーキットブレーカー '{self.name}' が開いているため API を呼び出しません。"
+            )
+
+    def record_success(self):
+        """呼び出し成功を記録"""
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != STATE_CLOSED:
+                self._attempt = 0
+                self._transition(STATE_CLOSED)
+
+    def record_failure(self):
+        """呼び出し失敗を記録"""
+        with self._lock:
+            self._failures += 1
+            if self._state == STATE_HALF_OPEN:
+                self._probe_in_flight = False
+                self._open()
+            elif (
+                self._state == STATE_CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def abandon(self):
+        """結果を得ずに終わった呼び出し（キャンセルなど）を記録し、プローブ枠を解放"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_result(self, error: Optional[Exception] = None):
+        """呼び出し結果を記録（失敗とみなさない例外は成功として扱う）"""
+        if error is not None and is_failure(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def snapshot(self) -> dict:
+        """状態・遷移回数・拒否回数を取得"""
+        state = self.state
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "transitions": dict(self._transitions),
+                "rejected": self._rejected,
+            }
+
+    def to_json(self) -> str:
+        """snapshot を JSON 文字列として出力"""
+        return json.dumps(self.snapshot(), ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        """状態と遷移回数を Prometheus のテキスト形式で出力"""
+        snapshot = self.snapshot()
+        labels = f'name="{self.name}"'
+        lines = [
+            "# TYPE llm_circuit_state gauge",
+            "# TYPE llm_circuit_transitions_total counter",
+            "# TYPE llm_circuit_rejected_total counter",
+        ]
+        for state in _STATES:
+            value = 1 if snapshot["state"] == state else 0
+            lines.append(f'llm_circuit_state{{{labels},state="{state}"}} {value}')
+        for key, count in sorted(snapshot["transitions"].items()):
+            source, target = key.split("->")
+            lines.append(
+                f'llm_circuit_transitions_total{{{labels},from="{source}",to="{target}"}} {count}'
+            )
+        lines.append(f"llm_circuit_rejected_total{{{labels}}} {snapshot['rejected']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """状態と計測値を初期化"""
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._attempt = 0
+            self._open_until = 0.0
+            self._probe_in_flight = False
+            self._transitions.clear()
+            self._rejected = 0
+
+
+# 全ての LLMAIPlayer で共有する既定のサーキットブレーカー
+CIRCUIT_BREAKER = CircuitBreaker()
@@ -0,0 +1,364 @@
+"""
+ローカルで動作する OpenAI 互換の /v1/chat/completions スタンドインサーバー
+実際の HTTP クライアント経路を通した負荷・レイテンシ試験をオフラインで再現可能に行う
+
+使い方:
+    python -m src.ai.stub_server --port 8000 --latency lognormal:-3,0.5 --rate-limit-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8000/v1 OPENAI_API_KEY=dummy python main.py
+"""
+
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+from ..game.engine import CHOICES_BY_CODE
+from .prompt import estimate_tokens
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    レイテンシ分布の指定文字列からサンプリング関数を生成
+
+    指定形式（単位は秒）:
+        fixed:0.05 / uniform:0.01,0.2 / exp:0.05 / lognormal:-3,0.5（mu,sigma）
+    """
+    kind, _, params = spec.partition(":")
+    try:
+        values = [float(v) for v in params.split(",")] if params else []
+        if kind == "fixed" and len(values) == 1:
+            return lambda rng: values[0]
+        if kind == "uniform" and len(values) == 2:
+            return lambda rng: rng.uniform(values[0], values[1])
+        if kind == "exp" and len(values) == 1:
+            return lambda rng: (
+                rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+            )
+        if kind == "lognormal" and len(values) == 2:
+            return lambda rng: rng.lognormvariate(values[0], values[1])
+    except ValueError:
+        pass
+    raise ValueError(f"不正なレイテンシ指定です: '{spec}'")
+
+
+@dataclass
+class StubConfig:
+    """
+    スタンドインサーバーの動作設定
+
+    Args:
+        latency: レイテンシ分布の指定（parse_latency の形式）
+        error_rate: 500 エラーを返す確率
+        rate_limit_rate: 429 エラーを返す確率
+        answers: 応答内容の台本（順番に繰り返し使用）。空の場合はランダムな手
+        seed: 乱数シード（レイテンシ・エラー注入・ランダムな手を再現可能にする）
+        token_interval: ストリーミング時のトークン間隔（秒）
+    """
+
+    latency: str = "fixed:0"
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    answers: List[str] = field(default_factory=list)
+    seed: Optional[int] = None
+    token_interval: float = 0.0
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    """負荷試験で多数の接続を同時に受け付けられるよう待ち行列を大きくした HTTP サーバー"""
+
+    daemon_threads = True
+    # 既定値（5）では同時接続時に SYN の再送が起き、秒単位の遅延として計測されてしまう
+    request_queue_size = 1024
+
+
+class StubOpenAIServer:
+    """
+    OpenAI 互換 API のスタンドインサーバー
+
+    with 文またはstart()/stop() でバックグラウンドスレッドとして起動できる。
+    base_url を LLMAIPlayer（OPENAI_BASE_URL）に渡すと実際のクライアント経路で通信する。
+    """
+
+    def __init__(
+        self,
+        config: Optional[StubConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.config = config or StubConfig()
+        self._sample_latency = parse_latency(self.config.latency)
+        self._rng = random.Random(self.config.seed)
+        self._answers = (
+            itertools.cycle(self.config.answers) if self.config.answers else None
+        )
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "ok": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "stream_cancelled": 0,
+        }
+        self._httpd = _StubHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI クライアントに渡すベース URL"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubOpenAIServer":
+        """バックグラウンドスレッドでサーバーを起動"""
+        # 停止要求への応答を速くするため、ポーリング間隔を短くする
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """サーバーを停止"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def serve_forever(self):
+        """現在のスレッドでサーバーを実行（コマンドライン用）"""
+        self._httpd.serve_forever()
+
+    def __enter__(self) -> "StubOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _plan(self, request: dict):
+        """リクエスト 1 件分の (遅延秒数, ステータス, 応答内容) を決める"""
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = max(0.0, self._sample_latency(self._rng))
+            roll = self._rng.random()
+            if roll < self.config.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return delay, 429, None
+            if roll < self.config.rate_limit_rate + self.config.error_rate:
+                self.stats["errors"] += 1
+                return delay, 500, None
+
+            self.stats["ok"] += 1
+            if self._answers is not None:
+                return delay, 200, next(self._answers)
+            move = self._rng.choice(CHOICES_BY_CODE).value
+            response_format = (request.get("response_format") or {}).get("type")
+            if response_format == "json_object":
+                return delay, 200, json.dumps({"message": "勝負だ！", "move": move})
+            if response_format == "json_schema":
+                return delay, 200, json.dumps({"move": move})
+            return delay, 200, move
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                # 負荷試験中に標準エラー出力が溢れないよう抑制する
+                pass
+
+            def _send_json(
+                self, status: int, body: dict, headers: Optional[dict] = None
+            ):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(
+                        200,
+                        {"object": "list", "data": [{"id": "stub", "object": "model"}]},
+                    )
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": {"message": "invalid json"}})
+                    return
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                delay, status, content = server._plan(request)
+                if delay:
+                    time.sleep(delay)
+
+                if status == 429:
+                    self._send_json(
+                        429,
+                        {
+                            "error": {
+                                "message": "Rate limit reached",
+                                "type": "requests",
+                            }
+                        },
+                        {"Retry-After": "1"},
+                    )
+                elif status != 200:
+                    self._send_json(
+                        status,
+                        {
+                            "error": {
+                                "message": "Injected server error",
+                                "type": "server_error",
+                            }
+                        },
+                    )
+                elif request.get("stream"):
+                    self._send_stream(request, content)
+                else:
+                    self._send_json(200, _completion_body(request, content))
+
+            def _send_stream(self, request: dict, content: str):
+                """応答をトークン単位の SSE（chat.completion.chunk）で送信"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                # 長さが事前に分からないため、送信後に接続を閉じて終端を示す
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                chunk_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+                model = request.get("model", "stub")
+                pieces = _split_tokens(content)
+                try:
+                    for index, piece in enumerate(pieces):
+                        if index and server.config.token_interval:
+                            time.sleep(server.config.token_interval)
+                        delta = {"content": piece}
+                        if index == 0:
+                            delta["role"] = "assistant"
+                        self._send_event(_chunk_body(chunk_id, model, delta, None))
+                    self._send_event(_chunk_body(chunk_id, model, {}, "stop"))
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # クライアントが途中で受信を打ち切った
+                    with server._lock:
+                        server.stats["stream_cancelled"] += 1
+
+            def _send_event(self, body: dict):
+                data = json.dumps(body, ensure_ascii=False)
+                self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        return Handler
+
+
+def _split_tokens(content: str) -> List[str]:
+    """ストリーミング用に応答を単語（空白込み）単位に分割"""
+    pieces = re.findall(r"\S+\s*|\s+", content)
+    return pieces or [""]
+
+
+def _chunk_body(
+    chunk_id: str, model: str, delta: dict, finish_reason: Optional[str]
+) -> dict:
+    """chat.completion.chunk 形式のイベントを生成"""
+    return {
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def _completion_body(request: dict, content: str) -> dict:
+    """chat.completion 形式のレスポンスを生成"""
+    prompt_tokens = sum(
+        estimate_tokens(str(message.get("content", "")))
+        for message in request.get("messages", [])
+    )
+    completion_tokens = estimate_tokens(content)
+    return {
+        "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main(argv=None):
+    """コマンドラインからスタンドインサーバーを起動"""
+    parser = argparse.ArgumentParser(description="OpenAI 互換スタンドインサーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="fixed:0", help="例: uniform:0.05,0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--answer", action="append", default=[], help="台本の応答（複数指定可）"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--token-interval",
+        type=float,
+        default=0.0,
+        help="ストリーミング時のトークン間隔",
+    )
+    args = parser.parse_args(argv)
+
+    config = StubConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        answers=args.answer,
+        seed=args.seed,
+        token_interval=args.token_interval,
+    )
+    server = StubOpenAIServer(config, host=args.host, port=args.port)
+    print(f"🧪 スタンドインサーバーを起動しました: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+"""
+ローカル予測を優先し、不確かな場合だけ LLM に問い合わせる段階的 AI プレイヤー
+"""
+
+import os
+import time
+from typing import Dict, Optional
+
+from ..game.engine import Choice
+from .pattern import PatternAIPlayer
+from .player import AIPlayer, LLMAIPlayer
+
+# 手を決定した段階
+TIER_LOCAL = "local"
+TIER_REMOTE = "remote"
+
+DEFAULT_CONFIDENCE_THRESHOLD = 0.6
+
+
+class TieredAIPlayer(AIPlayer):
+    """
+    ローカル予測器と LLM を組み合わせた AI プレイヤー
+
+    ローカル予測器の確信度がしきい値未満で、かつセッションの問い合わせ予算が
+    残っている場合だけ LLM に手を問い合わせる。心理戦メッセージは常に LLM 側が生成する。
+
+    Args:
+        name: プレイヤー名
+        local: 確信度（confidence）を持つローカル予測器（省略時は PatternAIPlayer）
+        remote: 問い合わせ先の AI（省略時は LLMAIPlayer）
+        confidence_threshold: この値未満の確信度で LLM に問い合わせる
+            （省略時は環境変数 TIERED_CONFIDENCE_THRESHOLD、既定 0.6）
+        escalation_budget: セッションあたりの LLM 問い合わせ回数の上限。None は無制限
+            （省略時は環境変数 TIERED_ESCALATION_BUDGET）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        local: Optional[PatternAIPlayer] = None,
+        remote: Optional[AIPlayer] = None,
+        confidence_threshold: Optional[float] = None,
+        escalation_budget: Optional[int] = None,
+        **kwargs,
+    ):
+        super().__init__(name, **kwargs)
+        self.local = local if local is not None else PatternAIPlayer(name)
+        self.remote = remote if remote is not None else LLMAIPlayer(name)
+        if confidence_threshold is None:
+            confidence_threshold = float(
+                os.getenv(
+                    "TIERED_CONFIDENCE_THRESHOLD", str(DEFAULT_CONFIDENCE_THRESHOLD)
+                )
+            )
+        self.confidence_threshold = confidence_threshold
+        if escalation_budget is None and os.getenv("TIERED_ESCALATION_BUDGET"):
+            escalation_budget = int(os.getenv("TIERED_ESCALATION_BUDGET"))
+        self.escalation_budget = escalation_budget
+
+        # 直前の手を決定した段階（record_game で勝敗を段階ごとに集計する）
+        self._last_tier: Optional[str] = None
+        self._decisions = {TIER_LOCAL: 0, TIER_REMOTE: 0}
+        self._latency = {TIER_LOCAL: 0.0, TIER_REMOTE: 0.0}
+        self._rounds = {TIER_LOCAL: 0, TIER_REMOTE: 0}
+        self._wins = {TIER_LOCAL: 0, TIER_REMOTE: 0}
+
+    def _should_escalate(self) -> bool:
+        """LLM に問い合わせるかどうかを判定"""
+        if (
+            self.escalation_budget is not None
+            and self._decisions[TIER_REMOTE] >= self.escalation_budget
+        ):
+            return False
+        return self.local.confidence < self.confidence_threshold
+
+    def _record_decision(self, tier: str, start: float):
+        """手を決定した段階と所要時間を記録"""
+        self._last_tier = tier
+        self._decisions[tier] += 1
+        self._latency[tier] += time.perf_counter() - start
+
+    def make_choice(self) -> Choice:
+        """ローカル予測が十分確かならその手を、そうでなければ LLM の手を返す"""
+        start = time.perf_counter()
+        if self._should_escalate():
+            choice = self.remote.make_choice()
+            self._record_decision(TIER_REMOTE, start)
+        else:
+            choice = self.local.make_choice()
+            self._record_decision(TIER_LOCAL, start)
+        return choice
+
+    async def make_choice_async(self) -> Choice:
+        """make_choice の非同期版（LLM への問い合わせだけを await する）"""
+        start = time.perf_counter()
+        if self._should_escalate():
+            choice = await self.remote.make_choice_async()
+            self._record_decision(TIER_REMOTE, start)
+        else:
+            choice = self.local.make_choice()
+            self._record_decision(TIER_LOCAL, start)
+        return choice
+
+    def get_psychological_message(self) -> str:
+        """心理戦メッセージは LLM 側に任せる"""
+        return self.remote.get_psychological_message()
+
+    async def get_psychological_message_async(self) -> str:
+        """get_psychological_message の非同期版"""
+        return await self.remote.get_psychological_message_async()
+
+    def warm_up(self):
+        """LLM 側のクライアント初期化を前倒しする"""
+        self.remote.warm_up()
+
+    def record_game(self, player_choice: Choice, ai_choice: Choice, result: str):
+        """ゲーム履歴を記録し、両方の AI にも同じ結果を学習させる"""
+        super().record_game(player_choice, ai_choice, result)
+        self.local.record_game(player_choice, ai_choice, result)
+        self.remote.record_game(player_choice, ai_choice, result)
+
+        if self._last_tier is not None:
+            self._rounds[self._last_tier] += 1
+            # result はプレイヤー（相手）視点のため "lose" が AI の勝ち
+            if result == "lose":
+                self._wins[self._last_tier] += 1
+            self._last_tier = None
+
+    def close(self):
+        """自身と両方の AI の資源を閉じる"""
+        super().close()
+        self.local.close()
+        self.remote.close()
+
+    def _win_rate(self, tier: str) -> Optional[float]:
+        rounds = self._rounds[tier]
+        return self._wins[tier] / rounds if rounds else None
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """
+        段階ごとの判定状況を返す
+
+        - escalation_rate: LLM に問い合わせた割合
+        - latency_saved: ローカル判定で節約した推定時間（秒）。
+          LLM の平均応答時間 × ローカル判定回数 − ローカル判定の所要時間
+        - local_win_rate / remote_win_rate: 各段階で決めた手の勝率
+        - win_rate_delta: 全体の勝率 − LLM で決めた手の勝率（常に LLM を使う場合との差の推定）
+        """
+        local = self._decisions[TIER_LOCAL]
+        remote = self._decisions[TIER_REMOTE]
+        total = local + remote
+
+        latency_saved = 0.0
+        if remote:
+            average_remote = self._latency[TIER_REMOTE] / remote
+            latency_saved = max(0.0, average_remote * local - self._latency[TIER_LOCAL])
+
+        rounds = self._rounds[TIER_LOCAL] + self._rounds[TIER_REMOTE]
+        wins = self._wins[TIER_LOCAL] + self._wins[TIER_REMOTE]
+        win_rate = wins / rounds if rounds else None
+        remote_win_rate = self._win_rate(TIER_REMOTE)
+        win_rate_delta = None
+        if win_rate is not None and remote_win_rate is not None:
+            win_rate_delta = win_rate - remote_win_rate
+
+        return {
+            "decisions": total,
+            "escalations": remote,
+            "escalation_rate": remote / total if total else 0.0,
+            "latency_saved": latency_saved,
+            "win_rate": win_rate,
+            "local_win_rate": self._win_rate(TIER_LOCAL),
+            "remote_win_rate": remote_win_rate,
+            "win_rate_delta": win_rate_delta,
+        }
@@ -1,5 +1,8 @@
+import unicodedata
+from array import array
 from enum import Enum
-from typing import Optional
+from operator import add
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
 
 
 class Choice(Enum):
@@ -11,37 +14,33 @@ class Choice(Enum):
 
     @classmethod
     def from_string(cls, choice: str) -> Optional["Choice"]:
-        """文字列からChoiceを生成"""
+        """
+        文字列からChoiceを生成
+
+        よく使われる表記（大文字・全角・ひらがな・半角カナなど）は事前に作った表の
+        1 回の参照で求める。表に無い入力は NFKC 正規化・前後の空白の除去・小文字化・
+        ひらがなのカタカナ化を行ってから参照する。
+        """
         if not isinstance(choice, str):
             return None
+        result = _CHOICES_BY_INPUT.get(choice)
+        if result is None:
+            result = _CHOICES_BY_CANONICAL.get(_normalize_input(choice))
+        return result
+
+    @classmethod
+    def from_code(cls, code: int) -> "Choice":
+        """整数コード（0: rock, 1: paper, 2: scissors）からChoiceを生成"""
+        return CHOICES_BY_CODE[code]
 
-        choice_map = {
-            # 英語
-            "rock": cls.ROCK,
-            "paper": cls.PAPER,
-            "scissors": cls.SCISSORS,
-            # 日本語
-            "グー": cls.ROCK,
-            "パー": cls.PAPER,
-            "チョキ": cls.SCISSORS,
-        }
-        return choice_map.get(choice.lower())
+    @property
+    def code(self) -> int:
+        """バッチ処理用の整数コード（0: rock, 1: paper, 2: scissors）"""
+        return self._code
 
     def to_display(self, lang: str = "ja") -> str:
-        """表示用文字列を生成"""
-        if lang == "ja":
-            display_map = {
-                self.ROCK: "グー ✊",
-                self.PAPER: "パー ✋",
-                self.SCISSORS: "チョキ ✌️",
-            }
-        else:
-            display_map = {
-                self.ROCK: "Rock ✊",
-                self.PAPER: "Paper ✋",
-                self.SCISSORS: "Scissors ✌️",
-            }
-        return display_map[self]
+        """表示用文字列を生成（日本語以外は英語）"""
+        return (_DISPLAY_JA if lang == "ja" else _DISPLAY_EN)[self._code]
 
 
 class GameResult(Enum):
@@ -52,25 +51,185 @@ class GameResult(Enum):
     DRAW = "draw"
 
 
+# 手の整数コード。(player - ai) % 3 が 0 なら引き分け、1 なら勝ち、2 なら負け
+CHOICES_BY_CODE = (Choice.ROCK, Choice.PAPER, Choice.SCISSORS)
+# Enum のハッシュは Python で実装されているため、コードはメンバーの属性として持たせる
+for _code, _choice in enumerate(CHOICES_BY_CODE):
+    _choice._code = _code
+del _code, _choice
+
+# 表示用文字列（コード順）
+_DISPLAY_JA = ("グー ✊", "パー ✋", "チョキ ✌️")
+_DISPLAY_EN = ("Rock ✊", "Paper ✋", "Scissors ✌️")
+
+# 正規化後の入力 → Choice
+_CHOICES_BY_CANONICAL = {
+    # 英語
+    "rock": Choice.ROCK,
+    "paper": Choice.PAPER,
+    "scissors": Choice.SCISSORS,
+    # 日本語
+    "グー": Choice.ROCK,
+    "パー": Choice.PAPER,
+    "チョキ": Choice.SCISSORS,
+}
+
+# ひらがな → カタカナ（str.translate 用）
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+_KATAKANA_TO_HIRAGANA = {code + 0x60: code for code in range(0x3041, 0x3097)}
+# ASCII → 全角英字（str.translate 用）
+_ASCII_TO_FULLWIDTH = {code: code + 0xFEE0 for code in range(0x21, 0x7F)}
+
+# 全角カナ（濁点・半濁点付きを含む）→ 半角カナ
+_HALFWIDTH_KANA = {}
+for _code in range(0xFF61, 0xFFA0):
+    _HALFWIDTH_KANA.setdefault(unicodedata.normalize("NFKC", chr(_code)), chr(_code))
+for _char in "ガギグゲゴザジズゼゾダヂヅデドバビブベボ":
+    _HALFWIDTH_KANA[_char] = _HALFWIDTH_KANA[chr(ord(_char) - 1)] + "ﾞ"
+for _char in "パピプペポ":
+    _HALFWIDTH_KANA[_char] = _HALFWIDTH_KANA[chr(ord(_char) - 2)] + "ﾟ"
+del _code, _char
+
+
+def _normalize_input(text: str) -> str:
+    """全角・半角、大文字・小文字、ひらがな・カタカナ、前後の空白の違いを吸収"""
+    normalized = unicodedata.normalize("NFKC", text).strip().lower()
+    return normalized.translate(_HIRAGANA_TO_KATAKANA)
+
+
+def _input_variants(canonical: str):
+    """正規化すると canonical になる代表的な表記"""
+    if canonical.isascii():
+        for word in (canonical, canonical.upper(), canonical.capitalize()):
+            yield word
+            yield word.translate(_ASCII_TO_FULLWIDTH)
+    else:
+        yield canonical
+        yield canonical.translate(_KATAKANA_TO_HIRAGANA)
+        # 半角カナ（ｸﾞｰ など）は NFKC で全角に戻る文字を逆引きして作る
+        yield "".join(_HALFWIDTH_KANA.get(char, char) for char in canonical)
+
+
+# 入力文字列 → Choice。よく使われる表記はこの表の 1 回の参照で求まる
+_CHOICES_BY_INPUT = {
+    variant: choice
+    for canonical, choice in _CHOICES_BY_CANONICAL.items()
+    for variant in _input_variants(canonical)
+}
+
+# 結果コード（プレイヤー視点）
+RESULT_DRAW = 0
+RESULT_WIN = 1
+RESULT_LOSE = 2
+RESULTS_BY_CODE = (GameResult.DRAW, GameResult.WIN, GameResult.LOSE)
+# 標準外の結果文字列を表す結果コード
+RESULT_CUSTOM = -1
+
+# 結果文字列（GameResult.value）と結果コードの対応（履歴・ログ・統計で共通）
+RESULT_CODES: Dict[str, int] = {
+    result.value: code for code, result in enumerate(RESULTS_BY_CODE)
+}
+RESULT_VALUES_BY_CODE: Tuple[str, ...] = tuple(
+    result.value for result in RESULTS_BY_CODE
+)
+
+# player_code * 3 + ai_code をインデックスとする 3x3 の勝敗表
+OUTCOME_TABLE = bytes((p - a) % 3 for p in range(3) for a in range(3))
+
+# bytes.translate 用の 256 バイト変換表
+_OUTCOME_TRANSLATION = OUTCOME_TABLE + bytes(256 - len(OUTCOME_TABLE))
+_TIMES_THREE_TRANSLATION = bytes((3 * i) % 256 for i in range(256))
+_VALID_CODES = bytes(range(len(CHOICES_BY_CODE)))
+
+
+def _is_byte_buffer(moves: Sequence[int]) -> bool:
+    """要素が 1 バイトのバッファ（bytes, bytearray, array('b') など）かどうか"""
+    try:
+        with memoryview(moves) as view:
+            return view.itemsize == 1
+    except TypeError:
+        return False
+
+
+def _to_code_bytes(moves: Sequence[int]) -> bytes:
+    """手のコード列を 1 要素 1 バイトの bytes に変換して検証する"""
+    try:
+        if _is_byte_buffer(moves):
+            data = bytes(moves)
+        else:
+            # 要素が 1 バイトでないバッファ（array('h') や NumPy の int64 配列など）は
+            # bytes() に渡すと生のメモリがコピーされるため、要素ごとに変換する
+            data = bytes(iter(moves))
+    except (TypeError, ValueError):
+        data = b"\xff"
+    # 0〜2 以外の値を削除して何か残れば不正なコードが含まれている
+    if data.translate(None, _VALID_CODES):
+        raise ValueError("手のコードは 0〜2 の整数である必要があります。")
+    return data
+
+
+class BatchResult(NamedTuple):
+    """一括判定の結果（結果コード配列と集計値）"""
+
+    codes: array
+    wins: int
+    losses: int
+    draws: int
+
+    @property
+    def rounds(self) -> int:
+        """判定したラウンド数"""
+        return len(self.codes)
+
+
 class RockPaperScissorsEngine:
     """じゃんけんゲームエンジン"""
 
     @staticmethod
     def determine_winner(player_choice: Choice, ai_choice: Choice) -> GameResult:
         """勝敗を判定する"""
-        if player_choice == ai_choice:
-            return GameResult.DRAW
+        return RESULTS_BY_CODE[OUTCOME_TABLE[player_choice._code * 3 + ai_choice._code]]
 
-        winning_combinations = {
-            (Choice.ROCK, Choice.SCISSORS),
-            (Choice.PAPER, Choice.ROCK),
-            (Choice.SCISSORS, Choice.PAPER),
-        }
+    @staticmethod
+    def determine_winners(
+        player_moves: Sequence[int], ai_moves: Sequence[int]
+    ) -> BatchResult:
+        """
+        整数コード化された手の配列をまとめて判定する
 
-        if (player_choice, ai_choice) in winning_combinations:
-            return GameResult.WIN
-        else:
-            return GameResult.LOSE
+        Args:
+            player_moves: プレイヤーの手のコード列（array('b')、bytes、list、NumPy の整数配列など）
+            ai_moves: AIの手のコード列（player_moves と同じ長さ）
+
+        Returns:
+            BatchResult: 結果コード（RESULT_DRAW / RESULT_WIN / RESULT_LOSE）の
+            array('b') と勝ち・負け・引き分けの集計
+
+        Raises:
+            ValueError: 長さが異なる場合、または 0〜2 以外のコードを含む場合
+        """
+        if len(player_moves) != len(ai_moves):
+            raise ValueError(
+                f"手の配列の長さが一致しません: {len(player_moves)} != {len(ai_moves)}"
+            )
+
+        player_codes = _to_code_bytes(player_moves)
+        ai_codes = _to_code_bytes(ai_moves)
+
+        # player * 3 + ai を求め、勝敗表の参照と集計は C 実装の translate / count に任せる
+        indexes = bytes(
+            map(add, player_codes.translate(_TIMES_THREE_TRANSLATION), ai_codes)
+        )
+        outcome = indexes.translate(_OUTCOME_TRANSLATION)
+
+        codes = array("b")
+        codes.frombytes(outcome)
+        return BatchResult(
+            codes=codes,
+            wins=outcome.count(RESULT_WIN),
+            losses=outcome.count(RESULT_LOSE),
+            draws=outcome.count(RESULT_DRAW),
+        )
 
     @staticmethod
     def validate_choice(choice_str: str) -> bool:
@@ -0,0 +1,520 @@
+"""
+多数のじゃんけんセッションを同時に扱う asyncio ベースの HTTP ゲームサーバー
+各セッションは自身の AIPlayer を持ち、一定時間操作の無いセッションは破棄する
+
+エンドポイント（JSON）:
+    POST   /sessions                 {"player": "llm", "name": "..."} → セッション作成
+    GET    /sessions/{id}            セッションの状態
+    GET    /sessions/{id}/message    心理戦メッセージ
+    POST   /sessions/{id}/moves      {"choice": "rock"} → 1 ラウンド対戦
+    DELETE /sessions/{id}            セッション終了
+    GET    /stats                    サーバーの統計（JSON）
+    GET    /metrics                  計測値（Prometheus テキスト形式）
+    GET    /health                   死活確認
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..ai.game_log import GameLogWriter
+from ..ai.metrics import METRICS, Histogram
+from ..ai.pattern import PatternAIPlayer
+from ..ai.player import AIPlayer, AsyncLLMAIPlayer, RandomAIPlayer
+from ..ai.resilience import CIRCUIT_BREAKER
+from ..ai.tiered import TieredAIPlayer
+from ..game.engine import Choice, RockPaperScissorsEngine
+
+# セッションあたりに保持する履歴の既定件数（セッションのメモリ上限）
+DEFAULT_SESSION_HISTORY = 100
+
+# リクエストボディの上限（バイト）
+MAX_BODY_SIZE = 4096
+
+# リクエストの各行・ボディを待つ時間の既定の上限（秒）
+DEFAULT_READ_TIMEOUT = 30.0
+
+_REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+# セッションで使えるプレイヤー種別（プレイヤー名, 履歴件数）→ AIPlayer
+PLAYER_FACTORIES: Dict[str, Callable[[str, int], AIPlayer]] = {
+    "random": lambda name, capacity: RandomAIPlayer(name, history_capacity=capacity),
+    "pattern": lambda name, capacity: PatternAIPlayer(name, history_capacity=capacity),
+    "llm": lambda name, capacity: AsyncLLMAIPlayer(name, history_capacity=capacity),
+    "tiered": lambda name, capacity: TieredAIPlayer(
+        name,
+        local=PatternAIPlayer(name, history_capacity=capacity),
+        remote=AsyncLLMAIPlayer(name, history_capacity=capacity),
+        history_capacity=capacity,
+    ),
+}
+
+
+class HTTPError(Exception):
+    """HTTP のエラー応答を表す例外"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Session:
+    """1 人のプレイヤーとの対戦状態"""
+
+    __slots__ = (
+        "session_id",
+        "player_type",
+        "player",
+        "lock",
+        "last_active",
+        "wins",
+        "losses",
+        "draws",
+    )
+
+    def __init__(self, session_id: str, player_type: str, player: AIPlayer, now: float):
+        self.session_id = session_id
+        self.player_type = player_type
+        self.player = player
+        # 同じセッションの手は順番に処理する
+        self.lock = asyncio.Lock()
+        self.last_active = now
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+
+    def to_dict(self) -> dict:
+        """セッションの状態を JSON 化できる辞書で返す"""
+        return {
+            "session_id": self.session_id,
+            "player": self.player_type,
+            "rounds": self.wins + self.losses + self.draws,
+            "wins": self.wins,
+            "losses": self.losses,
+            "draws": self.draws,
+        }
+
+
+class GameServer:
+    """
+    セッションを管理する HTTP ゲームサーバー
+
+    セッションは最終操作順に保持し、idle_timeout 秒操作の無いセッションを定期的に、
+    max_sessions を超えた場合は最も古いセッションを破棄する。
+
+    Args:
+        host: 待ち受けるホスト
+        port: 待ち受けるポート（0 なら空いているポート）
+        idle_timeout: セッションを破棄するまでの無操作時間（秒）
+        max_sessions: 同時に保持するセッション数の上限
+        session_history: セッションあたりに保持する履歴件数
+        default_player: 作成時に種別を省略した場合のプレイヤー種別
+        clock: 時刻取得関数（テスト用）
+        game_log: 指定すると全セッションの結果をこのログに追記する（閉じるのは呼び出し側）
+        read_timeout: リクエストの各行・ボディを待つ時間の上限（秒）。
+            次のリクエストを待つ keep-alive 接続はこの時間で閉じる
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        idle_timeout: float = 300.0,
+        max_sessions: int = 10000,
+        session_history: int = DEFAULT_SESSION_HISTORY,
+        default_player: str = "llm",
+        clock: Callable[[], float] = time.monotonic,
+        game_log: Optional[GameLogWriter] = None,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ):
+        if default_player not in PLAYER_FACTORIES:
+            raise ValueError(f"未知のプレイヤー種別です: {default_player}")
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.session_history = session_history
+        self.default_player = default_player
+        self._clock = clock
+        self.game_log = game_log
+        self.read_timeout = read_timeout
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._id_prefix = os.urandom(4).hex()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._move_latency = Histogram()
+        self._created = 0
+        self._evicted = 0
+        self._requests = 0
+
+    # --- セッション管理 ---
+
+    def create_session(
+        self, player_type: Optional[str] = None, name: Optional[str] = None
+    ) -> Session:
+        """セッションを作成（上限を超える場合は最も古いセッションを破棄）"""
+        player_type = player_type or self.default_player
+        factory = PLAYER_FACTORIES.get(player_type)
+        if factory is None:
+            raise HTTPError(400, f"未知のプレイヤー種別です: {player_type}")
+
+        while len(self._sessions) >= self.max_sessions:
+            self._sessions.popitem(last=False)
+            self._evicted += 1
+
+        number = next(self._ids)
+        session_id = f"{self._id_prefix}{number:x}"
+        player = factory(name or "AI", self.session_history)
+        if self.game_log is not None:
+            # ログのセッション ID は 64 ビット整数（上位 32 ビットがサーバー固有の接頭辞）
+            log_id = (int(self._id_prefix, 16) << 32) | (number & 0xFFFFFFFF)
+            player.add_observer(self.game_log.observer(log_id))
+        session = Session(session_id, player_type, player, self._clock())
+        self._sessions[session_id] = session
+        self._created += 1
+        return session
+
+    def get_session(self, session_id: str) -> Session:
+        """セッションを取得して最終操作時刻を更新"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise HTTPError(404, "セッションが見つかりません。")
+        session.last_active = self._clock()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def close_session(self, session_id: str) -> bool:
+        """セッションを終了"""
+        return self._sessions.pop(session_id, None) is not None
+
+    def evict_idle(self) -> int:
+        """idle_timeout 秒以上操作の無いセッションを破棄し、破棄した数を返す"""
+        deadline = self._clock() - self.idle_timeout
+        evicted = 0
+        # 最終操作順に並んでいるため、先頭から期限内のセッションが現れるまで見ればよい
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_active > deadline:
+                break
+            self._sessions.popitem(last=False)
+            evicted += 1
+        self._evicted += evicted
+        return evicted
+
+    async def play_move(self, session: Session, choice_str: Any) -> dict:
+        """1 ラウンド対戦して結果を返す"""
+        player_choice = Choice.from_string(choice_str)
+        if player_choice is None:
+            raise HTTPError(400, "choice は rock, paper, scissors のいずれかです。")
+
+        start = time.perf_counter()
+        async with session.lock:
+            ai_choice = await session.player.make_choice_async()
+            result = RockPaperScissorsEngine.determine_winner(player_choice, ai_choice)
+            session.player.record_game(player_choice, ai_choice, result.value)
+        self._move_latency.observe(time.perf_counter() - start)
+
+        if result.value == "win":
+            session.wins += 1
+        elif result.value == "lose":
+            session.losses += 1
+        else:
+            session.draws += 1
+        return {
+            "player": player_choice.value,
+            "ai": ai_choice.value,
+            "result": result.value,
+            "round": session.player.game_history.total_recorded,
+        }
+
+    def stats(self) -> dict:
+        """セッション数と手の処理時間などの統計"""
+        return {
+            "sessions": len(self._sessions),
+            "created": self._created,
+            "evicted": self._evicted,
+            "requests": self._requests,
+            "move_latency": self._move_latency.snapshot(),
+        }
+
+    def to_prometheus(self) -> str:
+        """サーバーと LLM 呼び出しの計測値を Prometheus のテキスト形式で出力"""
+        stats = self.stats()
+        latency = stats["move_latency"]
+        lines = [
+            "# TYPE janken_sessions gauge",
+            f"janken_sessions {stats['sessions']}",
+            "# TYPE janken_sessions_created_total counter",
+            f"janken_sessions_created_total {stats['created']}",
+            "# TYPE janken_sessions_evicted_total counter",
+            f"janken_sessions_evicted_total {stats['evicted']}",
+            "# TYPE janken_move_latency_seconds summary",
+        ]
+        for key in ("p50", "p95", "p99"):
+            quantile = int(key[1:]) / 100
+            lines.append(
+                f'janken_move_latency_seconds{{quantile="{quantile}"}} {latency[key]:.6f}'
+            )
+        lines.append(f"janken_move_latency_seconds_sum {latency['sum']:.6f}")
+        lines.append(f"janken_move_latency_seconds_count {latency['count']}")
+        return (
+            "\n".join(lines)
+            + "\n"
+            + METRICS.to_prometheus()
+            + CIRCUIT_BREAKER.to_prometheus()
+        )
+
+    # --- HTTP ---
+
+    async def _route(
+        self, method: str, path: str, body: Optional[dict]
+    ) -> Tuple[int, Any]:
+        """リクエストを処理して (ステータス, 応答) を返す（応答が str ならテキスト）"""
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+
+        if parts == ["health"] and method == "GET":
+            return 200, {"status": "ok"}
+        if parts == ["stats"] and method == "GET":
+            return 200, self.stats()
+        if parts == ["metrics"] and method == "GET":
+            return 200, self.to_prometheus()
+
+        if not parts or parts[0] != "sessions" or len(parts) > 3:
+            raise HTTPError(404, "見つかりません。")
+
+        if len(parts) == 1:
+            if method != "POST":
+                raise HTTPError(405, "POST のみ対応しています。")
+            body = body or {}
+            session = self.create_session(body.get("player"), body.get("name"))
+            return 201, session.to_dict()
+
+        session_id = parts[1]
+        if len(parts) == 2:
+            if method == "GET":
+                return 200, self.get_session(session_id).to_dict()
+            if method == "DELETE":
+                if not self.close_session(session_id):
+                    raise HTTPError(404, "セッションが見つかりません。")
+                return 200, {"session_id": session_id, "closed": True}
+            raise HTTPError(405, "GET または DELETE のみ対応しています。")
+
+        action = parts[2]
+        if action == "moves" and method == "POST":
+            session = self.get_session(session_id)
+            return 200, await self.play_move(session, (body or {}).get("choice"))
+        if action == "message" and method == "GET":
+            session = self.get_session(session_id)
+            message = await session.player.get_psychological_message_async()
+            return 200, {"message": message}
+        raise HTTPError(404, "見つかりません。")
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """HTTP リクエストを読み取る（接続が閉じられたか、期限内に次のリクエストが無ければ None）"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), self.read_timeout)
+        except asyncio.TimeoutError:
+            return None
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "不正なリクエストです。")
+
+        headers = {}
+        while True:
+            line = await self._read_within_timeout(reader.readline())
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        # 負の値や数字以外（int() が受け付ける "+1" や "1_0" も含む）は拒否する
+        content_length = headers.get("content-length") or "0"
+        if not (content_length.isascii() and content_length.isdigit()):
+            raise HTTPError(400, "Content-Length が不正です。")
+        length = int(content_length)
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413, "リクエストボディが大きすぎます。")
+        body = None
+        if length:
+            raw = await self._read_within_timeout(reader.readexactly(length))
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                raise HTTPError(400, "JSON を解釈できません。")
+            if not isinstance(body, dict):
+                raise HTTPError(400, "JSON オブジェクトを送信してください。")
+        keep_alive = headers.get("connection", "").lower() != "close"
+        return method.upper(), path, body, keep_alive
+
+    async def _read_within_timeout(self, read):
+        """リクエストの途中の読み取りを read_timeout まで待つ（超えたら 408）"""
+        try:
+            return await asyncio.wait_for(read, self.read_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(408, "リクエストの受信がタイムアウトしました。")
+
+    @staticmethod
+    def _write_response(
+        writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool
+    ):
+        """HTTP 応答を書き込む"""
+        if isinstance(payload, str):
+            data = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """1 つの接続上のリクエストを keep-alive で順に処理する"""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    self._requests += 1
+                    status, payload = await self._route(method, path, body)
+                except HTTPError as e:
+                    status, payload, keep_alive = e.status, {"error": e.message}, False
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    status, payload, keep_alive = 500, {"error": str(e)}, False
+
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _reap_idle_sessions(self):
+        """無操作のセッションを定期的に破棄する"""
+        interval = max(0.05, min(self.idle_timeout / 2, 30.0))
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    async def start(self):
+        """待ち受けを開始"""
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, backlog=1024
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._reaper = asyncio.ensure_future(self._reap_idle_sessions())
+
+    async def stop(self):
+        """待ち受けを終了してセッションを破棄"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._sessions.clear()
+
+    @property
+    def url(self) -> str:
+        """サーバーの URL"""
+        return f"http://{self.host}:{self.port}"
+
+    async def serve_forever(self):
+        """待ち受けを開始して停止されるまで処理する"""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def main(argv=None):
+    """コマンドラインからゲームサーバーを起動"""
+    parser = argparse.ArgumentParser(description="じゃんけんゲームサーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--idle-timeout", type=float, default=300.0)
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--session-history", type=int, default=DEFAULT_SESSION_HISTORY)
+    parser.add_argument(
+        "--default-player", choices=sorted(PLAYER_FACTORIES), default="llm"
+    )
+    parser.add_argument(
+        "--game-log", default=None, help="対戦結果を追記するバイナリログのパス"
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=DEFAULT_READ_TIMEOUT,
+        help="リクエストの各行・ボディを待つ時間の上限（秒）",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        pass
+
+    server = GameServer(
+        host=args.host,
+        port=args.port,
+        idle_timeout=args.idle_timeout,
+        max_sessions=args.max_sessions,
+        session_history=args.session_history,
+        default_player=args.default_player,
+        game_log=GameLogWriter(args.game_log) if args.game_log else None,
+        read_timeout=args.read_timeout,
+    )
+
+    async def run():
+        await server.start()
+        print(f"🎮 ゲームサーバーを起動しました: {server.url}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server.game_log is not None:
+            server.game_log.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
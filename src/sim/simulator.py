@@ -0,0 +1,264 @@
+"""
+AI 対 AI のヘッドレス対戦シミュレーター
+複数の独立した試合をプロセスプールに分散して実行する
+"""
+
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from ..ai.pattern import PatternAIPlayer
+from ..ai.player import AIPlayer, LLMAIPlayer, RandomAIPlayer
+from ..ai.tiered import TieredAIPlayer
+from ..game.engine import GameResult, RockPaperScissorsEngine
+from ..stats.tracker import GameStatistics, StatsSnapshot
+
+# コマンドラインから指定できるプレイヤー種別
+PLAYER_TYPES: Dict[str, Type[AIPlayer]] = {
+    "random": RandomAIPlayer,
+    "llm": LLMAIPlayer,
+    "pattern": PatternAIPlayer,
+    "tiered": TieredAIPlayer,
+}
+
+# 相手視点の結果へ変換するための対応表
+_FLIPPED_RESULTS = {
+    GameResult.WIN: GameResult.LOSE,
+    GameResult.LOSE: GameResult.WIN,
+    GameResult.DRAW: GameResult.DRAW,
+}
+
+
+@dataclass(frozen=True)
+class MatchTask:
+    """ワーカーに渡す 1 試合分の設定（pickle 可能）"""
+
+    match_id: int
+    seed: int
+    rounds: int
+    player_a_cls: Type[AIPlayer]
+    player_b_cls: Type[AIPlayer]
+    player_a_kwargs: Dict[str, Any] = field(default_factory=dict)
+    player_b_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class MatchResult:
+    """1 試合の結果（勝ち数はプレイヤーA視点）"""
+
+    match_id: int
+    seed: int
+    rounds: int
+    a_wins: int
+    b_wins: int
+    draws: int
+    elapsed: float
+    # プレイヤーAをプレイヤー側、Bを AI 側とした統計
+    stats: Optional[StatsSnapshot] = None
+
+
+@dataclass
+class SimulationReport:
+    """シミュレーション全体の集計結果"""
+
+    seed: int
+    matches: List[MatchResult]
+    elapsed: float
+
+    @property
+    def total_rounds(self) -> int:
+        """全試合の合計ラウンド数"""
+        return sum(match.rounds for match in self.matches)
+
+    @property
+    def rounds_per_sec(self) -> float:
+        """スループット（ラウンド/秒）"""
+        return self.total_rounds / self.elapsed if self.elapsed > 0 else 0.0
+
+    def _rate(self, count: int) -> float:
+        total = self.total_rounds
+        return count / total if total else 0.0
+
+    @property
+    def a_win_rate(self) -> float:
+        """プレイヤーAの勝率"""
+        return self._rate(sum(match.a_wins for match in self.matches))
+
+    @property
+    def b_win_rate(self) -> float:
+        """プレイヤーBの勝率"""
+        return self._rate(sum(match.b_wins for match in self.matches))
+
+    @property
+    def draw_rate(self) -> float:
+        """引き分け率"""
+        return self._rate(sum(match.draws for match in self.matches))
+
+    @property
+    def stats(self) -> StatsSnapshot:
+        """全試合の統計をマージしたもの（プレイヤーAをプレイヤー側とした視点）"""
+        return StatsSnapshot.combine(
+            match.stats for match in self.matches if match.stats is not None
+        )
+
+
+def play_match(
+    player_a: AIPlayer, player_b: AIPlayer, rounds: int
+) -> Tuple[int, int, int]:
+    """
+    2 つの AIPlayer を指定ラウンド数だけ対戦させる
+
+    各プレイヤーの record_game には自分をAI側、相手をプレイヤー側とした
+    視点で履歴を記録する。
+
+    Returns:
+        Tuple[int, int, int]: (Aの勝ち数, Bの勝ち数, 引き分け数)
+    """
+    counts = {GameResult.WIN: 0, GameResult.LOSE: 0, GameResult.DRAW: 0}
+    determine_winner = RockPaperScissorsEngine.determine_winner
+
+    for _ in range(rounds):
+        a_choice = player_a.make_choice()
+        b_choice = player_b.make_choice()
+        # Aをプレイヤー側とした結果
+        result = determine_winner(a_choice, b_choice)
+        counts[result] += 1
+
+        player_b.record_game(a_choice, b_choice, result.value)
+        player_a.record_game(b_choice, a_choice, _FLIPPED_RESULTS[result].value)
+
+    return counts[GameResult.WIN], counts[GameResult.LOSE], counts[GameResult.DRAW]
+
+
+async def play_match_async(
+    player_a: AIPlayer, player_b: AIPlayer, rounds: int
+) -> Tuple[int, int, int]:
+    """
+    play_match の非同期版
+
+    両プレイヤーの手を同時に問い合わせるため、AsyncLLMAIPlayer 同士の対戦でも
+    1 ラウンドの待ち時間は API 呼び出し 1 回分で済む。
+    """
+    counts = {GameResult.WIN: 0, GameResult.LOSE: 0, GameResult.DRAW: 0}
+    determine_winner = RockPaperScissorsEngine.determine_winner
+
+    for _ in range(rounds):
+        a_choice, b_choice = await asyncio.gather(
+            player_a.make_choice_async(), player_b.make_choice_async()
+        )
+        result = determine_winner(a_choice, b_choice)
+        counts[result] += 1
+
+        player_b.record_game(a_choice, b_choice, result.value)
+        player_a.record_game(b_choice, a_choice, _FLIPPED_RESULTS[result].value)
+
+    return counts[GameResult.WIN], counts[GameResult.LOSE], counts[GameResult.DRAW]
+
+
+async def run_matches_async(
+    pairs: Sequence[Tuple[AIPlayer, AIPlayer]], rounds: int
+) -> List[Tuple[int, int, int]]:
+    """
+    複数の対戦を 1 つのイベントループで並行実行する
+
+    API の同時実行数は各プレイヤー側（AsyncLLMAIPlayer のセマフォ）で制限される。
+
+    Returns:
+        List[Tuple[int, int, int]]: pairs と同じ順序の (Aの勝ち数, Bの勝ち数, 引き分け数)
+    """
+    return list(
+        await asyncio.gather(
+            *(
+                play_match_async(player_a, player_b, rounds)
+                for player_a, player_b in pairs
+            )
+        )
+    )
+
+
+def run_match(task: MatchTask) -> MatchResult:
+    """1 試合を実行する（プロセスプールのワーカーから呼ばれる）"""
+    # プレイヤーは random モジュールを使うため試合ごとにシードを固定する
+    random.seed(task.seed)
+    player_a = task.player_a_cls(name="A", **task.player_a_kwargs)
+    player_b = task.player_b_cls(name="B", **task.player_b_kwargs)
+    # B の record_game は A をプレイヤー側とした視点で呼ばれる
+    stats = GameStatistics().attach(player_b)
+
+    start = time.perf_counter()
+    a_wins, b_wins, draws = play_match(player_a, player_b, task.rounds)
+    elapsed = time.perf_counter() - start
+
+    return MatchResult(
+        match_id=task.match_id,
+        seed=task.seed,
+        rounds=task.rounds,
+        a_wins=a_wins,
+        b_wins=b_wins,
+        draws=draws,
+        elapsed=elapsed,
+        stats=stats.snapshot(),
+    )
+
+
+def run_simulation(
+    player_a_cls: Type[AIPlayer],
+    player_b_cls: Type[AIPlayer],
+    rounds: int = 100,
+    matches: int = 10,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    player_a_kwargs: Optional[Dict[str, Any]] = None,
+    player_b_kwargs: Optional[Dict[str, Any]] = None,
+) -> SimulationReport:
+    """
+    AI 同士の独立した試合を複数実行して集計する
+
+    Args:
+        player_a_cls: プレイヤーAのクラス（モジュールレベルで定義されたもの）
+        player_b_cls: プレイヤーBのクラス
+        rounds: 1 試合あたりのラウンド数
+        matches: 試合数
+        seed: 乱数シード（None の場合は生成してレポートに記録）
+        max_workers: プロセス数（1 以下の場合は同一プロセスで実行）
+        player_a_kwargs: プレイヤーAのコンストラクタ引数（name 以外）
+        player_b_kwargs: プレイヤーBのコンストラクタ引数（name 以外）
+
+    Returns:
+        SimulationReport: 試合ごとの結果と集計値
+    """
+    if rounds < 0 or matches < 0:
+        raise ValueError("rounds と matches は 0 以上である必要があります。")
+
+    if seed is None:
+        seed = random.SystemRandom().randrange(2**32)
+    seed_source = random.Random(seed)
+    tasks = [
+        MatchTask(
+            match_id=match_id,
+            seed=seed_source.getrandbits(32),
+            rounds=rounds,
+            player_a_cls=player_a_cls,
+            player_b_cls=player_b_cls,
+            player_a_kwargs=dict(player_a_kwargs or {}),
+            player_b_kwargs=dict(player_b_kwargs or {}),
+        )
+        for match_id in range(matches)
+    ]
+
+    start = time.perf_counter()
+    if max_workers is not None and max_workers <= 1:
+        results = [run_match(task) for task in tasks]
+    else:
+        # 試合単位でまとめて送り、プロセス間通信のオーバーヘッドを抑える
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, matches // (workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run_match, tasks, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    return SimulationReport(seed=seed, matches=results, elapsed=elapsed)
@@ -0,0 +1,218 @@
+"""
+ゲーム統計の逐次集計
+record_game のオブザーバーとして勝敗率・手の頻度・手の遷移・直近ウィンドウの勝敗を
+O(1) で更新し、複数のプロセスやシャードの集計値を履歴を読み直さずにマージできる
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional
+
+from ..game.engine import (
+    CHOICES_BY_CODE,
+    RESULT_CODES,
+    RESULT_CUSTOM,
+    RESULT_DRAW,
+    RESULT_LOSE,
+    RESULT_WIN,
+    Choice,
+)
+
+# 直近ウィンドウの既定の大きさ（ラウンド数）
+DEFAULT_WINDOW = 100
+
+
+def _zeros(size: int) -> List[int]:
+    return [0] * size
+
+
+def _add(left: List[int], right: List[int]) -> List[int]:
+    return [a + b for a, b in zip(left, right)]
+
+
+@dataclass
+class StatsSnapshot:
+    """
+    ある時点の統計（加算でマージできる集計値）
+
+    結果は record_game に渡された視点（プレイヤー側）で数える。手は Choice.code を
+    インデックスとし、transitions はプレイヤーの直前の手 * 3 + 次の手 をインデックスとする。
+    window_* は各集計元の直近ウィンドウの合計で、マージすると全シャードの直近の様子を表す。
+    """
+
+    rounds: int = 0
+    results: List[int] = field(default_factory=lambda: _zeros(3))
+    player_moves: List[int] = field(default_factory=lambda: _zeros(3))
+    ai_moves: List[int] = field(default_factory=lambda: _zeros(3))
+    transitions: List[int] = field(default_factory=lambda: _zeros(9))
+    window_rounds: int = 0
+    window_results: List[int] = field(default_factory=lambda: _zeros(3))
+
+    def merge(self, other: "StatsSnapshot") -> "StatsSnapshot":
+        """2 つの集計値を合わせた新しいスナップショットを返す"""
+        return StatsSnapshot(
+            rounds=self.rounds + other.rounds,
+            results=_add(self.results, other.results),
+            player_moves=_add(self.player_moves, other.player_moves),
+            ai_moves=_add(self.ai_moves, other.ai_moves),
+            transitions=_add(self.transitions, other.transitions),
+            window_rounds=self.window_rounds + other.window_rounds,
+            window_results=_add(self.window_results, other.window_results),
+        )
+
+    def __add__(self, other: "StatsSnapshot") -> "StatsSnapshot":
+        if not isinstance(other, StatsSnapshot):
+            return NotImplemented
+        return self.merge(other)
+
+    @classmethod
+    def combine(cls, snapshots: Iterable["StatsSnapshot"]) -> "StatsSnapshot":
+        """複数のスナップショットをまとめてマージ"""
+        total = cls()
+        for snapshot in snapshots:
+            total = total.merge(snapshot)
+        return total
+
+    def _rate(self, count: int, total: int) -> float:
+        return count / total if total else 0.0
+
+    @property
+    def counted_rounds(self) -> int:
+        """勝敗を集計したラウンド数（標準外の結果を除く）"""
+        return sum(self.results)
+
+    @property
+    def win_rate(self) -> float:
+        """プレイヤー側の勝率"""
+        return self._rate(self.results[RESULT_WIN], self.counted_rounds)
+
+    @property
+    def lose_rate(self) -> float:
+        """プレイヤー側の負け率（AI の勝率）"""
+        return self._rate(self.results[RESULT_LOSE], self.counted_rounds)
+
+    @property
+    def draw_rate(self) -> float:
+        """引き分け率"""
+        return self._rate(self.results[RESULT_DRAW], self.counted_rounds)
+
+    @property
+    def window_win_rate(self) -> float:
+        """直近ウィンドウでのプレイヤー側の勝率"""
+        return self._rate(self.window_results[RESULT_WIN], sum(self.window_results))
+
+    @property
+    def window_lose_rate(self) -> float:
+        """直近ウィンドウでのプレイヤー側の負け率"""
+        return self._rate(self.window_results[RESULT_LOSE], sum(self.window_results))
+
+    def move_frequencies(self, ai: bool = False) -> Dict[Choice, float]:
+        """手ごとの出現割合（ai=True なら AI 側の手）"""
+        counts = self.ai_moves if ai else self.player_moves
+        total = sum(counts)
+        return {
+            choice: self._rate(counts[choice.code], total) for choice in CHOICES_BY_CODE
+        }
+
+    def transition_matrix(self) -> List[List[float]]:
+        """プレイヤーの直前の手（行）から次の手（列）への遷移確率"""
+        matrix = []
+        for previous in range(3):
+            row = self.transitions[previous * 3 : previous * 3 + 3]
+            total = sum(row)
+            matrix.append([self._rate(count, total) for count in row])
+        return matrix
+
+    def to_dict(self) -> dict:
+        """JSON に変換できる辞書（from_dict で復元できる）"""
+        return {
+            "rounds": self.rounds,
+            "results": list(self.results),
+            "player_moves": list(self.player_moves),
+            "ai_moves": list(self.ai_moves),
+            "transitions": list(self.transitions),
+            "window_rounds": self.window_rounds,
+            "window_results": list(self.window_results),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StatsSnapshot":
+        """to_dict の出力から復元"""
+        return cls(
+            rounds=data["rounds"],
+            results=list(data["results"]),
+            player_moves=list(data["player_moves"]),
+            ai_moves=list(data["ai_moves"]),
+            transitions=list(data["transitions"]),
+            window_rounds=data["window_rounds"],
+            window_results=list(data["window_results"]),
+        )
+
+
+class GameStatistics:
+    """
+    1 つの対戦の流れを逐次集計する統計（スレッドセーフ）
+
+    AIPlayer.add_observer(stats.observe) で record_game ごとに更新される。
+    更新は O(1) で、メモリ使用量は window の大きさで決まる一定量に収まる。
+
+    Args:
+        window: 直近ウィンドウの大きさ（ラウンド数）
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        if window <= 0:
+            raise ValueError("window は 1 以上である必要があります。")
+        self.window = window
+        self._lock = threading.Lock()
+        self._snapshot = StatsSnapshot()
+        # 直近ウィンドウの結果コード（標準外の結果は -1）
+        self._recent: Deque[int] = deque(maxlen=window)
+        self._last_player_move: Optional[int] = None
+
+    def record(self, player_choice: Choice, ai_choice: Choice, result: str):
+        """1 ラウンドの結果を集計"""
+        code = RESULT_CODES.get(result, RESULT_CUSTOM)
+        player_code = player_choice.code
+        with self._lock:
+            stats = self._snapshot
+            stats.rounds += 1
+            stats.player_moves[player_code] += 1
+            stats.ai_moves[ai_choice.code] += 1
+            if self._last_player_move is not None:
+                stats.transitions[self._last_player_move * 3 + player_code] += 1
+            self._last_player_move = player_code
+            if code >= 0:
+                stats.results[code] += 1
+
+            if len(self._recent) == self.window:
+                evicted = self._recent[0]
+                stats.window_rounds -= 1
+                if evicted >= 0:
+                    stats.window_results[evicted] -= 1
+            self._recent.append(code)
+            stats.window_rounds += 1
+            if code >= 0:
+                stats.window_results[code] += 1
+
+    def observe(self, player, player_choice: Choice, ai_choice: Choice, result: str):
+        """AIPlayer.add_observer に渡すオブザーバー"""
+        self.record(player_choice, ai_choice, result)
+
+    def attach(self, player) -> "GameStatistics":
+        """player の record_game を集計対象にする"""
+        player.add_observer(self.observe)
+        return self
+
+    def snapshot(self) -> StatsSnapshot:
+        """現在の集計値の複製"""
+        with self._lock:
+            return StatsSnapshot.from_dict(self._snapshot.to_dict())
+
+    def reset(self):
+        """集計値を初期化"""
+        with self._lock:
+            self._snapshot = StatsSnapshot()
+            self._recent.clear()
+            self._last_player_move = None
@@ -1,55 +1,76 @@
-from typing import Optional
+import random
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-from ..ai.player import AIPlayer
+from ..ai.background import run_in_daemon_thread
 from ..game.engine import Choice, GameResult, RockPaperScissorsEngine
 
+if TYPE_CHECKING:
+    # AI プレイヤー（asyncio などを読み込む）は起動を速めるため実行時には遅延 import する
+    from ..ai.player import AIPlayer
+
+# 心理戦メッセージを待つ既定の上限時間（秒）
+DEFAULT_MESSAGE_TIMEOUT = 2.0
+
+# 言語別の表示メッセージ（インスタンスごとに組み立てず共有する）
+MESSAGES: Dict[str, Dict[str, str]] = {
+    "ja": {
+        "welcome": "🎮 LLM じゃんけんゲームへようこそ！",
+        "separator": "=" * 40,
+        "vs_ai": "🤖 AI 対戦相手と対戦します！",
+        "choices": "選択肢: rock (グー), paper (パー), scissors (チョキ)",
+        "quit_info": "終了するには 'quit' と入力してください。",
+        "game_title": "--- じゃんけん勝負！ ---",
+        "input_prompt": "あなたの手を選んでください: ",
+        "invalid_input": "無効な入力です。rock, paper, scissors または グー, パー, チョキ を入力してください。",
+        "you": "あなた",
+        "ai": "AI",
+        "win": "🎉 あなたの勝ち！",
+        "lose": "😅 AI の勝ち！",
+        "draw": "🤝 引き分け！",
+        "game_end": "ゲームを終了します。ありがとうございました！",
+    },
+    "en": {
+        "welcome": "🎮 Welcome to LLM Rock-Paper-Scissors!",
+        "separator": "=" * 40,
+        "vs_ai": "🤖 Playing against AI opponent!",
+        "choices": "Choices: rock, paper, scissors",
+        "quit_info": "Type 'quit' to exit.",
+        "game_title": "--- Rock-Paper-Scissors Battle! ---",
+        "input_prompt": "Choose your move: ",
+        "invalid_input": "Invalid input. Please enter rock, paper, or scissors.",
+        "you": "You",
+        "ai": "AI",
+        "win": "🎉 You win!",
+        "lose": "😅 AI wins!",
+        "draw": "🤝 It's a draw!",
+        "game_end": "Game ended. Thank you for playing!",
+    },
+}
+
 
 class CLIInterface:
     """コマンドラインインターフェース"""
 
-    def __init__(self, language: str = "ja"):
+    def __init__(
+        self, language: str = "ja", message_timeout: float = DEFAULT_MESSAGE_TIMEOUT
+    ):
         self.language = language
         self.messages = self._load_messages()
+        self.message_timeout = message_timeout
+        self._pending_message: Optional[Tuple["AIPlayer", Future]] = None
+        self._welcome_shown = False
+        # 入力待ちの間に心理戦メッセージを表示するため、表示と入力完了の判定を直列化する
+        self._output_lock = threading.Lock()
 
-    def _load_messages(self) -> dict:
-        """言語別メッセージを読み込み"""
-        if self.language == "ja":
-            return {
-                "welcome": "🎮 LLM じゃんけんゲームへようこそ！",
-                "separator": "=" * 40,
-                "vs_ai": "🤖 AI 対戦相手と対戦します！",
-                "choices": "選択肢: rock (グー), paper (パー), scissors (チョキ)",
-                "quit_info": "終了するには 'quit' と入力してください。",
-                "game_title": "--- じゃんけん勝負！ ---",
-                "input_prompt": "あなたの手を選んでください: ",
-                "invalid_input": "無効な入力です。rock, paper, scissors または グー, パー, チョキ を入力してください。",
-                "you": "あなた",
-                "ai": "AI",
-                "win": "🎉 あなたの勝ち！",
-                "lose": "😅 AI の勝ち！",
-                "draw": "🤝 引き分け！",
-                "game_end": "ゲームを終了します。ありがとうございました！",
-            }
-        else:
-            return {
-                "welcome": "🎮 Welcome to LLM Rock-Paper-Scissors!",
-                "separator": "=" * 40,
-                "vs_ai": "🤖 Playing against AI opponent!",
-                "choices": "Choices: rock, paper, scissors",
-                "quit_info": "Type 'quit' to exit.",
-                "game_title": "--- Rock-Paper-Scissors Battle! ---",
-                "input_prompt": "Choose your move: ",
-                "invalid_input": "Invalid input. Please enter rock, paper, or scissors.",
-                "you": "You",
-                "ai": "AI",
-                "win": "🎉 You win!",
-                "lose": "😅 AI wins!",
-                "draw": "🤝 It's a draw!",
-                "game_end": "Game ended. Thank you for playing!",
-            }
+    def _load_messages(self) -> Dict[str, str]:
+        """言語別メッセージを取得（日本語以外は英語）"""
+        return dict(MESSAGES["ja" if self.language == "ja" else "en"])
 
     def display_welcome(self):
         """ウェルカムメッセージを表示"""
+        self._welcome_shown = True
         print(self.messages["welcome"])
         print(self.messages["separator"])
         print(f"\n{self.messages['vs_ai']}")
@@ -90,16 +111,80 @@ class CLIInterface:
         """終了メッセージを表示"""
         print(f"\n{self.messages['game_end']}")
 
-    def run_single_game(self, ai_player: AIPlayer):
+    def prefetch_psychological_message(self, ai_player: "AIPlayer"):
+        """
+        クライアントのウォームアップと心理戦メッセージの取得をバックグラウンドで開始
+
+        プレイヤー生成直後（ウェルカム表示より前）に呼ぶことで、API の往復時間を
+        ウェルカム表示や入力待ちと重ねられる。
+        """
+
+        def fetch() -> str:
+            ai_player.warm_up()
+            return ai_player.get_psychological_message()
+
+        self._pending_message = (
+            ai_player,
+            run_in_daemon_thread(fetch, name="psychological-message"),
+        )
+
+    def _wait_psychological_message(self, future: Future) -> str:
+        """先行取得した心理戦メッセージを期限まで待ち、間に合わなければフォールバック"""
+        try:
+            return future.result(timeout=self.message_timeout)
+        except Exception:
+            # 期限切れ（FutureTimeoutError）や取得失敗時は手元のメッセージを使う
+            from ..ai.player import FALLBACK_MESSAGES
+
+            return random.choice(FALLBACK_MESSAGES)
+
+    def _announce_psychological_message(self, ai_player: "AIPlayer") -> threading.Event:
+        """
+        心理戦メッセージを届き次第表示する（入力プロンプトは待たせない）
+
+        既に届いていればプロンプトの前に表示し、まだであれば入力待ちの間に表示する。
+
+        Returns:
+            threading.Event: 手の入力が終わったらセットする。以降に届いたメッセージは表示しない
+        """
+        _, future = self._pending_message
+        self._pending_message = None
+        answered = threading.Event()
+        if future.done():
+            message = self._wait_psychological_message(future)
+            print(f"🤖 {ai_player.name}: 「{message}」")
+            print()
+            return answered
+
+        def announce():
+            message = self._wait_psychological_message(future)
+            with self._output_lock:
+                if answered.is_set():
+                    return
+                print(f"\n🤖 {ai_player.name}: 「{message}」")
+                # 表示で流れた入力プロンプトを出し直す
+                print(self.messages["input_prompt"], end="", flush=True)
+
+        run_in_daemon_thread(announce, name="psychological-announce")
+        return answered
+
+    def run_single_game(self, ai_player: "AIPlayer"):
         """1回のゲームを実行"""
-        self.display_welcome()
-
-        # 心理戦メッセージを表示
-        psychological_msg = ai_player.get_psychological_message()
-        print(f"🤖 {ai_player.name}: 「{psychological_msg}」")
-        print()
-
-        player_choice = self.get_player_choice()
+        # 事前に開始されていなければここで取得を開始し、ウェルカム表示と並行させる
+        pending = self._pending_message
+        if pending is None or pending[0] is not ai_player:
+            self.prefetch_psychological_message(ai_player)
+        # 起動直後に表示済みであれば繰り返さない
+        if not self._welcome_shown:
+            self.display_welcome()
+
+        # 心理戦メッセージは待たずに入力を受け付け、届いた時点で表示する
+        answered = self._announce_psychological_message(ai_player)
+        try:
+            player_choice = self.get_player_choice()
+        finally:
+            with self._output_lock:
+                answered.set()
         if player_choice is None:
             self.display_goodbye()
             return
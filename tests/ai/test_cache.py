@@ -0,0 +1,139 @@
+"""
+DecisionCache のテスト
+"""
+
+import pytest
+
+from src.ai import cache as cache_module
+from src.ai.cache import MODE_SAMPLE, DecisionCache, get_shared_decision_cache
+from src.ai.player import LLMAIPlayer
+from src.game.engine import Choice
+
+
+def test_make_key_normalizes_history():
+    """キーがモデル名と正規化された履歴から生成されることのテスト"""
+    history = [
+        (Choice.ROCK, Choice.PAPER, "WIN"),
+        (Choice.SCISSORS, Choice.ROCK, "lose"),
+    ]
+    key = DecisionCache.make_key("gpt-4o-mini", history)
+
+    assert key == DecisionCache.make_key(
+        "gpt-4o-mini",
+        [(Choice.ROCK, Choice.PAPER, "win"), (Choice.SCISSORS, Choice.ROCK, " LOSE ")],
+    )
+    assert key != DecisionCache.make_key("gpt-4o", history)
+    assert DecisionCache.make_key("gpt-4o-mini", []) == "gpt-4o-mini|"
+
+
+def test_hit_and_miss_counters():
+    """ヒット・ミスの計測テスト"""
+    cache = DecisionCache()
+    assert cache.get("k") is None
+    cache.put("k", Choice.PAPER)
+    assert cache.get("k") == Choice.PAPER
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_eviction():
+    """サイズ上限を超えると最も古いエントリが破棄されることのテスト"""
+    cache = DecisionCache(max_size=2)
+    cache.put("a", Choice.ROCK)
+    cache.put("b", Choice.PAPER)
+    cache.get("a")  # a を最近使ったことにする
+    cache.put("c", Choice.SCISSORS)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == Choice.ROCK
+    assert cache.get("c") == Choice.SCISSORS
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(clock):
+    """TTL を過ぎたエントリが無効になることのテスト"""
+    cache = DecisionCache(ttl=10, clock=clock)
+    cache.put("k", Choice.ROCK)
+
+    clock.now += 5
+    assert cache.get("k") == Choice.ROCK
+    clock.now += 11
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_persistence_survives_restart(tmp_path):
+    """SQLite に保存したキャッシュが再生成後も使えることのテスト"""
+    path = str(tmp_path / "decisions.sqlite3")
+    cache = DecisionCache(path=path)
+    cache.put("k", Choice.SCISSORS)
+    cache.close()
+
+    restarted = DecisionCache(path=path)
+    assert restarted.get("k") == Choice.SCISSORS
+    restarted.close()
+
+
+def test_sample_mode_uses_answer_distribution():
+    """サンプリングモードが過去の回答分布から抽選することのテスト"""
+    cache = DecisionCache(mode=MODE_SAMPLE, min_samples=3)
+    cache.put("k", Choice.ROCK)
+    cache.put("k", Choice.ROCK)
+    # 回答数が min_samples 未満の間はミス扱い
+    assert cache.get("k") is None
+
+    cache.put("k", Choice.PAPER)
+    samples = {cache.get("k") for _ in range(200)}
+    assert samples == {Choice.ROCK, Choice.PAPER}
+
+
+def test_invalid_configuration():
+    """不正な設定値のテスト"""
+    with pytest.raises(ValueError):
+        DecisionCache(max_size=0)
+    with pytest.raises(ValueError):
+        DecisionCache(mode="unknown")
+
+
+def test_from_env(monkeypatch, tmp_path):
+    """環境変数から生成するテスト（いずれも未設定なら None）"""
+    for name in ("PATH", "TTL", "MODE", "SIZE"):
+        monkeypatch.delenv(f"OPENAI_DECISION_CACHE_{name}", raising=False)
+    assert DecisionCache.from_env() is None
+
+    path = tmp_path / "decisions.sqlite3"
+    monkeypatch.setenv("OPENAI_DECISION_CACHE_PATH", str(path))
+    monkeypatch.setenv("OPENAI_DECISION_CACHE_TTL", "60")
+    monkeypatch.setenv("OPENAI_DECISION_CACHE_MODE", "sample")
+    monkeypatch.setenv("OPENAI_DECISION_CACHE_SIZE", "8")
+    cache = DecisionCache.from_env()
+    try:
+        assert (cache.ttl, cache.mode, cache.max_size) == (60.0, MODE_SAMPLE, 8)
+        assert cache._db is not None
+    finally:
+        cache.close()
+    assert path.exists()
+
+
+def test_player_uses_shared_cache_from_env(monkeypatch, tmp_path):
+    """環境変数で設定した共有キャッシュを LLMAIPlayer が使うテスト"""
+    monkeypatch.setattr(cache_module, "_shared_cache", None)
+    monkeypatch.setattr(cache_module, "_shared_cache_loaded", False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_DECISION_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+
+    first = LLMAIPlayer(name="一人目")
+    second = LLMAIPlayer(name="二人目")
+    try:
+        assert first.decision_cache is get_shared_decision_cache()
+        assert second.decision_cache is first.decision_cache
+        explicit = DecisionCache()
+        assert (
+            LLMAIPlayer(name="三人目", decision_cache=explicit).decision_cache
+            is explicit
+        )
+    finally:
+        first.decision_cache.close()
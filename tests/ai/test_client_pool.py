@@ -0,0 +1,124 @@
+"""
+共有クライアントレジストリのテスト
+"""
+
+import asyncio
+import os
+from unittest.mock import MagicMock, patch
+
+from src.ai import client_pool
+from src.ai.client_pool import ClientRegistry, get_client_registry
+from src.ai.player import AsyncLLMAIPlayer, LLMAIPlayer
+from src.ai.stub_server import StubConfig, StubOpenAIServer
+from src.game.engine import Choice
+
+
+def test_registry_reuses_client_per_key():
+    """API キー・ベース URL・モデルが同じならクライアントを使い回す"""
+    registry = ClientRegistry(pool_size=4)
+    first = registry.get("key", "http://localhost:1/v1", "gpt-4o-mini")
+    assert registry.get("key", "http://localhost:1/v1", "gpt-4o-mini") is first
+    assert registry.get("key", "http://localhost:2/v1", "gpt-4o-mini") is not first
+    assert registry.get("other", "http://localhost:1/v1", "gpt-4o-mini") is not first
+    assert registry.get("key", "http://localhost:1/v1", "gpt-4o") is not first
+
+    stats = registry.stats()
+    assert stats["clients"] == 4
+    assert stats["created"] == 4
+    assert stats["reused"] == 1
+    registry.close_all()
+    assert len(registry) == 0
+
+
+def test_registry_configures_http_client():
+    """接続プールの設定を反映した HTTP クライアントを渡す"""
+    registry = ClientRegistry(pool_size=8)
+    http_client = MagicMock()
+    with patch.object(registry, "_http_client", return_value=http_client) as factory:
+        with patch("openai.OpenAI") as mock_openai:
+            registry.get("key", "http://localhost:1/v1")
+
+    factory.assert_called_once_with(False)
+    mock_openai.assert_called_once_with(
+        api_key="key", base_url="http://localhost:1/v1", http_client=http_client
+    )
+
+
+def test_registry_options_from_env():
+    """接続プールの設定は環境変数から読み込める"""
+    with patch.dict(
+        os.environ,
+        {
+            "OPENAI_POOL_SIZE": "50",
+            "OPENAI_KEEPALIVE_EXPIRY": "5",
+            "OPENAI_HTTP2": "false",
+        },
+    ):
+        registry = ClientRegistry()
+    assert registry.pool_size == 50
+    assert registry.keepalive_expiry == 5.0
+    assert registry.http2 is False
+
+
+def test_shared_registry_reads_env_on_first_use(monkeypatch):
+    """共有レジストリは import 後に設定した環境変数（.env など）も反映する"""
+    monkeypatch.setattr(client_pool, "_shared_registry", None)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_POOL_SIZE", "7")
+
+    player = LLMAIPlayer(name="テスト")
+    assert player.client_registry is get_client_registry()
+    assert player.client_registry.pool_size == 7
+
+
+def test_players_share_one_client():
+    """複数の LLMAIPlayer が同じクライアントを共有して対戦できる"""
+    with StubOpenAIServer(StubConfig(answers=["paper"])) as server:
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            players = [
+                LLMAIPlayer(name=f"AI{i}", base_url=server.base_url) for i in range(5)
+            ]
+            assert get_client_registry().warm_up(
+                "test-key", server.base_url, players[0].model, connect=True
+            )
+            choices = [player.make_choice() for player in players]
+
+    assert choices == [Choice.PAPER] * 5
+    assert len({id(player.client) for player in players}) == 1
+    assert get_client_registry().stats()["created"] == 1
+
+
+def test_async_clients_are_per_event_loop():
+    """非同期クライアントはイベントループごとに共有する"""
+    registry = ClientRegistry()
+
+    async def fetch_pair():
+        return registry.get_async("key"), registry.get_async("key")
+
+    first_a, first_b = asyncio.run(fetch_pair())
+    second_a, _ = asyncio.run(fetch_pair())
+    assert first_a is first_b
+    assert second_a is not first_a
+
+
+def test_async_player_uses_registry():
+    """AsyncLLMAIPlayer も共有レジストリからクライアントを取得する"""
+    with StubOpenAIServer(StubConfig(answers=["rock"])) as server:
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+
+            async def play():
+                players = [
+                    AsyncLLMAIPlayer(name=f"AI{i}", base_url=server.base_url)
+                    for i in range(3)
+                ]
+                choices = await asyncio.gather(
+                    *(player.make_choice_async() for player in players)
+                )
+                clients = {id(player.async_client) for player in players}
+                await get_client_registry().aclose_all()
+                return choices, clients
+
+            choices, clients = asyncio.run(play())
+
+    assert choices == [Choice.ROCK] * 3
+    assert len(clients) == 1
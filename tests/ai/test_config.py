@@ -0,0 +1,19 @@
+"""
+環境変数の設定読み取りのテスト
+"""
+
+from src.ai.config import env_flag
+
+
+def test_env_flag(monkeypatch):
+    """1/true/yes/on（大文字・前後の空白を含む）を真として読み取る"""
+    monkeypatch.delenv("TEST_FLAG", raising=False)
+    assert env_flag("TEST_FLAG") is False
+    assert env_flag("TEST_FLAG", default=True) is True
+
+    for value in ("1", "true", " YES ", "On"):
+        monkeypatch.setenv("TEST_FLAG", value)
+        assert env_flag("TEST_FLAG") is True
+    for value in ("0", "false", "off", ""):
+        monkeypatch.setenv("TEST_FLAG", value)
+        assert env_flag("TEST_FLAG", default=True) is False
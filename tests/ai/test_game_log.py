@@ -0,0 +1,219 @@
+"""
+ゲームログ（追記専用バイナリログ）のテスト
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from src.ai.game_log import HEADER, RECORD, GameLogReader, GameLogWriter
+from src.ai.pattern import PatternAIPlayer
+from src.ai.player import RandomAIPlayer
+from src.game.engine import Choice
+from src.server.app import GameServer
+
+
+def test_record_is_fixed_width():
+    """レコードは 16 バイト固定でヘッダーも 16 バイト"""
+    assert RECORD.size == 16
+    assert HEADER.size == 16
+
+
+def test_write_and_read(tmp_path):
+    """追記したレコードを mmap で読み出せる"""
+    path = str(tmp_path / "games.log")
+    with GameLogWriter(path, flush_interval=None) as log:
+        log.append(1, 1, Choice.ROCK, Choice.PAPER, "lose")
+        log.append(1, 2, Choice.SCISSORS, Choice.PAPER, "win")
+        log.append(2, 1, Choice.PAPER, Choice.PAPER, "custom")
+
+    assert os.path.getsize(path) == HEADER.size + 3 * RECORD.size
+    with GameLogReader(path) as reader:
+        assert len(reader) == 3
+        records = list(reader)
+        assert records[0] == (1, 1, Choice.ROCK, Choice.PAPER, "lose")
+        assert records[1].result == "win"
+        # 標準外の結果文字列は None として読み出される
+        assert records[2].result is None
+        assert reader[-1].session_id == 2
+        assert list(reader.iter_raw())[1] == (1, 2, 2, 1, 1)
+        with pytest.raises(IndexError):
+            reader[3]
+
+
+def test_close_while_iterating(tmp_path):
+    """走査を途中で打ち切った後や走査中のイテレーターが残っていても閉じられる"""
+    path = str(tmp_path / "games.log")
+    with GameLogWriter(path, flush_interval=None) as log:
+        for round_number in range(1, 6):
+            log.append(1, round_number, Choice.ROCK, Choice.PAPER, "lose")
+
+    with GameLogReader(path) as reader:
+        for record in reader:
+            break
+
+    for make_iterator in (
+        GameLogReader.iter_raw,
+        iter,
+        lambda reader: reader.iter_session(1),
+    ):
+        reader = GameLogReader(path)
+        iterator = make_iterator(reader)
+        next(iterator)
+        reader.close()
+        del iterator
+
+
+def test_empty_log(tmp_path):
+    """レコードの無いログも読み出せる"""
+    path = str(tmp_path / "games.log")
+    GameLogWriter(path).close()
+    with GameLogReader(path) as reader:
+        assert len(reader) == 0
+        assert list(reader) == []
+
+
+def test_append_is_buffered_until_batch(tmp_path):
+    """batch_size 件たまるまで書き込まず、たまったらまとめてコミットする"""
+    path = str(tmp_path / "games.log")
+    log = GameLogWriter(path, batch_size=3, flush_interval=None)
+    log.append(1, 1, Choice.ROCK, Choice.ROCK, "draw")
+    log.append(1, 2, Choice.ROCK, Choice.ROCK, "draw")
+    assert os.path.getsize(path) == HEADER.size
+    assert log.stats()["pending"] == 2
+
+    log.append(1, 3, Choice.ROCK, Choice.ROCK, "draw")
+    assert os.path.getsize(path) == HEADER.size + 3 * RECORD.size
+    assert log.stats() == {"appended": 3, "committed": 3, "pending": 0, "commits": 1}
+    log.close()
+
+
+def test_background_flush(tmp_path):
+    """flush_interval 秒経過するとバックグラウンドでコミットされる"""
+    path = str(tmp_path / "games.log")
+    log = GameLogWriter(path, flush_interval=0.01)
+    log.append(1, 1, Choice.ROCK, Choice.PAPER, "lose")
+    for _ in range(200):
+        if log.stats()["committed"] == 1:
+            break
+        threading.Event().wait(0.01)
+    assert log.stats()["committed"] == 1
+    log.close()
+
+
+def test_concurrent_sync_shares_commits(tmp_path):
+    """複数スレッドの追記と sync で全レコードが欠けずに書き込まれる"""
+    path = str(tmp_path / "games.log")
+    log = GameLogWriter(path, batch_size=10_000, flush_interval=None)
+
+    def worker(session_id):
+        for round_number in range(1, 101):
+            sequence = log.append(
+                session_id, round_number, Choice.ROCK, Choice.PAPER, "lose"
+            )
+            if round_number % 10 == 0:
+                log.sync(sequence)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+
+    assert log.stats()["commits"] <= 80
+    with GameLogReader(path) as reader:
+        assert len(reader) == 800
+        for session_id in range(8):
+            rounds = [record.round for record in reader.iter_session(session_id)]
+            assert rounds == list(range(1, 101))
+
+
+def test_reopen_appends_and_drops_torn_record(tmp_path):
+    """既存のログに追記し、途切れた末尾のレコードは切り捨てる"""
+    path = str(tmp_path / "games.log")
+    with GameLogWriter(path) as log:
+        log.append(1, 1, Choice.ROCK, Choice.PAPER, "lose")
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+
+    # 読み出し時は途切れたレコードを無視する
+    with GameLogReader(path) as reader:
+        assert len(reader) == 1
+
+    with GameLogWriter(path) as log:
+        log.append(1, 2, Choice.PAPER, Choice.PAPER, "draw")
+    with GameLogReader(path) as reader:
+        assert [record.round for record in reader] == [1, 2]
+
+
+def test_rejects_other_files(tmp_path):
+    """ゲームログ以外のファイルは開けない"""
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a game log at all")
+    with pytest.raises(ValueError):
+        GameLogReader(str(path))
+    with pytest.raises(ValueError):
+        GameLogWriter(str(path))
+
+
+def test_observer_logs_record_game(tmp_path):
+    """オブザーバーを登録すると record_game ごとに追記される"""
+    path = str(tmp_path / "games.log")
+    player = RandomAIPlayer("AI")
+    with GameLogWriter(path) as log:
+        observer = log.observer(42)
+        player.add_observer(observer)
+        player.record_game(Choice.ROCK, Choice.PAPER, "lose")
+        player.record_game(Choice.PAPER, Choice.SCISSORS, "lose")
+        player.remove_observer(observer)
+        player.record_game(Choice.PAPER, Choice.PAPER, "draw")
+
+    with GameLogReader(path) as reader:
+        assert [(r.session_id, r.round) for r in reader] == [(42, 1), (42, 2)]
+
+
+def test_replay_restores_player_state(tmp_path):
+    """ログを流し直してプレイヤーの学習状態を復元できる"""
+    path = str(tmp_path / "games.log")
+    original = PatternAIPlayer("AI")
+    with GameLogWriter(path) as log:
+        original.add_observer(log.observer(7))
+        for _ in range(20):
+            original.record_game(Choice.ROCK, Choice.PAPER, "lose")
+
+    restored = PatternAIPlayer("AI")
+    with GameLogReader(path) as reader:
+        assert reader.replay(restored, 7) == 20
+        assert reader.replay(PatternAIPlayer("AI"), 8) == 0
+
+    assert list(restored.game_history) == list(original.game_history)
+    assert restored.predict() == original.predict()
+
+
+def test_server_logs_sessions(tmp_path):
+    """ゲームサーバーは全セッションの結果をログに追記する"""
+    path = str(tmp_path / "games.log")
+
+    async def main():
+        server = GameServer(default_player="random", game_log=log)
+        first = server.create_session()
+        second = server.create_session()
+        await server.play_move(first, "rock")
+        await server.play_move(second, "paper")
+        await server.play_move(first, "scissors")
+
+    with GameLogWriter(path) as log:
+        asyncio.run(main())
+
+    with GameLogReader(path) as reader:
+        records = list(reader)
+    assert [record.round for record in records] == [1, 1, 2]
+    assert records[0].session_id == records[2].session_id != records[1].session_id
+    assert [record.player_choice for record in records] == [
+        Choice.ROCK,
+        Choice.PAPER,
+        Choice.SCISSORS,
+    ]
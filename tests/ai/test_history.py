@@ -0,0 +1,67 @@
+"""
+GameHistory（リングバッファ履歴）のテスト
+"""
+
+import pytest
+
+from src.ai.history import GameHistory
+from src.game.engine import Choice
+
+
+def test_append_and_index():
+    """記録の追加とインデックス参照のテスト"""
+    history = GameHistory(capacity=4)
+    history.append(Choice.ROCK, Choice.PAPER, "lose")
+    history.append(Choice.SCISSORS, Choice.PAPER, "win")
+
+    assert len(history) == 2
+    assert history[0] == (Choice.ROCK, Choice.PAPER, "lose")
+    assert history[-1] == (Choice.SCISSORS, Choice.PAPER, "win")
+    with pytest.raises(IndexError):
+        history[2]
+
+
+def test_ring_buffer_keeps_latest():
+    """容量を超えると古い記録から破棄されることのテスト"""
+    history = GameHistory(capacity=3)
+    for i in range(5):
+        history.append(Choice.ROCK, Choice.ROCK, f"game_{i}")
+
+    assert len(history) == 3
+    assert history.total_recorded == 5
+    assert [result for _, _, result in history] == ["game_2", "game_3", "game_4"]
+    assert history[-2:] == [
+        (Choice.ROCK, Choice.ROCK, "game_3"),
+        (Choice.ROCK, Choice.ROCK, "game_4"),
+    ]
+
+
+def test_compatible_with_list_of_tuples():
+    """従来のタプルのリストと比較できることのテスト"""
+    history = GameHistory()
+    history.append(Choice.PAPER, Choice.ROCK, "win")
+    assert history == [(Choice.PAPER, Choice.ROCK, "win")]
+    assert list(history) == [(Choice.PAPER, Choice.ROCK, "win")]
+
+
+def test_archive_spills_evicted_records(tmp_path):
+    """破棄された記録がアーカイブに退避されることのテスト"""
+    path = str(tmp_path / "history.bin")
+    history = GameHistory(capacity=2, archive_path=path)
+    history.append(Choice.ROCK, Choice.PAPER, "lose")
+    history.append(Choice.PAPER, Choice.PAPER, "draw")
+    history.append(Choice.SCISSORS, Choice.PAPER, "win")
+    history.append(Choice.SCISSORS, Choice.ROCK, "custom")
+
+    assert list(history.iter_archive()) == [
+        (Choice.ROCK, Choice.PAPER, "lose"),
+        (Choice.PAPER, Choice.PAPER, "draw"),
+    ]
+    assert len(list(history.iter_all())) == 4
+    history.close()
+
+
+def test_invalid_capacity():
+    """不正な容量のテスト"""
+    with pytest.raises(ValueError):
+        GameHistory(capacity=0)
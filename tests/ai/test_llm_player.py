@@ -2,12 +2,21 @@
 LLMAIPlayer のテスト
 """
 
+import asyncio
 import os
-from unittest.mock import MagicMock, patch
+import subprocess
+import sys
+import textwrap
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from src.ai.player import LLMAIPlayer
+from src.ai import prompt as prompt_module
+from src.ai.cache import DecisionCache
+from src.ai.metrics import LLMMetrics
+from src.ai.player import MOVE_RESPONSE_FORMAT, AsyncLLMAIPlayer, LLMAIPlayer
+from src.ai.resilience import CircuitBreaker
 from src.game.engine import Choice
 
 
@@ -164,3 +173,453 @@ def test_history_limit(llm_player):
     # プロンプト内で game_5以降の履歴が含まれることを確認
     assert "game_5" in prompt
     assert "game_0" not in prompt
+
+
+def _async_mock_client(content="rock", delay=0.0):
+    """非同期クライアントのモックを生成"""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = content
+    in_flight = {"current": 0, "max": 0}
+
+    async def create(**kwargs):
+        in_flight["current"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["current"])
+        await asyncio.sleep(delay)
+        in_flight["current"] -= 1
+        return mock_response
+
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=create)
+    return mock_client, in_flight
+
+
+def test_async_make_choice():
+    """AsyncLLMAIPlayerの非同期な手の決定テスト"""
+    mock_client, _ = _async_mock_client("scissors")
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = AsyncLLMAIPlayer(name="テスト")
+        player._async_client = mock_client
+        choice = asyncio.run(player.make_choice_async())
+
+    assert choice == Choice.SCISSORS
+
+
+def test_async_client_is_per_event_loop():
+    """asyncio.run を繰り返しても実行中のループのクライアントを使うことのテスト"""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "scissors"
+
+    def loop_bound_client(*args):
+        loop = asyncio.get_running_loop()
+
+        async def create(**kwargs):
+            if asyncio.get_running_loop() is not loop:
+                raise RuntimeError("Event loop is closed")
+            return mock_response
+
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(side_effect=create)
+        return client
+
+    registry = MagicMock()
+    registry.get_async.side_effect = loop_bound_client
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = AsyncLLMAIPlayer(name="テスト")
+        player.client_registry = registry
+        player.metrics = LLMMetrics()
+        player.circuit_breaker = CircuitBreaker()
+        first = asyncio.run(player.make_choice_async())
+        second = asyncio.run(player.make_choice_async())
+
+    assert first == second == Choice.SCISSORS
+    assert registry.get_async.call_count == 2
+    assert player.metrics.snapshot()[0]["fallbacks"] == {}
+
+
+def test_async_make_choice_api_error():
+    """非同期APIエラー時のフォールバックテスト"""
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = AsyncLLMAIPlayer(name="テスト")
+        player._async_client = mock_client
+        with patch("builtins.print"):
+            choice = asyncio.run(player.make_choice_async())
+
+    assert choice in [Choice.ROCK, Choice.PAPER, Choice.SCISSORS]
+
+
+def test_async_psychological_message():
+    """非同期な心理戦メッセージ生成テスト"""
+    mock_client, _ = _async_mock_client("君の手は読めているよ")
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = AsyncLLMAIPlayer(name="テスト")
+        player._async_client = mock_client
+        message = asyncio.run(player.get_psychological_message_async())
+
+    assert message == "君の手は読めているよ"
+
+
+def test_async_bounded_concurrency():
+    """同時実行数がmax_concurrencyに制限されることのテスト"""
+    mock_client, in_flight = _async_mock_client("paper", delay=0.01)
+
+    async def run_all(players):
+        return await asyncio.gather(*(p.make_choice_async() for p in players))
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        players = [
+            AsyncLLMAIPlayer(name=f"AI{i}", max_concurrency=3) for i in range(10)
+        ]
+        for player in players:
+            player._async_client = mock_client
+        choices = asyncio.run(run_all(players))
+
+    assert choices == [Choice.PAPER] * 10
+    assert in_flight["max"] == 3
+
+
+def test_async_player_sync_adapter():
+    """AsyncLLMAIPlayerが同期呼び出しでも利用できることのテスト"""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "rock"
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = mock_response
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = AsyncLLMAIPlayer(name="テスト")
+        player._client = mock_client
+        assert player.make_choice() == Choice.ROCK
+
+
+def _mock_client_with_contents(*contents):
+    """呼び出しごとに指定の内容を返す同期クライアントのモックを生成"""
+    responses = []
+    for content in contents:
+        response = MagicMock()
+        response.choices[0].message.content = content
+        responses.append(response)
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.side_effect = responses
+    return mock_client
+
+
+def test_combined_mode_single_call():
+    """一括モードで心理戦メッセージと手が1回の呼び出しで決まることのテスト"""
+    mock_client = _mock_client_with_contents(
+        '{"message": "君の手は読めているよ", "move": "paper"}'
+    )
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト", combined_mode=True)
+        player._client = mock_client
+        message = player.get_psychological_message()
+        choice = player.make_choice()
+
+    assert message == "君の手は読めているよ"
+    assert "paper" not in message
+    assert choice == Choice.PAPER
+    assert mock_client.chat.completions.create.call_count == 1
+    request = mock_client.chat.completions.create.call_args[1]
+    assert request["response_format"] == {"type": "json_object"}
+
+
+def test_combined_mode_parse_failure_falls_back_to_split_calls():
+    """一括応答が解釈できない場合に分割呼び出しへフォールバックするテスト"""
+    mock_client = _mock_client_with_contents("not json", "勝負の時間だ！", "scissors")
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト", combined_mode=True)
+        player._client = mock_client
+        message = player.get_psychological_message()
+        choice = player.make_choice()
+
+    assert message == "勝負の時間だ！"
+    assert choice == Choice.SCISSORS
+    assert mock_client.chat.completions.create.call_count == 3
+
+
+def test_combined_mode_invalid_move_falls_back():
+    """一括応答の手が不正な場合のフォールバックテスト"""
+    mock_client = _mock_client_with_contents(
+        '{"message": "勝負だ", "move": "lizard"}', "覚悟しろ", "rock"
+    )
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト", combined_mode=True)
+        player._client = mock_client
+        assert player.get_psychological_message() == "覚悟しろ"
+        assert player.make_choice() == Choice.ROCK
+
+
+def test_combined_mode_stale_choice_discarded():
+    """前のラウンドで確定した手が次のラウンドに持ち越されないことのテスト"""
+    mock_client = _mock_client_with_contents(
+        '{"message": "勝負だ", "move": "paper"}', "rock"
+    )
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト", combined_mode=True)
+        player._client = mock_client
+        player.get_psychological_message()
+        player.record_game(Choice.ROCK, Choice.SCISSORS, "win")
+        assert player.make_choice() == Choice.ROCK
+
+
+def test_combined_mode_late_answer_not_applied_to_later_round():
+    """応答が届く前に履歴が進んだ場合、一括応答の手を後のラウンドに使わないことのテスト"""
+    combined = MagicMock()
+    combined.choices[0].message.content = '{"message": "勝負だ", "move": "paper"}'
+    split = MagicMock()
+    split.choices[0].message.content = "rock"
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト", combined_mode=True)
+
+        def create(**kwargs):
+            if "response_format" in kwargs:
+                # 一括応答の待ち中に別の処理（/moves など）がラウンドを記録する
+                player.record_game(Choice.ROCK, Choice.SCISSORS, "win")
+                return combined
+            return split
+
+        player._client = MagicMock()
+        player._client.chat.completions.create.side_effect = create
+        assert player.get_psychological_message() == "勝負だ"
+        assert player.make_choice() == Choice.ROCK
+
+    assert player._client.chat.completions.create.call_count == 2
+
+
+def test_combined_mode_env_flag():
+    """環境変数で一括モードを有効化できることのテスト"""
+    with patch.dict(
+        os.environ, {"OPENAI_API_KEY": "test-key", "OPENAI_COMBINED_MODE": "true"}
+    ):
+        assert LLMAIPlayer(name="テスト").combined_mode is True
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}, clear=True):
+        assert LLMAIPlayer(name="テスト").combined_mode is False
+
+
+def test_decision_cache_skips_repeated_calls():
+    """同じ履歴ウィンドウでは決定キャッシュによりAPI呼び出しが省かれることのテスト"""
+    mock_client = _mock_client_with_contents("paper", "rock")
+    cache = DecisionCache()
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        first = LLMAIPlayer(name="テスト", decision_cache=cache)
+        first._client = mock_client
+        second = LLMAIPlayer(name="テスト2", decision_cache=cache)
+        second._client = mock_client
+
+        assert first.make_choice() == Choice.PAPER
+        assert second.make_choice() == Choice.PAPER
+        assert mock_client.chat.completions.create.call_count == 1
+
+        # 履歴が変われば別の局面としてAPIを呼ぶ
+        second.record_game(Choice.ROCK, Choice.PAPER, "lose")
+        assert second.make_choice() == Choice.ROCK
+
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_max_history_resize_rerenders_prompt(llm_player):
+    """max_history の変更後もプロンプトに正しい履歴が含まれることのテスト"""
+    for i in range(6):
+        llm_player.record_game(Choice.ROCK, Choice.PAPER, f"game_{i}")
+
+    llm_player.max_history = 2
+    prompt = llm_player._build_prompt()
+    assert "game_4" in prompt
+    assert "game_5" in prompt
+    assert "game_3" not in prompt
+    assert "5. プレイヤー" in prompt
+
+
+def test_prompt_tokens_reported(llm_player):
+    """プロンプトのトークン数が取得できることのテスト"""
+    before = llm_player.prompt_tokens
+    llm_player.record_game(Choice.ROCK, Choice.PAPER, "lose")
+    assert llm_player.prompt_tokens > before > 0
+
+
+def test_constrained_mode_uses_logit_bias():
+    """手のトークンIDが解決できる場合にlogit_biasと1トークン出力を使うことのテスト"""
+    mock_client = _mock_client_with_contents("scissors")
+    token_ids = {10: Choice.ROCK, 20: Choice.PAPER, 30: Choice.SCISSORS}
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}), patch.dict(
+        prompt_module._move_token_ids, {"gpt-4o-mini": token_ids}
+    ):
+        player = LLMAIPlayer(name="テスト", constrained_mode=True)
+        player._client = mock_client
+        assert player.make_choice() == Choice.SCISSORS
+
+    request = mock_client.chat.completions.create.call_args[1]
+    assert request["max_tokens"] == 1
+    assert request["logit_bias"] == {"10": 100, "20": 100, "30": 100}
+    assert "response_format" not in request
+
+
+def test_constrained_mode_falls_back_to_enum_schema():
+    """トークンIDが解決できない場合に構造化出力のenumを使うことのテスト"""
+    mock_client = _mock_client_with_contents('{"move": "paper"}')
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}), patch.dict(
+        prompt_module._move_token_ids, {"gpt-4o-mini": None}
+    ):
+        player = LLMAIPlayer(name="テスト", constrained_mode=True)
+        player._client = mock_client
+        assert player.make_choice() == Choice.PAPER
+
+    request = mock_client.chat.completions.create.call_args[1]
+    assert request["response_format"] == MOVE_RESPONSE_FORMAT
+    assert "logit_bias" not in request
+
+
+def _slow_mock_client(content, delay):
+    """応答が遅い同期クライアントのモックを生成"""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = content
+
+    def create(**kwargs):
+        time.sleep(delay)
+        return mock_response
+
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.side_effect = create
+    return mock_client
+
+
+def test_move_timeout_returns_local_choice():
+    """期限内に応答が無い場合はローカルで決めた手を即座に返すことのテスト"""
+    cache = DecisionCache()
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト", decision_cache=cache, move_timeout=0.05)
+        player._client = _slow_mock_client("scissors", delay=0.3)
+        player.metrics = LLMMetrics()
+        for _ in range(3):
+            player.record_game(Choice.ROCK, Choice.SCISSORS, "win")
+
+        start = time.perf_counter()
+        choice = player.make_choice()
+        elapsed = time.perf_counter() - start
+
+    # 相手が多く出している rock に勝つ paper
+    assert choice == Choice.PAPER
+    assert elapsed < 0.25
+    (item,) = player.metrics.snapshot()
+    assert item["fallbacks"] == {"timeout": 1}
+
+    # 遅れて届いた応答は決定キャッシュに格納される
+    deadline = time.perf_counter() + 2
+    while len(cache) == 0 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert player.make_choice() == Choice.SCISSORS
+
+
+def test_move_timeout_late_invalid_response_is_silent():
+    """期限切れ後に届いた無効な応答は警告もフォールバックの記録もしないことのテスト"""
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト", move_timeout=0.05)
+        player._client = _slow_mock_client("わかりません", delay=0.2)
+        player.metrics = LLMMetrics()
+
+        with patch("builtins.print") as mock_print:
+            player.make_choice()
+            time.sleep(0.4)
+
+    mock_print.assert_not_called()
+    (item,) = player.metrics.snapshot()
+    assert item["fallbacks"] == {"timeout": 1}
+
+
+def test_move_timeout_does_not_delay_process_exit():
+    """期限切れ後も続く API 呼び出しがプロセスの終了を待たせないことのテスト"""
+    script = textwrap.dedent("""
+        import os, time
+        from unittest.mock import MagicMock
+        from src.ai.player import LLMAIPlayer
+
+        os.environ["OPENAI_API_KEY"] = "test-key"
+        client = MagicMock()
+        client.chat.completions.create.side_effect = lambda **kwargs: time.sleep(30)
+        player = LLMAIPlayer(name="テスト", move_timeout=0.05)
+        player._client = client
+        player.make_choice()
+        """)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", script], cwd=root, check=True, timeout=20)
+    assert time.perf_counter() - start < 10
+
+
+def test_move_timeout_not_reached():
+    """期限内に応答があればその手を返すことのテスト"""
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト", move_timeout=1.0)
+        player._client = _slow_mock_client("rock", delay=0.0)
+        assert player.make_choice() == Choice.ROCK
+
+
+def test_move_timeout_env():
+    """move_timeout は環境変数から読み込めることのテスト"""
+    with patch.dict(
+        os.environ, {"OPENAI_API_KEY": "test-key", "OPENAI_MOVE_TIMEOUT": "1.5"}
+    ):
+        assert LLMAIPlayer(name="テスト").move_timeout == 1.5
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}, clear=True):
+        assert LLMAIPlayer(name="テスト").move_timeout is None
+
+
+def test_async_move_timeout_returns_local_choice():
+    """非同期版でも期限切れ時はローカルで決めた手を返すことのテスト"""
+    mock_client, _ = _async_mock_client("rock", delay=0.3)
+
+    async def play(player):
+        start = time.perf_counter()
+        choice = await player.make_choice_async()
+        return choice, time.perf_counter() - start
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = AsyncLLMAIPlayer(name="テスト", move_timeout=0.05)
+        player._async_client = mock_client
+        player.metrics = LLMMetrics()
+        player.record_game(Choice.SCISSORS, Choice.PAPER, "win")
+        choice, elapsed = asyncio.run(play(player))
+
+    assert choice == Choice.ROCK
+    assert elapsed < 0.25
+    assert player.metrics.snapshot()[0]["fallbacks"] == {"timeout": 1}
+
+
+def test_circuit_breaker_serves_fallback_without_calling_api():
+    """回路が開いた後は API を呼ばず、警告も出さずにフォールバックすることのテスト"""
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.side_effect = ConnectionError("down")
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト")
+        player._client = mock_client
+        player.metrics = LLMMetrics()
+        player.circuit_breaker = CircuitBreaker(failure_threshold=2)
+
+        with patch("builtins.print") as mock_print:
+            for _ in range(5):
+                assert player.make_choice() in list(Choice)
+            player.get_psychological_message()
+
+    assert mock_client.chat.completions.create.call_count == 2
+    assert mock_print.call_count == 2
+    assert player.circuit_breaker.snapshot()["state"] == "open"
+    fallbacks = {
+        item["call_site"]: item["fallbacks"] for item in player.metrics.snapshot()
+    }
+    assert fallbacks["choice"] == {"api_error": 2, "circuit_open": 3}
+    assert fallbacks["message"] == {"circuit_open": 1}
@@ -0,0 +1,286 @@
+"""
+MessagePool のテスト
+"""
+
+import gc
+import json
+import os
+import threading
+import weakref
+from unittest.mock import MagicMock, patch
+
+from src.ai.message_pool import MessagePool
+from src.ai.player import LLMAIPlayer
+
+
+def _generator(*batches):
+    """呼ばれるたびに batches を順に返す生成関数"""
+    calls = []
+    remaining = list(batches)
+
+    def generate(name, language, count):
+        calls.append((name, language, count))
+        return remaining.pop(0) if remaining else []
+
+    generate.calls = calls
+    return generate
+
+
+def _wait_for_refill():
+    """バックグラウンドの補充が終わるまで待つ"""
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(timeout=1)
+
+
+def test_get_returns_messages_in_order():
+    """追加した順に払い出し、空になったら None を返す"""
+    pool = MessagePool(_generator(), low_watermark=0)
+    assert pool.add("AI", "ja", ["一", "二", "三"]) == 3
+
+    assert [pool.get("AI") for _ in range(3)] == ["一", "二", "三"]
+    assert pool.get("AI") is None
+    stats = pool.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_pools_are_separated_by_name_and_language():
+    """プレイヤー名・言語ごとに別のプールになる"""
+    pool = MessagePool(_generator(), low_watermark=0)
+    pool.add("AI", "ja", ["勝つ"])
+    pool.add("AI", "en", ["I win"])
+
+    assert pool.get("AI", "en") == "I win"
+    assert pool.get("他のAI", "ja") is None
+    assert pool.get("AI", "ja") == "勝つ"
+
+
+def test_add_skips_duplicates_and_recently_served():
+    """プール内と直近に払い出したメッセージは追加しない"""
+    pool = MessagePool(_generator(), low_watermark=0, recent_size=2)
+    assert pool.add("AI", "ja", ["一", "一", "二", ""]) == 2
+    assert pool.get("AI") == "一"
+
+    # 直近に払い出した「一」とプール内の「二」は重複
+    assert pool.add("AI", "ja", ["一", "二", "三"]) == 1
+    assert pool.stats()["duplicates"] == 3
+
+    # recent_size を超えて払い出すと古いものは再び追加できる
+    pool.get("AI")
+    pool.get("AI")
+    assert pool.add("AI", "ja", ["一"]) == 1
+
+
+def test_expired_messages_are_skipped(clock):
+    """有効期限が切れたメッセージは払い出さない"""
+    pool = MessagePool(_generator(), low_watermark=0, ttl=10, clock=clock)
+    pool.add("AI", "ja", ["古い"])
+    clock.now = 5
+    pool.add("AI", "ja", ["新しい"])
+
+    clock.now = 12
+    assert pool.get("AI") == "新しい"
+    assert pool.stats()["expired"] == 1
+
+
+def test_refill_generates_batch():
+    """refill は batch_size 件を依頼して追加する"""
+    generate = _generator(["一", "二"])
+    pool = MessagePool(generate, batch_size=5)
+
+    assert pool.refill("AI", "en") == 2
+    assert generate.calls == [("AI", "en", 5)]
+    assert pool.size("AI", "en") == 2
+    assert pool.stats()["refills"] == 1
+
+
+def test_refill_counts_generator_errors():
+    """生成関数の例外は送出せずに数える"""
+
+    def failing(name, language, count):
+        raise RuntimeError("API error")
+
+    pool = MessagePool(failing)
+    assert pool.refill("AI") == 0
+    stats = pool.stats()
+    assert stats["errors"] == 1
+    assert stats["size"] == 0
+    # 失敗後も再び補充を開始できる
+    assert pool._claim_refill(pool._entry(("AI", "ja")))
+
+
+def test_get_below_watermark_refills_in_background():
+    """残りが low_watermark 未満になるとバックグラウンドで補充する"""
+    generate = _generator(["補充1", "補充2", "補充3"])
+    pool = MessagePool(generate, batch_size=3, low_watermark=2)
+    pool.add("AI", "ja", ["初期1", "初期2"])
+
+    assert pool.get("AI") == "初期1"
+    _wait_for_refill()
+
+    assert generate.calls == [("AI", "ja", 3)]
+    assert pool.size("AI") == 4
+    assert [pool.get("AI") for _ in range(4)] == ["初期2", "補充1", "補充2", "補充3"]
+
+
+def test_refill_starts_once_per_key():
+    """補充中は同じキーの補充を重ねて開始しない"""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow(name, language, count):
+        calls.append(name)
+        started.set()
+        release.wait(timeout=1)
+        return ["遅い"]
+
+    pool = MessagePool(slow, low_watermark=5)
+    assert pool.get("AI") is None
+    assert started.wait(timeout=1)
+    for _ in range(10):
+        assert pool.get("AI") is None
+    release.set()
+    _wait_for_refill()
+
+    assert calls == ["AI"]
+    assert pool.get("AI") == "遅い"
+
+
+def test_ensure_prefills_pool():
+    """ensure で事前に補充を開始できる"""
+    pool = MessagePool(_generator(["準備"]))
+    pool.ensure("AI")
+    _wait_for_refill()
+    assert pool.size("AI") == 1
+
+
+def _batch_client(payload: dict):
+    """まとめて生成した JSON を返すモッククライアント"""
+    response = MagicMock()
+    response.choices[0].message.content = json.dumps(payload, ensure_ascii=False)
+    client = MagicMock()
+    client.chat.completions.create.return_value = response
+    return client
+
+
+def test_player_generates_message_batch(monkeypatch):
+    """LLMAIPlayer は 1 回の呼び出しでメッセージをまとめて生成する"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    player = LLMAIPlayer(name="テストAI")
+    player._client = _batch_client(
+        {
+            "messages": [
+                "読めてるよ",
+                "次はグーかな？",
+                "これは二十文字を超える長いメッセージです。",
+            ]
+        }
+    )
+
+    messages = player._generate_messages("テストAI", "ja", 3)
+
+    assert messages[:2] == ["読めてるよ", "次はグーかな？"]
+    assert messages[2].endswith("...")
+    kwargs = player._client.chat.completions.create.call_args.kwargs
+    assert kwargs["response_format"] == {"type": "json_object"}
+    assert "3 個" in kwargs["messages"][0]["content"]
+
+
+def test_player_generate_messages_invalid_response(monkeypatch):
+    """不正な応答では空のリストを返す"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    player = LLMAIPlayer(name="テストAI")
+    player._client = _batch_client({"move": "rock"})
+    assert player._generate_messages("テストAI", "ja", 3) == []
+
+
+def test_player_serves_message_from_pool():
+    """プールにメッセージがあれば API を呼ばずに払い出す"""
+    pool = MessagePool(_generator(), low_watermark=0)
+    pool.add("テストAI", "ja", ["プールから"])
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テストAI", message_pool=pool)
+    player._client = MagicMock()
+
+    assert player.get_psychological_message() == "プールから"
+    player._client.chat.completions.create.assert_not_called()
+
+
+def test_player_falls_back_when_pool_is_empty(monkeypatch):
+    """プールが空なら従来どおり 1 件生成する"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    pool = MessagePool(_generator(), low_watermark=0)
+    response = MagicMock()
+    response.choices[0].message.content = "直接生成"
+    player = LLMAIPlayer(name="テストAI", message_pool=pool)
+    player._client = MagicMock()
+    player._client.chat.completions.create.return_value = response
+
+    assert player.get_psychological_message() == "直接生成"
+
+
+def test_player_language_keys_pool(monkeypatch):
+    """language を指定したプレイヤーはその言語のプールから払い出す"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    pool = MessagePool(_generator(), low_watermark=0)
+    pool.add("AI", "ja", ["勝つ"])
+    pool.add("AI", "en", ["I win"])
+    player = LLMAIPlayer(name="AI", message_pool=pool, language="en")
+    player._client = MagicMock()
+
+    assert player.language == "en"
+    assert player.get_psychological_message() == "I win"
+
+
+def test_player_skips_refill_without_client(monkeypatch):
+    """API キーが無くクライアントを生成できない場合は補充を開始しない"""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    generator = _generator(["生成"])
+    pool = MessagePool(generator)
+    player = LLMAIPlayer(name="AI", message_pool=pool)
+
+    with patch("builtins.print"):
+        player.get_psychological_message()
+    _wait_for_refill()
+
+    assert generator.calls == []
+    assert pool.stats()["refills"] == 0
+
+
+def test_player_uses_shared_pool_from_env():
+    """OPENAI_MESSAGE_POOL=true で同じモデル・接続先のインスタンスが同じプールを使う"""
+    with patch.dict(
+        os.environ, {"OPENAI_API_KEY": "test-key", "OPENAI_MESSAGE_POOL": "true"}
+    ), patch.dict("src.ai.player._shared_message_pools", clear=True):
+        first = LLMAIPlayer(name="一人目")
+        second = LLMAIPlayer(name="二人目")
+        other = LLMAIPlayer(name="三人目", base_url="http://127.0.0.1:9/v1")
+    assert first.message_pool is not None
+    assert first.message_pool is second.message_pool
+    assert other.message_pool is not first.message_pool
+
+
+def test_shared_pool_does_not_keep_first_player():
+    """共有プールは最初のプレイヤーを保持せず、補充専用のインスタンスで生成する"""
+    with patch.dict(
+        os.environ, {"OPENAI_API_KEY": "test-key", "OPENAI_MESSAGE_POOL": "true"}
+    ), patch.dict("src.ai.player._shared_message_pools", clear=True):
+        first = LLMAIPlayer(name="一人目", base_url="http://127.0.0.1:9/v1")
+        pool = first.message_pool
+        first_ref = weakref.ref(first)
+        del first
+        gc.collect()
+        assert first_ref() is None
+
+        with patch.object(
+            LLMAIPlayer, "_generate_messages", autospec=True, return_value=["補充"]
+        ) as generate:
+            pool.refill("二人目", "ja")
+
+    generator = generate.call_args.args[0]
+    assert generator.name == "message-pool"
+    assert generator.base_url == "http://127.0.0.1:9/v1"
+    assert generate.call_args.args[1:] == ("二人目", "ja", pool.batch_size)
+    assert pool.get("二人目", "ja", refill=False) == "補充"
@@ -0,0 +1,99 @@
+"""
+LLM 呼び出し計測のテスト
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+from src.ai.metrics import Histogram, LLMMetrics
+from src.ai.player import LLMAIPlayer
+from src.ai.stub_server import StubConfig, StubOpenAIServer
+from src.game.engine import Choice
+
+
+def test_histogram_quantiles():
+    """ヒストグラムの分位点推定テスト"""
+    histogram = Histogram()
+    for i in range(1, 101):
+        histogram.observe(i / 1000)  # 1ms〜100ms
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert abs(snapshot["sum"] - 5.05) < 1e-9
+    # 対数バケットによる近似（相対誤差 20% 以内）
+    assert 0.050 <= snapshot["p50"] <= 0.050 * 1.2
+    assert 0.095 <= snapshot["p95"] <= 0.100
+    assert snapshot["p99"] <= snapshot["max"] == 0.1
+
+
+def test_histogram_empty():
+    """記録が無いヒストグラムのテスト"""
+    snapshot = Histogram().snapshot()
+    assert snapshot["count"] == 0
+    assert snapshot["p99"] == 0.0
+
+
+def test_record_call_and_export():
+    """呼び出し記録とJSON・Prometheus出力のテスト"""
+    metrics = LLMMetrics()
+    usage = MagicMock(prompt_tokens=120, completion_tokens=2)
+    metrics.record_call("choice", "gpt-4o-mini", 0.2, usage=usage)
+    metrics.record_call("choice", "gpt-4o-mini", 1.5, error=TimeoutError("slow"))
+    metrics.record_fallback("choice", "gpt-4o-mini", "api_error")
+
+    (item,) = metrics.snapshot()
+    assert item["calls"] == 2
+    assert item["prompt_tokens"] == 120
+    assert item["completion_tokens"] == 2
+    assert item["errors"] == {"TimeoutError": 1}
+    assert item["fallbacks"] == {"api_error": 1}
+    assert item["ttft"]["count"] == 1
+
+    assert json.loads(metrics.to_json())["llm_calls"][0]["call_site"] == "choice"
+    text = metrics.to_prometheus()
+    assert (
+        'llm_request_latency_seconds_count{call_site="choice",model="gpt-4o-mini"} 2'
+        in text
+    )
+    assert (
+        'llm_errors_total{call_site="choice",model="gpt-4o-mini",error="TimeoutError"} 1'
+        in text
+    )
+
+    metrics.reset()
+    assert metrics.snapshot() == []
+
+
+def test_player_records_api_errors_and_fallbacks():
+    """APIエラー時にエラー種別とフォールバックが記録されることのテスト"""
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.side_effect = ConnectionError("down")
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト")
+        player.metrics = LLMMetrics()
+        player._client = mock_client
+        with patch("builtins.print"):
+            player.make_choice()
+
+    (item,) = player.metrics.snapshot()
+    assert item["call_site"] == "choice"
+    assert item["errors"] == {"ConnectionError": 1}
+    assert item["fallbacks"] == {"api_error": 1}
+
+
+def test_player_records_usage_through_stub_server():
+    """スタンドインサーバー経由でトークン使用量が記録されることのテスト"""
+    with StubOpenAIServer(StubConfig(answers=["rock", "勝負だ！"])) as server:
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "stub-key"}):
+            player = LLMAIPlayer(name="テスト", base_url=server.base_url)
+            player.metrics = LLMMetrics()
+            assert player.make_choice() == Choice.ROCK
+            assert player.get_psychological_message() == "勝負だ！"
+
+    items = {item["call_site"]: item for item in player.metrics.snapshot()}
+    assert items["choice"]["prompt_tokens"] > 0
+    assert items["choice"]["completion_tokens"] > 0
+    assert items["choice"]["latency"]["count"] == 1
+    assert items["message"]["calls"] == 1
@@ -0,0 +1,101 @@
+"""
+PatternAIPlayer のテスト
+"""
+
+from array import array
+
+import pytest
+
+from src.ai.pattern import PatternAIPlayer
+from src.game.engine import Choice, RockPaperScissorsEngine
+from src.sim.simulator import PLAYER_TYPES, run_simulation
+
+
+def test_invalid_order():
+    """order が 1 未満の場合はエラー"""
+    with pytest.raises(ValueError):
+        PatternAIPlayer("Pattern", order=0)
+
+
+def test_untrained_prediction():
+    """未学習の場合は予測なしでランダムな手を返す"""
+    ai = PatternAIPlayer("Pattern")
+    assert ai.predict() == (None, 0.0)
+    assert ai.confidence == 0.0
+    assert isinstance(ai.make_choice(), Choice)
+
+
+def test_counters_constant_opponent(play_round):
+    """常に同じ手を出す相手にはその手に勝つ手を出す"""
+    ai = PatternAIPlayer("Pattern", order=1)
+    for _ in range(10):
+        play_round(ai, Choice.ROCK)
+
+    assert ai.predict() == (Choice.ROCK.code, 1.0)
+    assert ai.make_choice() == Choice.PAPER
+    assert len(ai.game_history) == 10
+
+
+def test_learns_cycle(play_round):
+    """巡回パターン（rock → paper → scissors）を学習して勝ち続ける"""
+    ai = PatternAIPlayer("Pattern", order=2)
+    cycle = [Choice.ROCK, Choice.PAPER, Choice.SCISSORS]
+    for i in range(30):
+        play_round(ai, cycle[i % 3])
+
+    wins = 0
+    for i in range(30, 60):
+        opponent = cycle[i % 3]
+        ai_choice = play_round(ai, opponent)
+        if (
+            RockPaperScissorsEngine.determine_winner(opponent, ai_choice).value
+            == "lose"
+        ):
+            wins += 1
+    assert wins == 30
+    assert ai.confidence == 1.0
+
+
+def test_play_batch_matches_sequential():
+    """バッチモードは make_choice → record_game の逐次実行と同じ手を出す"""
+    opponent_moves = array("b", [0, 0, 1, 2, 0, 1, 1, 2, 2, 0, 1, 2] * 5)
+
+    batch_ai = PatternAIPlayer("Batch", order=2)
+    batch_moves = batch_ai.play_batch(opponent_moves)
+
+    sequential_ai = PatternAIPlayer("Sequential", order=2)
+    # 未学習時の手をバッチモードと揃えるため、最初の 1 手は paper を出させる
+    sequential_moves = []
+    for code in opponent_moves:
+        if sequential_ai.predict()[0] is None:
+            ai_choice = Choice.PAPER
+        else:
+            ai_choice = sequential_ai.make_choice()
+        sequential_moves.append(ai_choice.code)
+        opponent = Choice.from_code(code)
+        result = RockPaperScissorsEngine.determine_winner(opponent, ai_choice)
+        sequential_ai.record_game(opponent, ai_choice, result.value)
+
+    assert list(batch_moves) == sequential_moves
+    assert batch_ai.predict() == sequential_ai.predict()
+    assert len(batch_ai.game_history) == 0
+
+
+def test_play_batch_with_engine():
+    """バッチモードの結果をエンジンの一括判定にそのまま渡せる"""
+    ai = PatternAIPlayer("Pattern", order=1)
+    opponent_moves = array("b", [2] * 1000)
+    result = RockPaperScissorsEngine.determine_winners(
+        opponent_moves, ai.play_batch(opponent_moves)
+    )
+    # 相手視点で見て AI がほぼ全勝する
+    assert result.losses >= 999
+
+
+def test_registered_in_simulator():
+    """シミュレーターから pattern として利用できる"""
+    assert PLAYER_TYPES["pattern"] is PatternAIPlayer
+    report = run_simulation(
+        PatternAIPlayer, PatternAIPlayer, rounds=20, matches=2, seed=1, max_workers=1
+    )
+    assert report.total_rounds == 40
@@ -6,7 +6,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from src.ai.player import AIPlayer
+from src.ai.player import AIPlayer, RandomAIPlayer
 from src.game.engine import Choice
 
 
@@ -28,6 +28,7 @@ def test_initialization(ai_player):
     assert ai_player.name == "TestAI"
     assert len(ai_player.game_history) == 0
 
+
 def test_record_game(ai_player):
     """ゲーム履歴記録のテスト"""
     ai_player.record_game(Choice.ROCK, Choice.SCISSORS, "win")
@@ -62,3 +63,47 @@ def test_default_psychological_message(ai_player):
     """デフォルト心理戦メッセージのテスト"""
     message = ai_player.get_psychological_message()
     assert message == "さあ、勝負だ！"
+
+
+def test_random_ai_player_choices():
+    """RandomAIPlayerが有効な手をまんべんなく出すことのテスト"""
+    player = RandomAIPlayer("RandomAI")
+    choices = {player.make_choice() for _ in range(200)}
+    assert choices == set(Choice)
+
+
+def test_history_is_bounded():
+    """履歴が容量を超えて増えないことのテスト"""
+    player = ConcreteAIPlayer("BoundedAI", history_capacity=10)
+    for _ in range(25):
+        player.record_game(Choice.ROCK, Choice.PAPER, "lose")
+
+    assert len(player.game_history) == 10
+    assert player.game_history.total_recorded == 25
+
+
+def test_game_history_is_read_only():
+    """game_history は記録や close を行えない読み取り専用のビューであることのテスト"""
+    player = ConcreteAIPlayer("ReadOnlyAI", history_capacity=2)
+    player.record_game(Choice.ROCK, Choice.PAPER, "lose")
+
+    history = player.game_history
+    assert not hasattr(history, "append")
+    assert not hasattr(history, "close")
+    assert history == [(Choice.ROCK, Choice.PAPER, "lose")]
+    assert history[-1] == (Choice.ROCK, Choice.PAPER, "lose")
+    assert history.capacity == 2
+
+
+def test_close_releases_history_archive(tmp_path):
+    """with ブロックを抜けると履歴のアーカイブファイルが閉じられることのテスト"""
+    path = tmp_path / "history.bin"
+    with ConcreteAIPlayer(
+        "ArchiveAI", history_capacity=1, history_archive=str(path)
+    ) as player:
+        for _ in range(3):
+            player.record_game(Choice.ROCK, Choice.PAPER, "lose")
+        assert player._history._archive is not None
+
+    assert player._history._archive is None
+    assert len(list(player.game_history.iter_all())) == 3
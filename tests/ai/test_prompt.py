@@ -0,0 +1,109 @@
+"""
+PromptBuilder のテスト
+"""
+
+from unittest.mock import patch
+
+from src.ai import prompt
+from src.ai.prompt import (
+    CHOICE_PROMPT_PREFIX,
+    CHOICE_SYSTEM_MESSAGE,
+    PromptBuilder,
+    estimate_tokens,
+    resolve_move_token_ids,
+)
+from src.game.engine import Choice
+
+
+def test_prefix_is_stable():
+    """履歴の有無に関わらず先頭部分が同一であることのテスト"""
+    builder = PromptBuilder(max_history=3)
+    assert builder.build() == CHOICE_PROMPT_PREFIX
+
+    builder.record(1, Choice.ROCK, Choice.PAPER, "lose")
+    prompt = builder.build()
+    assert prompt.startswith(CHOICE_PROMPT_PREFIX)
+    assert prompt.endswith("1. プレイヤー: rock, あなた: paper, 結果: lose\n")
+
+    messages = builder.messages()
+    assert messages[0] == {"role": "system", "content": CHOICE_SYSTEM_MESSAGE}
+    assert messages[1]["content"] == prompt
+
+
+def test_window_keeps_latest_rounds():
+    """直近 max_history 件のみが通算ラウンド番号付きで含まれることのテスト"""
+    builder = PromptBuilder(max_history=2)
+    for round_number in range(1, 5):
+        builder.record(round_number, Choice.ROCK, Choice.ROCK, f"game_{round_number}")
+
+    prompt = builder.build()
+    assert "3. プレイヤー" in prompt
+    assert "4. プレイヤー" in prompt
+    assert "game_2" not in prompt
+
+
+def test_build_is_cached_until_next_record():
+    """次の記録まで組み立て済みのプロンプトが再利用されることのテスト"""
+    builder = PromptBuilder()
+    builder.record(1, Choice.PAPER, Choice.SCISSORS, "lose")
+    first = builder.build()
+    assert builder.build() is first
+
+    builder.record(2, Choice.PAPER, Choice.SCISSORS, "lose")
+    assert builder.build() is not first
+
+
+def test_token_count_grows_with_history():
+    """トークン数が履歴行の分だけ増えることのテスト"""
+    builder = PromptBuilder(max_history=2)
+    empty = builder.token_count
+    assert empty == builder.prefix_tokens > 0
+
+    builder.record(1, Choice.ROCK, Choice.PAPER, "lose")
+    one = builder.token_count
+    builder.record(2, Choice.ROCK, Choice.PAPER, "lose")
+    two = builder.token_count
+    builder.record(3, Choice.ROCK, Choice.PAPER, "lose")
+
+    assert empty < one < two
+    # ウィンドウが満杯の場合は行数が変わらない
+    assert builder.token_count == two
+
+
+def test_estimate_tokens():
+    """トークン数の概算テスト"""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("rock") == 1
+    assert estimate_tokens("グー") == 2
+
+
+class FakeEncoding:
+    """テスト用のトークナイザー"""
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+
+    def encode(self, text):
+        return self.vocabulary[text]
+
+
+def test_resolve_move_token_ids_single_tokens():
+    """全ての手が1トークンの場合にトークンIDが解決されることのテスト"""
+    encoding = FakeEncoding({"rock": [10], "paper": [20], "scissors": [30]})
+    with patch.dict(prompt._encodings, {"fake-model": encoding}), patch.dict(
+        prompt._move_token_ids, {}, clear=True
+    ):
+        token_ids = resolve_move_token_ids("fake-model")
+        assert token_ids == {10: Choice.ROCK, 20: Choice.PAPER, 30: Choice.SCISSORS}
+        # 2回目はキャッシュから返す
+        encoding.vocabulary = {}
+        assert resolve_move_token_ids("fake-model") is token_ids
+
+
+def test_resolve_move_token_ids_multi_token_word():
+    """複数トークンになる手がある場合はNoneになることのテスト"""
+    encoding = FakeEncoding({"rock": [10], "paper": [20], "scissors": [30, 31]})
+    with patch.dict(prompt._encodings, {"fake-model": encoding}), patch.dict(
+        prompt._move_token_ids, {}, clear=True
+    ):
+        assert resolve_move_token_ids("fake-model") is None
@@ -0,0 +1,291 @@
+"""
+クライアント側レート制限のテスト
+"""
+
+import asyncio
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.ai.metrics import LLMMetrics
+from src.ai.player import AsyncLLMAIPlayer, LLMAIPlayer
+from src.ai.resilience import CircuitBreaker
+from src.ai import rate_limit
+from src.ai.rate_limit import (
+    RateLimiter,
+    RateLimitTimeout,
+    TokenBucket,
+    get_shared_rate_limiter,
+)
+from src.game.engine import Choice
+
+
+class RateLimitError(Exception):
+    """429 を表すテスト用の例外"""
+
+    status_code = 429
+
+
+def test_token_bucket_refill(clock):
+    """消費したトークンは 1 分あたりの量に応じて補充される"""
+    bucket = TokenBucket(per_minute=60, burst_seconds=2, clock=clock)
+    assert bucket.capacity == 2
+    assert bucket.wait_time(2) == 0
+    bucket.consume(2)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now = 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    # 容量を超える量は容量分として扱う
+    clock.now = 10.0
+    assert bucket.wait_time(100) == 0
+
+
+def test_requests_per_minute_paces_calls():
+    """リクエスト数の上限を超えた呼び出しは失敗せずに待たされる"""
+    limiter = RateLimiter(requests_per_minute=600, burst_seconds=0.1)
+    start = time.perf_counter()
+    for _ in range(3):
+        limiter.acquire().release(0.01)
+    elapsed = time.perf_counter() - start
+
+    assert 0.15 <= elapsed < 1.0
+    assert limiter.snapshot()["wait"]["count"] == 3
+
+
+def test_tokens_per_minute_limit(clock):
+    """トークン数の上限でも待たされる"""
+    limiter = RateLimiter(tokens_per_minute=600, burst_seconds=10, clock=clock)
+    limiter.acquire(100).release(0.01)
+    with limiter._condition:
+        assert limiter._try_acquire(100) == pytest.approx(10.0)
+
+
+def test_bounded_wait_times_out():
+    """待ち時間の上限を超えたら RateLimitTimeout を送出する"""
+    limiter = RateLimiter(initial_concurrency=1, max_wait=0.05)
+    permit = limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire()
+    permit.release(0.01)
+
+    snapshot = limiter.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["in_flight"] == 0
+
+
+def test_aimd_limit():
+    """429 とレイテンシ超過で半減し、成功で少しずつ増える"""
+    limiter = RateLimiter(initial_concurrency=8, max_concurrency=9, latency_target=1.0)
+    limiter.acquire().release(0.1, RateLimitError())
+    assert limiter.limit == 4
+    limiter.acquire().release(2.0)
+    assert limiter.limit == 2
+    for _ in range(20):
+        limiter.acquire().release(0.1)
+    assert 6 < limiter.limit <= 9
+    # 中断された呼び出しは上限を変えない
+    before = limiter.limit
+    limiter.acquire().release()
+    assert limiter.limit == before
+    assert limiter.snapshot()["throttled"] == 1
+
+
+def test_aimd_decreases_once_per_window():
+    """同時に送った呼び出しがまとめて 429 や遅延になっても上限を下げるのは 1 回だけ"""
+    limiter = RateLimiter(initial_concurrency=8, max_concurrency=8, latency_target=1.0)
+    permits = [limiter.acquire() for _ in range(8)]
+    for permit in permits[:4]:
+        permit.release(0.1, RateLimitError())
+    for permit in permits[4:]:
+        permit.release(2.0)
+    assert limiter.limit == 4
+    # 下げた後に確保した呼び出しは新しいウィンドウとして再び下げられる
+    limiter.acquire().release(2.0)
+    assert limiter.limit == 2
+
+
+def test_queue_depth_with_waiting_threads():
+    """枠の空き待ちの呼び出し数が計測される"""
+    limiter = RateLimiter(initial_concurrency=1, max_wait=5)
+    permit = limiter.acquire()
+    results = []
+
+    def worker():
+        limiter.acquire().release(0.01)
+        results.append(True)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    deadline = time.perf_counter() + 2
+    while limiter.queue_depth < 3 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert limiter.queue_depth == 3
+
+    permit.release(0.01)
+    for thread in threads:
+        thread.join(timeout=2)
+    assert results == [True] * 3
+    snapshot = limiter.snapshot()
+    assert snapshot["max_queue_depth"] == 3
+    assert snapshot["queue_depth"] == 0
+    assert "llm_rate_limit_queue_depth 0" in limiter.to_prometheus()
+
+
+def test_async_acquire_limits_concurrency():
+    """非同期版でも同時実行数が上限を超えない"""
+    limiter = RateLimiter(initial_concurrency=2, max_concurrency=2)
+    in_flight = {"current": 0, "max": 0}
+
+    async def call():
+        permit = await limiter.acquire_async()
+        in_flight["current"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["current"])
+        await asyncio.sleep(0.01)
+        in_flight["current"] -= 1
+        permit.release(0.01)
+
+    async def run_all():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(run_all())
+    assert in_flight["max"] == 2
+    assert limiter.snapshot()["acquired"] == 6
+
+
+def test_from_env():
+    """環境変数で設定した場合のみ生成される"""
+    with patch.dict(os.environ, {}, clear=True):
+        assert RateLimiter.from_env() is None
+    with patch.dict(
+        os.environ,
+        {"OPENAI_RPM_LIMIT": "500", "OPENAI_CONCURRENCY_LIMIT": "4"},
+        clear=True,
+    ):
+        limiter = RateLimiter.from_env()
+    assert limiter.max_concurrency == 4
+    assert limiter.limit == 4
+    assert limiter._requests.rate == pytest.approx(500 / 60)
+
+
+def test_shared_limiter_reads_env_on_first_use(monkeypatch):
+    """共有のレート制限は import 後に設定した環境変数（.env など）も反映する"""
+    monkeypatch.setattr(rate_limit, "_shared_limiter", None)
+    monkeypatch.setattr(rate_limit, "_shared_limiter_loaded", False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_RPM_LIMIT", "60")
+
+    player = LLMAIPlayer(name="テスト")
+    assert player.rate_limiter is get_shared_rate_limiter()
+    assert player.rate_limiter._requests.rate == pytest.approx(1.0)
+
+
+def test_player_rate_limited_fallback_is_quiet():
+    """枠を確保できない場合は警告を出さずにフォールバックする"""
+    mock_client = MagicMock()
+    limiter = RateLimiter(initial_concurrency=1, max_wait=0.01)
+    permit = limiter.acquire()
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト")
+        player._client = mock_client
+        player.metrics = LLMMetrics()
+        player.rate_limiter = limiter
+        with patch("builtins.print") as mock_print:
+            assert player.make_choice() in list(Choice)
+
+    permit.release(0.01)
+    mock_client.chat.completions.create.assert_not_called()
+    mock_print.assert_not_called()
+    assert player.metrics.snapshot()[0]["fallbacks"] == {"rate_limited": 1}
+
+
+def test_open_circuit_skips_rate_limit_wait():
+    """回路が開いている間はレート制限を待たずにフォールバックする"""
+    mock_client = MagicMock()
+    limiter = RateLimiter(initial_concurrency=1, max_wait=5.0)
+    permit = limiter.acquire()
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト")
+        player._client = mock_client
+        player.metrics = LLMMetrics()
+        player.rate_limiter = limiter
+        player.circuit_breaker = breaker
+        start = time.perf_counter()
+        with patch("builtins.print"):
+            assert player.make_choice() in list(Choice)
+        elapsed = time.perf_counter() - start
+
+    permit.release(0.01)
+    assert elapsed < 1.0
+    mock_client.chat.completions.create.assert_not_called()
+    assert player.metrics.snapshot()[0]["fallbacks"] == {"circuit_open": 1}
+    assert limiter.snapshot()["timeouts"] == 0
+
+
+def test_rate_limit_timeout_releases_half_open_probe(clock):
+    """half_open でレート制限の待ちが切れたらプローブ枠を解放する"""
+    limiter = RateLimiter(initial_concurrency=1, max_wait=0.01)
+    permit = limiter.acquire()
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=1.0, clock=clock)
+    breaker.record_failure()
+    clock.now += 10.0
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト")
+        player._client = MagicMock()
+        player.metrics = LLMMetrics()
+        player.rate_limiter = limiter
+        player.circuit_breaker = breaker
+        with patch("builtins.print"):
+            player.make_choice()
+
+    permit.release(0.01)
+    assert player.metrics.snapshot()[0]["fallbacks"] == {"rate_limited": 1}
+    assert breaker.snapshot()["state"] == "half_open"
+    assert breaker.allow()
+
+
+def test_player_429_reduces_concurrency():
+    """API の 429 で同時実行数の上限が下がる"""
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.side_effect = RateLimitError("slow down")
+    limiter = RateLimiter(initial_concurrency=8)
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = LLMAIPlayer(name="テスト")
+        player._client = mock_client
+        player.metrics = LLMMetrics()
+        player.rate_limiter = limiter
+        with patch("builtins.print"):
+            player.make_choice()
+
+    assert limiter.limit == 4
+    assert limiter.snapshot()["in_flight"] == 0
+
+
+def test_async_player_uses_limiter():
+    """AsyncLLMAIPlayer も同じレート制限を通して呼び出す"""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "scissors"
+    mock_client = MagicMock()
+
+    async def create(**kwargs):
+        return mock_response
+
+    mock_client.chat.completions.create = create
+    limiter = RateLimiter(requests_per_minute=6000)
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        player = AsyncLLMAIPlayer(name="テスト")
+        player._async_client = mock_client
+        player.rate_limiter = limiter
+        assert asyncio.run(player.make_choice_async()) == Choice.SCISSORS
+
+    assert limiter.snapshot()["acquired"] == 1
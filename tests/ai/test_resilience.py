@@ -0,0 +1,131 @@
+"""
+サーキットブレーカーのテスト
+"""
+
+import random
+
+import pytest
+
+from src.ai.resilience import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    is_failure,
+)
+
+
+class StatusError(Exception):
+    """ステータスコード付きの API エラー"""
+
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        failure_threshold=3,
+        base_delay=1.0,
+        max_delay=8.0,
+        clock=clock,
+        rng=random.Random(0),
+    )
+
+
+def _trip(breaker, count):
+    for _ in range(count):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    """連続失敗がしきい値に達すると open になる"""
+    _trip(breaker, 2)
+    assert breaker.state == STATE_CLOSED
+    breaker.record_success()
+    _trip(breaker, 3)
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_half_open_allows_single_probe(breaker, clock):
+    """待機時間後は 1 件だけ試行を通し、成功すれば closed に戻る"""
+    _trip(breaker, 3)
+    clock.now = 1.0
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow()
+
+
+def test_backoff_grows_with_jitter(breaker, clock):
+    """プローブ失敗ごとに待機時間が倍になり、上限で頭打ちになる"""
+    _trip(breaker, 3)
+    delays = []
+    for _ in range(5):
+        start = clock.now
+        while not breaker.allow():
+            clock.now += 0.01
+        delays.append(clock.now - start)
+        breaker.record_failure()
+
+    for attempt, delay in enumerate(delays):
+        upper = min(8.0, 2**attempt)
+        assert upper / 2 - 0.02 <= delay <= upper + 0.02
+
+
+def test_abandoned_probe_releases_slot(breaker, clock):
+    """結果の無いプローブは枠を解放する"""
+    _trip(breaker, 3)
+    clock.now = 1.0
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.allow()
+
+
+def test_is_failure():
+    """429・5xx・接続エラーのみを失敗として数える"""
+    assert is_failure(ConnectionError("down"))
+    assert is_failure(StatusError(429))
+    assert is_failure(StatusError(503))
+    assert not is_failure(StatusError(400))
+    assert not is_failure(CircuitOpenError("open"))
+
+
+def test_record_result_ignores_client_errors(breaker):
+    """リクエスト側のエラーは失敗として数えない"""
+    for _ in range(5):
+        breaker.record_result(StatusError(400))
+    assert breaker.state == STATE_CLOSED
+
+
+def test_snapshot_and_prometheus(breaker, clock):
+    """状態と遷移回数を計測値として出力できる"""
+    _trip(breaker, 3)
+    breaker.allow()
+    clock.now = 10.0
+    breaker.allow()
+    breaker.record_success()
+
+    snapshot = breaker.snapshot()
+    assert snapshot["state"] == STATE_CLOSED
+    assert snapshot["transitions"] == {
+        "closed->open": 1,
+        "open->half_open": 1,
+        "half_open->closed": 1,
+    }
+    assert snapshot["rejected"] == 1
+
+    text = breaker.to_prometheus()
+    assert 'llm_circuit_state{name="openai",state="closed"} 1' in text
+    assert (
+        'llm_circuit_transitions_total{name="openai",from="closed",to="open"} 1' in text
+    )
+    assert 'llm_circuit_rejected_total{name="openai"} 1' in text
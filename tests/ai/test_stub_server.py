@@ -0,0 +1,153 @@
+"""
+OpenAI 互換スタンドインサーバーのテスト
+"""
+
+import asyncio
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from src.ai.metrics import LLMMetrics
+from src.ai.player import AsyncLLMAIPlayer, LLMAIPlayer
+from src.ai.stub_server import StubConfig, StubOpenAIServer, parse_latency
+from src.game.engine import Choice
+
+
+def _post(server, body):
+    """スタンドインサーバーに直接リクエストを送信"""
+    request = urllib.request.Request(
+        server.base_url + "/chat/completions",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def test_parse_latency():
+    """レイテンシ分布指定の解析テスト"""
+    import random
+
+    rng = random.Random(0)
+    assert parse_latency("fixed:0.25")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    assert parse_latency("lognormal:-3,0.5")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1")
+
+
+def test_scripted_answers_and_usage():
+    """台本通りの応答とトークン使用量が返ることのテスト"""
+    with StubOpenAIServer(StubConfig(answers=["rock", "paper"])) as server:
+        body = {"model": "stub", "messages": [{"role": "user", "content": "hello"}]}
+        first = _post(server, body)
+        second = _post(server, body)
+
+    assert first["choices"][0]["message"]["content"] == "rock"
+    assert second["choices"][0]["message"]["content"] == "paper"
+    assert first["usage"]["prompt_tokens"] > 0
+    assert server.stats["ok"] == 2
+
+
+def test_rate_limit_injection():
+    """429 エラーの注入テスト"""
+    with StubOpenAIServer(StubConfig(rate_limit_rate=1.0)) as server:
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            _post(server, {"messages": []})
+
+    assert excinfo.value.code == 429
+    assert server.stats["rate_limited"] == 1
+
+
+def test_llm_player_through_real_client():
+    """LLMAIPlayerが実際のOpenAIクライアント経由でスタンドインと通信できることのテスト"""
+    with StubOpenAIServer(StubConfig(answers=["scissors"])) as server:
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "stub-key"}):
+            player = LLMAIPlayer(name="テスト", base_url=server.base_url)
+            assert player.make_choice() == Choice.SCISSORS
+
+    assert server.stats["requests"] == 1
+
+
+def test_async_player_through_real_client():
+    """AsyncLLMAIPlayerが実際の非同期クライアント経由で通信できることのテスト"""
+
+    async def play(players):
+        return await asyncio.gather(*(p.make_choice_async() for p in players))
+
+    with StubOpenAIServer(
+        StubConfig(answers=["paper"], latency="fixed:0.01")
+    ) as server:
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "stub-key"}):
+            players = [
+                AsyncLLMAIPlayer(name=f"AI{i}", base_url=server.base_url)
+                for i in range(5)
+            ]
+            choices = asyncio.run(play(players))
+
+    assert choices == [Choice.PAPER] * 5
+    assert server.stats["requests"] == 5
+
+
+def test_streaming_choice_terminates_early():
+    """ストリーミングで手が確定した時点で受信を打ち切ることのテスト"""
+    rambling = "paper " + "because the opponent keeps repeating rock " * 5
+    config = StubConfig(answers=[rambling], token_interval=0.05)
+
+    with StubOpenAIServer(config) as server:
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "stub-key"}):
+            player = LLMAIPlayer(
+                name="テスト", base_url=server.base_url, stream_mode=True
+            )
+            player.metrics = LLMMetrics()
+            start = time.perf_counter()
+            choice = player.make_choice()
+            elapsed = time.perf_counter() - start
+
+    assert choice == Choice.PAPER
+    # 全トークン受信には 1 秒以上かかる
+    assert elapsed < 0.5
+    (item,) = player.metrics.snapshot()
+    assert item["completion_tokens"] == 1
+    assert item["tokens_saved"] == 9
+    assert item["ttft"]["count"] == 1
+
+
+def test_streaming_choice_ambiguous_waits_for_full_answer():
+    """複数の手が混在する応答は最後まで受信して解釈することのテスト"""
+    config = StubConfig(answers=["rock/paper maybe"])
+
+    with StubOpenAIServer(config) as server:
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "stub-key"}):
+            player = LLMAIPlayer(
+                name="テスト", base_url=server.base_url, stream_mode=True
+            )
+            player.metrics = LLMMetrics()
+            choice = player.make_choice()
+
+    # 途中で打ち切らず、従来の解釈（最初に一致した手）になる
+    assert choice == Choice.ROCK
+    (item,) = player.metrics.snapshot()
+    assert item["tokens_saved"] == 0
+    assert item["completion_tokens"] == 2
+
+
+def test_async_streaming_choice():
+    """非同期版のストリーミングでの手の決定テスト"""
+    config = StubConfig(answers=["scissors, definitely scissors"], token_interval=0.05)
+
+    with StubOpenAIServer(config) as server:
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "stub-key"}):
+            player = AsyncLLMAIPlayer(
+                name="テスト", base_url=server.base_url, stream_mode=True
+            )
+            player.metrics = LLMMetrics()
+            choice = asyncio.run(player.make_choice_async())
+
+    assert choice == Choice.SCISSORS
+    assert player.metrics.snapshot()[0]["tokens_saved"] > 0
@@ -0,0 +1,127 @@
+"""
+TieredAIPlayer のテスト
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.ai.pattern import PatternAIPlayer
+from src.ai.player import AIPlayer
+from src.ai.tiered import TieredAIPlayer
+from src.game.engine import Choice
+
+
+class FixedAIPlayer(AIPlayer):
+    """常に同じ手を返すテスト用の問い合わせ先"""
+
+    def __init__(self, name: str, choice: Choice = Choice.SCISSORS):
+        super().__init__(name)
+        self.choice = choice
+        self.calls = 0
+
+    def make_choice(self) -> Choice:
+        self.calls += 1
+        return self.choice
+
+    def get_psychological_message(self) -> str:
+        return "remote message"
+
+
+@pytest.fixture
+def tiered():
+    """ローカル予測器と固定の問い合わせ先を持つ TieredAIPlayer"""
+    return TieredAIPlayer(
+        "Tiered",
+        local=PatternAIPlayer("Local", order=1),
+        remote=FixedAIPlayer("Remote"),
+        confidence_threshold=0.6,
+    )
+
+
+def test_escalates_when_uncertain(tiered):
+    """未学習の間は LLM 側に問い合わせる"""
+    assert tiered.make_choice() == Choice.SCISSORS
+    assert tiered.remote.calls == 1
+
+
+def test_uses_local_when_confident(tiered, play_round):
+    """ローカル予測が確かになったら問い合わせをやめる"""
+    for _ in range(10):
+        play_round(tiered, Choice.ROCK)
+
+    assert tiered.remote.calls == 1
+    assert tiered.make_choice() == Choice.PAPER
+    stats = tiered.stats()
+    assert stats["decisions"] == 11
+    assert stats["escalations"] == 1
+    assert stats["escalation_rate"] == pytest.approx(1 / 11)
+    # 相手の rock に対して LLM 側は scissors で負け、ローカルは paper で全勝
+    assert stats["remote_win_rate"] == 0.0
+    assert stats["local_win_rate"] == 1.0
+    assert stats["win_rate_delta"] == pytest.approx(0.9)
+
+
+def test_escalation_budget(play_round):
+    """問い合わせ予算を使い切ったらローカル判定に切り替える"""
+    ai = TieredAIPlayer(
+        "Tiered",
+        local=PatternAIPlayer("Local"),
+        remote=FixedAIPlayer("Remote"),
+        confidence_threshold=1.1,
+        escalation_budget=2,
+    )
+    for choice in [Choice.ROCK, Choice.PAPER, Choice.SCISSORS, Choice.ROCK]:
+        play_round(ai, choice)
+
+    assert ai.remote.calls == 2
+    assert ai.stats()["escalations"] == 2
+
+
+def test_threshold_from_env(monkeypatch):
+    """しきい値と予算は環境変数から読み込める"""
+    monkeypatch.setenv("TIERED_CONFIDENCE_THRESHOLD", "0.8")
+    monkeypatch.setenv("TIERED_ESCALATION_BUDGET", "3")
+    ai = TieredAIPlayer("Tiered", remote=FixedAIPlayer("Remote"))
+    assert ai.confidence_threshold == 0.8
+    assert ai.escalation_budget == 3
+
+
+def test_records_history_everywhere(tiered, play_round):
+    """結果は自身・ローカル・問い合わせ先のすべてに記録される"""
+    play_round(tiered, Choice.PAPER)
+    assert len(tiered.game_history) == 1
+    assert len(tiered.local.game_history) == 1
+    assert len(tiered.remote.game_history) == 1
+
+
+def test_latency_saved(tiered):
+    """ローカル判定分の節約時間を LLM の平均応答時間から推定する"""
+    tiered._decisions.update(local=4, remote=2)
+    tiered._latency.update(local=0.001, remote=1.0)
+    assert tiered.stats()["latency_saved"] == pytest.approx(0.5 * 4 - 0.001)
+
+
+def test_delegates_message_and_warm_up(tiered):
+    """心理戦メッセージとウォームアップは問い合わせ先に任せる"""
+    tiered.remote.warm_up = MagicMock()
+    assert tiered.get_psychological_message() == "remote message"
+    tiered.warm_up()
+    tiered.remote.warm_up.assert_called_once()
+
+
+def test_make_choice_async(tiered):
+    """非同期版も同じ判定で段階を選ぶ"""
+    assert asyncio.run(tiered.make_choice_async()) == Choice.SCISSORS
+    assert tiered.stats()["escalations"] == 1
+
+
+def test_close_closes_both_tiers(tiered):
+    """close でローカル予測器と問い合わせ先も閉じる"""
+    tiered.local.close = MagicMock()
+    tiered.remote.close = MagicMock()
+    with tiered:
+        pass
+    tiered.local.close.assert_called_once()
+    tiered.remote.close.assert_called_once()
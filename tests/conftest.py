@@ -0,0 +1,55 @@
+"""
+テスト共通のフィクスチャ
+"""
+
+import pytest
+
+from src.ai.client_pool import get_client_registry
+from src.ai.resilience import CIRCUIT_BREAKER
+from src.game.engine import RockPaperScissorsEngine
+
+
+class FakeClock:
+    """テスト用に手動で進める時計（now を書き換えて時刻を進める）"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breaker():
+    """プロセス共有のサーキットブレーカーの状態をテスト間で持ち越さない"""
+    CIRCUIT_BREAKER.reset()
+    yield
+    CIRCUIT_BREAKER.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_client_registry():
+    """openai.OpenAI をモックしたテストのクライアントを他のテストで再利用しない"""
+    get_client_registry().clear()
+    yield
+    get_client_registry().clear()
+
+
+@pytest.fixture
+def clock():
+    """clock 引数に渡す手動の時計"""
+    return FakeClock()
+
+
+def _play_round(ai, opponent_choice):
+    """1 ラウンド対戦して結果を記録し、AI の手を返す"""
+    ai_choice = ai.make_choice()
+    result = RockPaperScissorsEngine.determine_winner(opponent_choice, ai_choice)
+    ai.record_game(opponent_choice, ai_choice, result.value)
+    return ai_choice
+
+
+@pytest.fixture
+def play_round():
+    """AI と 1 ラウンド対戦する関数 play_round(ai, opponent_choice)"""
+    return _play_round
@@ -2,9 +2,23 @@
 ゲームエンジンの包括的テスト
 """
 
+import itertools
+import tracemalloc
+from array import array
+
 import pytest
 
-from src.game.engine import Choice, GameResult, RockPaperScissorsEngine
+from src.game.engine import (
+    RESULT_CODES,
+    RESULT_DRAW,
+    RESULT_LOSE,
+    RESULT_WIN,
+    RESULT_VALUES_BY_CODE,
+    RESULTS_BY_CODE,
+    Choice,
+    GameResult,
+    RockPaperScissorsEngine,
+)
 
 
 @pytest.fixture
@@ -38,6 +52,68 @@ def test_choice_from_string_invalid():
     assert Choice.from_string("") is None
 
 
+def test_choice_from_string_width_and_kana_variants():
+    """全角・半角カナ・ひらがなの入力テスト"""
+    assert Choice.from_string("ＲＯＣＫ") == Choice.ROCK
+    assert Choice.from_string("ｐａｐｅｒ") == Choice.PAPER
+    assert Choice.from_string("ぐー") == Choice.ROCK
+    assert Choice.from_string("ぱー") == Choice.PAPER
+    assert Choice.from_string("ちょき") == Choice.SCISSORS
+    assert Choice.from_string("ｸﾞｰ") == Choice.ROCK
+    assert Choice.from_string("ﾊﾟｰ") == Choice.PAPER
+    assert Choice.from_string("ﾁｮｷ") == Choice.SCISSORS
+
+
+def test_choice_from_string_normalizes_uncommon_input():
+    """表に無い表記も正規化して変換できることのテスト"""
+    assert Choice.from_string("  rock\n") == Choice.ROCK
+    assert Choice.from_string("\u3000チョキ\u3000") == Choice.SCISSORS
+    assert Choice.from_string("sCiSsOrS") == Choice.SCISSORS
+    assert Choice.from_string("Ｓｃｉｓｓｏｒｓ ") == Choice.SCISSORS
+    assert Choice.from_string("ちョき") == Choice.SCISSORS
+
+
+def test_choice_from_string_non_string():
+    """文字列以外の入力は None になることのテスト"""
+    assert Choice.from_string(None) is None
+    assert Choice.from_string(["rock"]) is None
+    assert Choice.from_string(0) is None
+
+
+def _peak_allocation(func, *args) -> int:
+    """func(*args) を 1000 回呼ぶ間に一時的に確保されたメモリ量（バイト）"""
+    func(*args)
+    calls = itertools.repeat(None, 1000)
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in calls:
+            func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+@pytest.mark.parametrize("text", ["rock", "Paper", "グー", "ぐー", "ｸﾞｰ", "ＲＯＣＫ"])
+def test_choice_from_string_does_not_allocate(text):
+    """よく使われる表記の変換でメモリを確保しないことのテスト"""
+    assert _peak_allocation(Choice.from_string, text) == 0
+
+
+def test_hot_path_does_not_allocate():
+    """表示と勝敗判定でメモリを確保しないことのテスト"""
+    assert _peak_allocation(Choice.SCISSORS.to_display, "ja") == 0
+    assert _peak_allocation(Choice.SCISSORS.to_display, "en") == 0
+    assert (
+        _peak_allocation(
+            RockPaperScissorsEngine.determine_winner, Choice.ROCK, Choice.PAPER
+        )
+        == 0
+    )
+
+
 def test_choice_to_display_japanese():
     """日本語表示のテスト"""
     assert Choice.ROCK.to_display("ja") == "グー ✊"
@@ -111,3 +187,82 @@ def test_determine_winner_all_draws(game_engine):
     for player_choice, ai_choice in draw_combinations:
         result = game_engine.determine_winner(player_choice, ai_choice)
         assert result == GameResult.DRAW
+
+
+# 一括判定 API のテスト
+def test_choice_code_round_trip():
+    """整数コードとChoiceの相互変換テスト"""
+    for choice in Choice:
+        assert Choice.from_code(choice.code) == choice
+    assert [choice.code for choice in Choice] == [0, 1, 2]
+
+
+def test_determine_winners_matches_scalar(game_engine):
+    """一括判定が単発判定と全組み合わせで一致することのテスト"""
+    pairs = [(p, a) for p in Choice for a in Choice]
+    player_moves = array("b", [p.code for p, _ in pairs])
+    ai_moves = array("b", [a.code for _, a in pairs])
+
+    batch = game_engine.determine_winners(player_moves, ai_moves)
+
+    assert batch.rounds == 9
+    for (player_choice, ai_choice), code in zip(pairs, batch.codes):
+        assert RESULTS_BY_CODE[code] == game_engine.determine_winner(
+            player_choice, ai_choice
+        )
+
+
+def test_determine_winners_counts(game_engine):
+    """一括判定の集計値テスト"""
+    batch = game_engine.determine_winners([0, 1, 2, 0], [2, 2, 2, 0])
+
+    assert list(batch.codes) == [RESULT_WIN, RESULT_LOSE, RESULT_DRAW, RESULT_DRAW]
+    assert (batch.wins, batch.losses, batch.draws) == (1, 1, 2)
+
+
+def test_determine_winners_accepts_bytes(game_engine):
+    """bytes 入力でも判定できることのテスト"""
+    batch = game_engine.determine_winners(b"\x00\x01", b"\x01\x00")
+    assert (batch.wins, batch.losses, batch.draws) == (1, 1, 0)
+
+
+@pytest.mark.parametrize("typecode", ["h", "i", "q", "B"])
+def test_determine_winners_accepts_wide_arrays(game_engine, typecode):
+    """要素が 1 バイトでない array もメモリではなく要素ごとに判定することのテスト"""
+    player_moves = array(typecode, [0, 1, 2])
+    ai_moves = array(typecode, [1, 1, 1])
+    batch = game_engine.determine_winners(player_moves, ai_moves)
+
+    assert list(batch.codes) == [RESULT_LOSE, RESULT_DRAW, RESULT_WIN]
+    assert (batch.wins, batch.losses, batch.draws) == (1, 1, 1)
+    # リスト入力と同じ結果になる
+    assert batch == game_engine.determine_winners([0, 1, 2], [1, 1, 1])
+
+
+def test_result_codes_match_results_by_code():
+    """結果文字列と結果コードの対応が RESULTS_BY_CODE と一致するテスト"""
+    assert RESULT_CODES == {"draw": RESULT_DRAW, "win": RESULT_WIN, "lose": RESULT_LOSE}
+    for code, result in enumerate(RESULTS_BY_CODE):
+        assert RESULT_CODES[result.value] == code
+        assert RESULT_VALUES_BY_CODE[code] == result.value
+
+
+def test_determine_winners_empty(game_engine):
+    """空配列の一括判定テスト"""
+    batch = game_engine.determine_winners([], [])
+    assert batch.rounds == 0
+    assert (batch.wins, batch.losses, batch.draws) == (0, 0, 0)
+
+
+def test_determine_winners_invalid(game_engine):
+    """不正な入力に対する一括判定のテスト"""
+    with pytest.raises(ValueError):
+        game_engine.determine_winners([0, 1], [0])
+    with pytest.raises(ValueError):
+        game_engine.determine_winners([0, 3], [0, 1])
+    with pytest.raises(ValueError):
+        game_engine.determine_winners(array("b", [-1]), array("b", [0]))
+    with pytest.raises(ValueError):
+        game_engine.determine_winners([0, 1], [0, 256])
+    with pytest.raises(ValueError):
+        game_engine.determine_winners(array("h", [0, 256]), array("h", [0, 1]))
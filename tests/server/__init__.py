@@ -0,0 +1 @@
+# ゲームサーバーテストモジュール
@@ -0,0 +1,231 @@
+"""
+ゲームサーバーのテスト
+"""
+
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.ai.stub_server import StubConfig, StubOpenAIServer
+from src.server.app import GameServer, HTTPError
+
+
+async def _request(server, method, path, body=None, reader_writer=None):
+    """サーバーに HTTP リクエストを送信して (ステータス, 応答) を返す"""
+    reader, writer = reader_writer or await asyncio.open_connection(
+        server.host, server.port
+    )
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+        + data
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        headers[name.lower()] = value.strip()
+    payload = await reader.readexactly(int(headers["content-length"]))
+    if reader_writer is None:
+        writer.close()
+    if headers["content-type"].startswith("application/json"):
+        return status, json.loads(payload)
+    return status, payload.decode()
+
+
+def _run(coro_factory, **kwargs):
+    """サーバーを起動してテスト用コルーチンを実行する"""
+
+    async def main():
+        server = GameServer(**kwargs)
+        await server.start()
+        try:
+            return await coro_factory(server)
+        finally:
+            await server.stop()
+
+    return asyncio.run(main())
+
+
+def test_session_lifecycle():
+    """セッションの作成・対戦・状態取得・終了"""
+
+    async def scenario(server):
+        status, session = await _request(
+            server, "POST", "/sessions", {"player": "pattern"}
+        )
+        assert status == 201
+        path = f"/sessions/{session['session_id']}"
+
+        # 1 本の接続を keep-alive で使い回す
+        connection = await asyncio.open_connection(server.host, server.port)
+        for choice in ["rock", "グー", "paper"]:
+            status, move = await _request(
+                server, "POST", path + "/moves", {"choice": choice}, connection
+            )
+            assert status == 200
+            assert move["ai"] in ("rock", "paper", "scissors")
+            assert move["result"] in ("win", "lose", "draw")
+        connection[1].close()
+
+        status, state = await _request(server, "GET", path)
+        assert state["rounds"] == 3
+        assert state["player"] == "pattern"
+
+        status, message = await _request(server, "GET", path + "/message")
+        assert status == 200 and message["message"]
+
+        status, _ = await _request(server, "DELETE", path)
+        assert status == 200
+        status, _ = await _request(server, "GET", path)
+        assert status == 404
+        return server.stats()
+
+    stats = _run(scenario, default_player="random")
+    assert stats["created"] == 1
+    assert stats["move_latency"]["count"] == 3
+
+
+def test_invalid_requests():
+    """不正な入力にはエラーを返す"""
+
+    async def scenario(server):
+        _, session = await _request(server, "POST", "/sessions", {})
+        path = f"/sessions/{session['session_id']}/moves"
+        assert (await _request(server, "POST", path, {"choice": "lizard"}))[0] == 400
+        assert (await _request(server, "POST", "/sessions", {"player": "x"}))[0] == 400
+        assert (await _request(server, "GET", "/unknown"))[0] == 404
+        assert (await _request(server, "PUT", "/sessions"))[0] == 405
+        assert (await _request(server, "POST", "/sessions/none/moves", {}))[0] == 404
+
+    _run(scenario, default_player="random")
+
+
+async def _raw_request(server, data: bytes) -> bytes:
+    """生のバイト列を送信し、サーバーが接続を閉じるまでの応答を返す"""
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(data)
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(), 5.0)
+    writer.close()
+    return response
+
+
+def test_invalid_content_length():
+    """数値でない・負の Content-Length には 400 を返す"""
+
+    async def scenario(server):
+        responses = []
+        for length in ("abc", "-1", "+1", "1_0"):
+            responses.append(
+                await _raw_request(
+                    server,
+                    f"POST /sessions HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode(),
+                )
+            )
+        return responses
+
+    for response in _run(scenario, default_player="random"):
+        assert response.startswith(b"HTTP/1.1 400 ")
+
+
+def test_read_timeout():
+    """ヘッダーの途中で止まった接続には 408 を返し、無通信の接続は閉じる"""
+
+    async def scenario(server):
+        stalled = await _raw_request(server, b"GET /health HTTP/1.1\r\nHost: test\r\n")
+        idle = await _raw_request(server, b"")
+        status, _ = await _request(server, "GET", "/health")
+        return stalled, idle, status
+
+    stalled, idle, status = _run(scenario, default_player="random", read_timeout=0.05)
+    assert stalled.startswith(b"HTTP/1.1 408 ")
+    assert idle == b""
+    assert status == 200
+
+
+def test_idle_eviction_and_session_limit(clock):
+    """無操作のセッションと上限を超えたセッションを古い順に破棄する"""
+    server = GameServer(
+        default_player="random", idle_timeout=10, max_sessions=3, clock=clock
+    )
+    first = server.create_session()
+    clock.now = 5
+    second = server.create_session()
+    third = server.create_session()
+
+    # 操作したセッションは最後尾に移動する
+    clock.now = 8
+    server.get_session(first.session_id)
+    clock.now = 16
+    assert server.evict_idle() == 2
+    assert server.get_session(first.session_id) is first
+    with pytest.raises(HTTPError):
+        server.get_session(second.session_id)
+
+    for _ in range(3):
+        server.create_session()
+    with pytest.raises(HTTPError):
+        server.get_session(first.session_id)
+    assert server.stats()["sessions"] == 3
+    assert server.stats()["evicted"] == 3
+    assert third.session_id not in server._sessions
+
+
+def test_session_history_is_bounded():
+    """セッションの履歴は session_history 件までしか保持しない"""
+
+    async def scenario(server):
+        session = server.create_session("pattern")
+        for _ in range(10):
+            await server.play_move(session, "rock")
+        return session
+
+    session = _run(scenario, default_player="random", session_history=4)
+    assert len(session.player.game_history) == 4
+    assert session.player.game_history.total_recorded == 10
+
+
+def test_metrics_endpoint():
+    """計測値を Prometheus 形式で取得できる"""
+
+    async def scenario(server):
+        return await _request(server, "GET", "/metrics")
+
+    status, text = _run(scenario, default_player="random")
+    assert status == 200
+    assert "janken_sessions 0" in text
+    assert "llm_circuit_state" in text
+
+
+def test_llm_sessions_with_stub():
+    """LLM セッションはスタンドインサーバーに並行して問い合わせる"""
+
+    async def scenario(server):
+        async def play():
+            _, session = await _request(server, "POST", "/sessions", {"player": "llm"})
+            _, move = await _request(
+                server,
+                "POST",
+                f"/sessions/{session['session_id']}/moves",
+                {"choice": "rock"},
+            )
+            return move
+
+        return await asyncio.gather(*(play() for _ in range(10)))
+
+    with StubOpenAIServer(StubConfig(answers=["paper"], latency="fixed:0.05")) as stub:
+        with patch.dict(
+            os.environ, {"OPENAI_API_KEY": "test-key", "OPENAI_BASE_URL": stub.base_url}
+        ):
+            moves = _run(scenario)
+
+    assert [move["ai"] for move in moves] == ["paper"] * 10
+    assert all(move["result"] == "lose" for move in moves)
@@ -0,0 +1 @@
+# シミュレーターテストモジュール
@@ -0,0 +1,101 @@
+"""
+AI 対 AI シミュレーターのテスト
+"""
+
+import asyncio
+
+from src.ai.player import AIPlayer, RandomAIPlayer
+from src.game.engine import Choice
+from src.sim.simulator import (
+    MatchTask,
+    play_match,
+    run_match,
+    run_matches_async,
+    run_simulation,
+)
+
+
+class RockOnlyPlayer(AIPlayer):
+    """常にグーを出すテスト用プレイヤー"""
+
+    def make_choice(self) -> Choice:
+        return Choice.ROCK
+
+
+class PaperOnlyPlayer(AIPlayer):
+    """常にパーを出すテスト用プレイヤー"""
+
+    def make_choice(self) -> Choice:
+        return Choice.PAPER
+
+
+def test_play_match_counts_and_history():
+    """対戦結果の集計と両者の履歴記録のテスト"""
+    player_a = RockOnlyPlayer("A")
+    player_b = PaperOnlyPlayer("B")
+
+    a_wins, b_wins, draws = play_match(player_a, player_b, 5)
+
+    assert (a_wins, b_wins, draws) == (0, 5, 0)
+    # 各プレイヤーは自分をAI側として記録する
+    assert player_a.game_history[0] == (Choice.PAPER, Choice.ROCK, "win")
+    assert player_b.game_history[0] == (Choice.ROCK, Choice.PAPER, "lose")
+
+
+def test_run_match_is_reproducible():
+    """同じシードの試合が同じ結果になることのテスト"""
+    task = MatchTask(
+        match_id=0,
+        seed=42,
+        rounds=200,
+        player_a_cls=RandomAIPlayer,
+        player_b_cls=RandomAIPlayer,
+    )
+    first = run_match(task)
+    second = run_match(task)
+
+    assert (first.a_wins, first.b_wins, first.draws) == (
+        second.a_wins,
+        second.b_wins,
+        second.draws,
+    )
+    assert first.a_wins + first.b_wins + first.draws == 200
+
+
+def test_run_simulation_inline():
+    """同一プロセス実行でのシミュレーション集計テスト"""
+    report = run_simulation(
+        RockOnlyPlayer, PaperOnlyPlayer, rounds=10, matches=3, seed=1, max_workers=1
+    )
+
+    assert report.seed == 1
+    assert len(report.matches) == 3
+    assert report.total_rounds == 30
+    assert report.b_win_rate == 1.0
+    assert report.a_win_rate == 0.0
+    assert report.rounds_per_sec > 0
+
+
+def test_run_simulation_process_pool_matches_inline():
+    """プロセスプール実行と同一プロセス実行の結果一致テスト"""
+    inline = run_simulation(
+        RandomAIPlayer, RandomAIPlayer, rounds=50, matches=4, seed=7, max_workers=1
+    )
+    pooled = run_simulation(
+        RandomAIPlayer, RandomAIPlayer, rounds=50, matches=4, seed=7, max_workers=2
+    )
+
+    assert [(m.a_wins, m.b_wins, m.draws) for m in inline.matches] == [
+        (m.a_wins, m.b_wins, m.draws) for m in pooled.matches
+    ]
+    assert abs(inline.a_win_rate + inline.b_win_rate + inline.draw_rate - 1.0) < 1e-9
+
+
+def test_run_matches_async():
+    """1つのイベントループで複数対戦を並行実行するテスト"""
+    pairs = [(RockOnlyPlayer(f"A{i}"), PaperOnlyPlayer(f"B{i}")) for i in range(5)]
+
+    results = asyncio.run(run_matches_async(pairs, rounds=4))
+
+    assert results == [(0, 4, 0)] * 5
+    assert all(len(player_b.game_history) == 4 for _, player_b in pairs)
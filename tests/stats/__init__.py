@@ -0,0 +1 @@
+# 統計テストモジュール
@@ -0,0 +1,148 @@
+"""
+GameStatistics（逐次集計の統計）のテスト
+"""
+
+import json
+import random
+
+import pytest
+
+from src.ai.player import RandomAIPlayer
+from src.game.engine import Choice, RockPaperScissorsEngine
+from src.sim.simulator import run_simulation
+from src.stats.tracker import GameStatistics, StatsSnapshot
+
+ROCK, PAPER, SCISSORS = Choice.ROCK, Choice.PAPER, Choice.SCISSORS
+
+
+def _play(stats: GameStatistics, moves):
+    """(プレイヤーの手, AI の手) の並びを結果付きで集計"""
+    for player_choice, ai_choice in moves:
+        result = RockPaperScissorsEngine.determine_winner(player_choice, ai_choice)
+        stats.record(player_choice, ai_choice, result.value)
+
+
+def test_rates_and_frequencies():
+    """勝敗率と手の頻度のテスト"""
+    stats = GameStatistics()
+    _play(stats, [(ROCK, SCISSORS), (ROCK, PAPER), (PAPER, PAPER), (ROCK, SCISSORS)])
+    snapshot = stats.snapshot()
+
+    assert snapshot.rounds == 4
+    assert snapshot.win_rate == 0.5
+    assert snapshot.lose_rate == 0.25
+    assert snapshot.draw_rate == 0.25
+    assert snapshot.move_frequencies() == {ROCK: 0.75, PAPER: 0.25, SCISSORS: 0.0}
+    assert snapshot.move_frequencies(ai=True)[SCISSORS] == 0.5
+
+
+def test_transition_matrix():
+    """プレイヤーの手の遷移確率のテスト"""
+    stats = GameStatistics()
+    _play(stats, [(ROCK, ROCK), (PAPER, ROCK), (ROCK, ROCK), (PAPER, ROCK)])
+    matrix = stats.snapshot().transition_matrix()
+
+    # グーの後は必ずパー、パーの後は必ずグー
+    assert matrix[ROCK.code] == [0.0, 1.0, 0.0]
+    assert matrix[PAPER.code] == [1.0, 0.0, 0.0]
+    assert matrix[SCISSORS.code] == [0.0, 0.0, 0.0]
+
+
+def test_rolling_window():
+    """直近ウィンドウは古いラウンドを除いて集計する"""
+    stats = GameStatistics(window=3)
+    _play(stats, [(ROCK, SCISSORS)] * 5 + [(ROCK, PAPER)] * 2)
+    snapshot = stats.snapshot()
+
+    assert snapshot.window_rounds == 3
+    assert snapshot.window_results == [0, 1, 2]
+    assert snapshot.window_lose_rate == pytest.approx(2 / 3)
+    assert snapshot.win_rate == pytest.approx(5 / 7)
+
+
+def test_custom_results_are_not_counted():
+    """標準外の結果は勝敗率に含めない"""
+    stats = GameStatistics(window=2)
+    stats.record(ROCK, PAPER, "custom")
+    stats.record(ROCK, SCISSORS, "win")
+    snapshot = stats.snapshot()
+
+    assert snapshot.rounds == 2
+    assert snapshot.counted_rounds == 1
+    assert snapshot.win_rate == 1.0
+    assert snapshot.window_rounds == 2
+
+
+def test_invalid_window():
+    """window は 1 以上"""
+    with pytest.raises(ValueError):
+        GameStatistics(window=0)
+
+
+def test_merge_equals_single_stream():
+    """分割して集計した結果をマージすると一括の集計と一致する"""
+    rng = random.Random(0)
+    choices = [ROCK, PAPER, SCISSORS]
+    moves = [(rng.choice(choices), rng.choice(choices)) for _ in range(300)]
+
+    whole = GameStatistics(window=1000)
+    _play(whole, moves)
+    shards = [GameStatistics(window=1000) for _ in range(3)]
+    for index, shard in enumerate(shards):
+        _play(shard, moves[index * 100 : (index + 1) * 100])
+
+    merged = StatsSnapshot.combine(shard.snapshot() for shard in shards)
+    expected = whole.snapshot()
+    assert merged.rounds == expected.rounds
+    assert merged.results == expected.results
+    assert merged.player_moves == expected.player_moves
+    assert merged.ai_moves == expected.ai_moves
+    # シャードの境界をまたぐ遷移だけが数えられない
+    assert sum(expected.transitions) - sum(merged.transitions) == 2
+    assert (shards[0].snapshot() + shards[1].snapshot()).rounds == 200
+
+
+def test_snapshot_roundtrip_through_json():
+    """スナップショットは JSON を経由して復元できる"""
+    stats = GameStatistics()
+    _play(stats, [(ROCK, PAPER), (SCISSORS, PAPER)])
+    snapshot = stats.snapshot()
+    restored = StatsSnapshot.from_dict(json.loads(json.dumps(snapshot.to_dict())))
+    assert restored == snapshot
+
+
+def test_snapshot_is_a_copy():
+    """スナップショットはその後の集計の影響を受けない"""
+    stats = GameStatistics()
+    _play(stats, [(ROCK, PAPER)])
+    snapshot = stats.snapshot()
+    _play(stats, [(ROCK, PAPER)])
+    assert snapshot.rounds == 1
+
+    stats.reset()
+    assert stats.snapshot() == StatsSnapshot()
+
+
+def test_attach_as_observer():
+    """record_game のオブザーバーとして集計する"""
+    player = RandomAIPlayer("AI")
+    stats = GameStatistics().attach(player)
+    player.record_game(ROCK, PAPER, "lose")
+    player.record_game(SCISSORS, PAPER, "win")
+
+    snapshot = stats.snapshot()
+    assert snapshot.rounds == 2
+    assert snapshot.results == [0, 1, 1]
+
+
+def test_simulation_report_merges_match_stats():
+    """シミュレーションの各試合の統計がレポートでマージされる"""
+    report = run_simulation(
+        RandomAIPlayer, RandomAIPlayer, rounds=50, matches=4, seed=1, max_workers=1
+    )
+    stats = report.stats
+
+    assert stats.rounds == 200
+    assert stats.win_rate == pytest.approx(report.a_win_rate)
+    assert stats.lose_rate == pytest.approx(report.b_win_rate)
+    assert stats.draw_rate == pytest.approx(report.draw_rate)
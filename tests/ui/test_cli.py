@@ -2,12 +2,13 @@
 CLIインターフェースの包括的テスト
 """
 
+import time
 from io import StringIO
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.ai.player import LLMAIPlayer
+from src.ai.player import FALLBACK_MESSAGES, AIPlayer, LLMAIPlayer
 from src.game.engine import Choice, GameResult
 from src.ui.cli import CLIInterface
 
@@ -151,3 +152,114 @@ def test_run_single_game_quit(cli_ja):
 
             result = cli_ja.run_single_game(mock_ai_player)
             assert result is None
+
+
+def test_run_single_game_skips_shown_welcome(cli_ja):
+    """起動直後にウェルカムを表示済みなら繰り返さないテスト"""
+    with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        cli_ja.display_welcome()
+        with patch.object(cli_ja, 'get_player_choice', return_value=None):
+            cli_ja.run_single_game(MagicMock())
+        assert mock_stdout.getvalue().count(cli_ja.messages["welcome"]) == 1
+
+
+def test_messages_are_not_shared_between_instances():
+    """インスタンスのメッセージを変更しても他のインスタンスに影響しないテスト"""
+    first = CLIInterface(language="ja")
+    first.messages["welcome"] = "変更"
+    assert CLIInterface(language="ja").messages["welcome"] != "変更"
+
+
+class SlowMessagePlayer(AIPlayer):
+    """心理戦メッセージの生成に時間がかかるテスト用プレイヤー"""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name)
+        self.delay = delay
+        self.warmed_up = False
+
+    def warm_up(self):
+        self.warmed_up = True
+
+    def get_psychological_message(self) -> str:
+        time.sleep(self.delay)
+        return "遅れて登場"
+
+    def make_choice(self) -> Choice:
+        return Choice.SCISSORS
+
+
+def _choose_after(delay: float, choice=Choice.ROCK):
+    """delay 秒考えてから手を返す get_player_choice の代わり"""
+
+    def choose():
+        time.sleep(delay)
+        return choice
+
+    return choose
+
+
+def test_prefetch_psychological_message():
+    """先行取得した心理戦メッセージが表示されることのテスト"""
+    cli = CLIInterface(language="ja", message_timeout=1.0)
+    player = SlowMessagePlayer("TestAI", delay=0.01)
+    cli.prefetch_psychological_message(player)
+
+    with patch.object(cli, "get_player_choice", side_effect=_choose_after(0.3)):
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            cli.run_single_game(player)
+            output = mock_stdout.getvalue()
+
+    assert player.warmed_up
+    assert "遅れて登場" in output
+    assert "あなたの勝ち" in output
+
+
+def test_prompt_does_not_wait_for_psychological_message():
+    """心理戦メッセージを待たずに入力を受け付け、届いた時点で表示するテスト"""
+    cli = CLIInterface(language="ja", message_timeout=2.0)
+    player = SlowMessagePlayer("TestAI", delay=0.2)
+    cli.prefetch_psychological_message(player)
+    prompted_at = []
+
+    def choose():
+        prompted_at.append(time.perf_counter())
+        time.sleep(0.5)
+        return Choice.ROCK
+
+    start = time.perf_counter()
+    with patch.object(cli, "get_player_choice", side_effect=choose):
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            cli.run_single_game(player)
+            output = mock_stdout.getvalue()
+
+    assert prompted_at[0] - start < 0.15
+    assert output.index("遅れて登場") < output.index("あなたの勝ち")
+
+
+def test_late_psychological_message_is_dropped_after_answer():
+    """手の入力後に届いた心理戦メッセージは表示しないテスト"""
+    cli = CLIInterface(language="ja", message_timeout=2.0)
+    player = SlowMessagePlayer("TestAI", delay=0.2)
+
+    with patch.object(cli, "get_player_choice", return_value=None):
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            cli.run_single_game(player)
+            time.sleep(0.4)
+            output = mock_stdout.getvalue()
+
+    assert "遅れて登場" not in output
+
+
+def test_psychological_message_deadline_fallback():
+    """期限内に届かない心理戦メッセージがフォールバックされることのテスト"""
+    cli = CLIInterface(language="ja", message_timeout=0.01)
+    player = SlowMessagePlayer("TestAI", delay=0.5)
+
+    with patch.object(cli, "get_player_choice", side_effect=_choose_after(0.2)):
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            cli.run_single_game(player)
+            output = mock_stdout.getvalue()
+
+    assert "遅れて登場" not in output
+    assert any(message in output for message in FALLBACK_MESSAGES)